@@ -1,13 +1,39 @@
 import gradio as gr
 import os
-import tempfile
+import io
+import hashlib
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import subprocess
-import numpy as np
+import time
+import threading
+import functools
+import queue
 from pathlib import Path
 import sys
+from difflib import SequenceMatcher
 from dotenv import load_dotenv
 
+# difflib-fast là bản Rust tương thích với difflib (tuyến tính theo độ dài chuỗi)
+try:
+    from difflib_fast import ratio as ro_ratio
+except ImportError:
+    ro_ratio = None
+
+# rapidfuzz tính Levenshtein bit-parallel (Myers) bằng C++, nhận trực tiếp list token
+try:
+    from rapidfuzz.distance import Levenshtein
+except ImportError:
+    Levenshtein = None
+
+# espeak-phonemizer gọi libespeak-ng qua ctypes: nạp engine một lần thay vì spawn process mỗi lần
+try:
+    from espeak_phonemizer import Phonemizer
+    _PHONEMIZER = Phonemizer(default_voice="vi")
+except Exception:
+    _PHONEMIZER = None
+
 # Add project root to path
 # sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -19,11 +45,82 @@ from speech_synth_engine.providers.gtts_provider import GTTSProvider
 from speech_synth_engine.providers.vnpost_provider import VnPostTTSProvider
 from speech_synth_engine.providers.gemini_provider import GeminiTTSProvider
 
+GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
+
 # STT endpoint
 STT_URL = "https://ai.vnpost.vn/voiceai/core/stt/v1/file"
+STT_TIMEOUT = (5, 30)  # (connect, read) seconds
+SIMILARITY_THRESHOLD = 0.9  # 90% similarity threshold
+
+# Session dùng chung để giữ kết nối keep-alive (TCP + TLS) tới STT giữa các request
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.2),
+))
+
+# Model TTS của từng provider (một phần của cache key: đổi model thì không dùng lại audio cũ)
+GEMINI_TTS_MODEL = 'gemini-2.5-flash-preview-tts'
+TTS_MODELS = {"gemini": GEMINI_TTS_MODEL}
+
+# Cache audio TTS trên đĩa, khoá theo (provider, model, voice, text).
+# Giới hạn theo dung lượng và tuổi file; file cũ nhất bị xoá trước
+CACHE_DIR = Path(os.getenv("TTS_CACHE_DIR", "/tmp/tts_cache"))
+CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+CACHE_MAX_AGE = float(os.getenv("TTS_CACHE_MAX_AGE", str(7 * 24 * 3600)))  # seconds
+CACHE_PRUNE_INTERVAL = 60  # seconds between two prune passes
+_cache_prune_lock = threading.Lock()
+_cache_last_prune = 0.0
+
+def get_cache_path(provider, voice, text):
+    """Return the cache file path for a (provider, model, voice, text) combination."""
+    model = TTS_MODELS.get(provider, "default")
+    cache_key = hashlib.sha256(f"{provider}|{model}|{voice}|{text.strip()}".encode()).hexdigest()
+    return CACHE_DIR / f"{cache_key}.wav"
+
+def prune_cache(force=False):
+    """Drop cache files older than CACHE_MAX_AGE, then the oldest ones until under CACHE_MAX_BYTES."""
+    global _cache_last_prune
+    now = time.time()
+    if not force and now - _cache_last_prune < CACHE_PRUNE_INTERVAL:
+        return
+    if not _cache_prune_lock.acquire(blocking=False):
+        return
+    try:
+        _cache_last_prune = now
+        entries = []
+        try:
+            with os.scandir(CACHE_DIR) as it:
+                for entry in it:
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        except FileNotFoundError:
+            return
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in entries:
+            # File vừa ghi (có thể đang được gửi sang STT) luôn được giữ lại
+            if now - mtime < CACHE_PRUNE_INTERVAL or (now - mtime <= CACHE_MAX_AGE and total <= CACHE_MAX_BYTES):
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+    finally:
+        _cache_prune_lock.release()
 
 def get_tts_provider(provider_name, voice):
-    """Initialize and return the appropriate TTS provider."""
+    """Return the (cached) TTS provider and the voice to use with it."""
+    return _make_provider(provider_name, voice)
+
+@functools.lru_cache(maxsize=16)
+def _make_provider(provider_name, voice):
+    """Initialize the appropriate TTS provider (once per provider/voice)."""
     if provider_name == "vnpost":
         config = {
             'api_url': 'https://ai.vnpost.vn/voiceai/core/tts/v1/synthesize',
@@ -43,8 +140,8 @@ def get_tts_provider(provider_name, voice):
     
     elif provider_name == "gemini":
         config = {
-            'api_key': os.getenv('GEMINI_API_KEY', ''),
-            'model': 'gemini-2.5-flash-preview-tts',
+            'api_key': GEMINI_API_KEY,
+            'model': GEMINI_TTS_MODEL,
             'voice': voice,
             'language': 'vi',
         }
@@ -52,34 +149,54 @@ def get_tts_provider(provider_name, voice):
     
     raise ValueError(f"Unsupported provider: {provider_name}")
 
+def post_to_stt(audio_file):
+    """Send audio (file object or (name, fileobj, mime) tuple) to the STT endpoint."""
+    return _session.post(
+        STT_URL,
+        files={
+            "audio_file": audio_file,
+            "enhance_speech": (None, "true"),
+            "postprocess_text": (None, "true"),
+        },
+        timeout=STT_TIMEOUT,
+    )
+
 def process_tts_stt(text, provider, voice):
     """Process TTS and STT pipeline."""
     try:
-        # Initialize TTS provider
-        tts_provider, use_voice = get_tts_provider(provider, voice)
+        tts_file_path = get_cache_path(provider, voice, text)
+        audio_buffer = None
         
-        # Create temp file for audio
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_audio:
-            tts_file_path = tmp_audio.name
-        
-        # Generate TTS
-        success = tts_provider.synthesize(text, use_voice, Path(tts_file_path))
-        if not success:
-            return None, None, None, f"❌ TTS generation failed using {provider}"
+        if not tts_file_path.exists():
+            # Initialize TTS provider
+            tts_provider, use_voice = get_tts_provider(provider, voice)
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            
+            if hasattr(tts_provider, "synthesize_to_buffer"):
+                # Giữ audio trong bộ nhớ, gửi thẳng sang STT; chỉ ghi ra đĩa cho Gradio sau khi gọi STT
+                audio_buffer = io.BytesIO()
+                success = tts_provider.synthesize_to_buffer(text, use_voice, audio_buffer)
+                if not success:
+                    return None, None, None, f"❌ TTS generation failed using {provider}"
+                audio_buffer.seek(0)
+            else:
+                # Generate TTS vào file tạm rồi rename, tránh cache file dở dang
+                _, error = _synthesize_to_cache(text, provider, voice)
+                if error:
+                    return None, None, None, error
         
         # Call STT
-        with open(tts_file_path, "rb") as audio_file:
-            stt_response = requests.post(
-                STT_URL,
-                files={
-                    "audio_file": audio_file,
-                    "enhance_speech": (None, "true"),
-                    "postprocess_text": (None, "true"),
-                },
-            )
-        
-        # Clean up temp file
-        os.unlink(tts_file_path)
+        if audio_buffer is not None:
+            stt_response = post_to_stt((tts_file_path.name, audio_buffer, "audio/wav"))
+            
+            # Materialize cho Gradio Audio(type="filepath") và cache
+            partial_path = tts_file_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.part.wav")
+            partial_path.write_bytes(audio_buffer.getbuffer())
+            os.replace(partial_path, tts_file_path)
+            prune_cache()
+        else:
+            with open(tts_file_path, "rb") as audio_file:
+                stt_response = post_to_stt(audio_file)
         
         if stt_response.status_code != 200:
             return None, None, None, f"❌ STT error: {stt_response.status_code}, {stt_response.text}"
@@ -88,18 +205,121 @@ def process_tts_stt(text, provider, voice):
         
         # Calculate similarity
         similarity = calculate_similarity(text, stt_text)
-        is_match = similarity > 0.9  # 90% similarity threshold
         
-        return tts_file_path, stt_text, f"{similarity:.2%}", None
+        return str(tts_file_path), stt_text, f"{similarity:.2%}", None
         
     except Exception as e:
         return None, None, None, f"❌ Error: {str(e)}"
 
+def _synthesize_to_cache(text, provider, voice):
+    """Ensure the TTS audio for text is in the cache. Returns (path, error)."""
+    tts_file_path = get_cache_path(provider, voice, text)
+    if tts_file_path.exists():
+        return tts_file_path, None
+    
+    tts_provider, use_voice = get_tts_provider(provider, voice)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    partial_path = tts_file_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.part.wav")
+    success = tts_provider.synthesize(text, use_voice, partial_path)
+    if not success:
+        partial_path.unlink(missing_ok=True)
+        return None, f"❌ TTS generation failed using {provider}"
+    os.replace(partial_path, tts_file_path)
+    prune_cache()
+    return tts_file_path, None
+
+def process_tts_stt_batch(texts, provider, voice, queue_size=8):
+    """Run TTS → STT for many texts as a two-stage pipeline.
+
+    A producer thread synthesizes (or reuses cached) audio while the caller's
+    thread uploads the previous results to STT, so throughput approaches
+    max(TTS latency, STT latency) instead of their sum. Returns a list of
+    (audio_path, stt_text, similarity, error) tuples in input order.
+    """
+    texts = list(texts)
+    audio_queue = queue.Queue(maxsize=queue_size)
+    done = object()
+    
+    def producer():
+        for index, text in enumerate(texts):
+            try:
+                path, error = _synthesize_to_cache(text, provider, voice)
+            except Exception as e:
+                path, error = None, f"❌ Error: {str(e)}"
+            audio_queue.put((index, path, error))
+        audio_queue.put(done)
+    
+    worker = threading.Thread(target=producer, name="tts-producer", daemon=True)
+    worker.start()
+    
+    results = [None] * len(texts)
+    while True:
+        item = audio_queue.get()
+        if item is done:
+            break
+        index, path, error = item
+        if error:
+            results[index] = (None, None, None, error)
+            continue
+        try:
+            with open(path, "rb") as audio_file:
+                stt_response = post_to_stt(audio_file)
+            if stt_response.status_code != 200:
+                results[index] = (None, None, None, f"❌ STT error: {stt_response.status_code}, {stt_response.text}")
+                continue
+            stt_text = stt_response.json().get("text", "").strip()
+            similarity = calculate_similarity(texts[index], stt_text)
+            results[index] = (str(path), stt_text, f"{similarity:.2%}", None)
+        except Exception as e:
+            results[index] = (None, None, None, f"❌ Error: {str(e)}")
+    
+    worker.join()
+    return results
+
 def calculate_similarity(original, generated):
     """Calculate similarity ratio between original and generated text."""
-    from difflib import SequenceMatcher
+    if ro_ratio is not None:
+        return ro_ratio(original.lower(), generated.lower())
     return SequenceMatcher(None, original.lower(), generated.lower()).ratio()
 
+def calculate_similarity_batch(pairs):
+    """Calculate similarity ratios for a list of (original, generated) pairs.
+
+    With difflib-fast the whole batch is scored in one call, in parallel and
+    outside the GIL (thread count follows RAYON_NUM_THREADS).
+    """
+    lowered = [(a.lower(), b.lower()) for a, b in pairs]
+    if ro_ratio is not None:
+        return list(ro_ratio(lowered))
+    return [SequenceMatcher(None, a, b).ratio() for a, b in lowered]
+
+def calculate_similarity_many(reference, hypotheses):
+    """Calculate similarity of many hypotheses against one reference text.
+
+    The reference is lowercased once and shared by every pair.
+    """
+    ref_lower = reference.lower()
+    lowered = [(ref_lower, h.lower()) for h in hypotheses]
+    if ro_ratio is not None:
+        return list(ro_ratio(lowered))
+    return [SequenceMatcher(None, a, b).ratio() for a, b in lowered]
+
+def is_match(original, generated, threshold=SIMILARITY_THRESHOLD):
+    """Check whether similarity exceeds threshold, exiting early on cheap upper bounds.
+
+    real_quick_ratio() and quick_ratio() are upper bounds of ratio(), so pairs
+    that clearly cannot pass are rejected without the full matching pass.
+    """
+    a, b = original.lower(), generated.lower()
+    if ro_ratio is not None:
+        return ro_ratio(a, b) > threshold
+    matcher = SequenceMatcher(None, a, b)
+    if matcher.real_quick_ratio() <= threshold:
+        return False
+    if matcher.quick_ratio() <= threshold:
+        return False
+    return matcher.ratio() > threshold
+
 def create_tts_stt_tab():
     """Create the TTS/STT tab."""
     with gr.Blocks() as tab:
@@ -177,17 +397,92 @@ def create_tts_stt_tab():
     
     return tab
 
+@functools.lru_cache(maxsize=4096)
+def _g2p_cached(text):
+    """Phonemize một chuỗi; lỗi được raise ra ngoài nên không bị cache"""
+    if _PHONEMIZER is not None:
+        return _PHONEMIZER.phonemize(text, keep_clause_breakers=True).strip()
+    result = subprocess.run(
+        ["espeak-ng", "-v", "vi", "--ipa", "-q", text],
+        capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip()
+
 def vietnamese_g2p(text):
     """Chuyển văn bản tiếng Việt → chuỗi phoneme IPA bằng eSpeak-ng"""
     try:
-        result = subprocess.run(
-            ["espeak-ng", "-v", "vi", "--ipa", "-q", text],
-            capture_output=True, text=True, check=True
-        )
-        return result.stdout.strip()
+        return _g2p_cached(text)
     except Exception as e:
         return f"Error in phoneme conversion: {str(e)}"
 
+def batch_g2p(texts):
+    """Phonemize nhiều câu với một lần gọi espeak-ng (mỗi dòng stdin là một câu).
+
+    Nếu số dòng output không khớp số câu đầu vào thì fallback gọi từng câu.
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+    if _PHONEMIZER is None and not any("\n" in t or not t.strip() for t in texts):
+        try:
+            result = subprocess.run(
+                ["espeak-ng", "-v", "vi", "--ipa", "-q"],
+                input="\n".join(texts), capture_output=True, text=True, check=True
+            )
+            lines = result.stdout.splitlines()
+            if len(lines) == len(texts):
+                return [line.strip() for line in lines]
+        except Exception:
+            pass
+    return [vietnamese_g2p(t) for t in texts]
+
+# Với chuỗi phoneme ngắn, list Python nhanh hơn NumPy (không tốn chi phí boxing/ufunc mỗi hàng)
+_PER_NUMPY_MIN_LEN = 128
+
+def _edit_distance_python(ref, hyp):
+    """Levenshtein distance giữa hai list token bằng DP hai hàng thuần Python"""
+    m = len(hyp)
+    prev = list(range(m + 1))
+    curr = [0] * (m + 1)
+    for i, ref_tok in enumerate(ref, 1):
+        curr[0] = i
+        for j in range(1, m + 1):
+            if ref_tok == hyp[j - 1]:
+                curr[j] = prev[j - 1]
+            else:
+                curr[j] = 1 + min(prev[j], curr[j - 1], prev[j - 1])
+        prev, curr = curr, prev
+    return prev[m]
+
+def _edit_distance_numpy(ref, hyp):
+    """Levenshtein distance giữa hai list token, mỗi hàng DP được tính bằng ufunc NumPy"""
+    import numpy as np
+    
+    n, m = len(ref), len(hyp)
+    # Mã hoá phoneme thành số nguyên để so sánh cả hàng bằng NumPy
+    vocab = {}
+    ref_ids = np.array([vocab.setdefault(tok, len(vocab)) for tok in ref], dtype=np.int32)
+    hyp_ids = np.array([vocab.setdefault(tok, len(vocab)) for tok in hyp], dtype=np.int32)
+    
+    # Wagner–Fischer với hai hàng cấp phát sẵn, hoán đổi sau mỗi hàng (bộ nhớ O(m))
+    cols = np.arange(m + 1, dtype=np.int32)
+    prev = cols.copy()
+    curr = np.empty_like(prev)
+    deletion = np.empty(m, dtype=np.int32)
+    for i in range(1, n + 1):
+        curr[0] = i
+        # Thay thế (prev[j-1] + cost) hoặc xoá (prev[j] + 1)
+        np.add(prev[:-1], hyp_ids != ref_ids[i - 1], out=curr[1:])
+        np.add(prev[1:], 1, out=deletion)
+        np.minimum(curr[1:], deletion, out=curr[1:])
+        # Chuỗi chèn curr[j] = min(curr[j], curr[j-1] + 1) là một prefix-min
+        np.subtract(curr, cols, out=curr)
+        np.minimum.accumulate(curr, out=curr)
+        np.add(curr, cols, out=curr)
+        prev, curr = curr, prev
+    
+    return int(prev[m])
+
 def phoneme_error_rate(ref_phonemes, hyp_phonemes):
     """Tính PER bằng Levenshtein distance"""
     ref = ref_phonemes.split()
@@ -197,21 +492,12 @@ def phoneme_error_rate(ref_phonemes, hyp_phonemes):
     if n == 0:
         return 0.0 if m == 0 else 1.0
     
-    dp = np.zeros((n+1, m+1), dtype=int)
-
-    for i in range(1, n+1): 
-        dp[i][0] = i
-    for j in range(1, m+1): 
-        dp[0][j] = j
-
-    for i in range(1, n+1):
-        for j in range(1, m+1):
-            if ref[i-1] == hyp[j-1]:
-                dp[i][j] = dp[i-1][j-1]
-            else:
-                dp[i][j] = 1 + min(dp[i-1][j], dp[i][j-1], dp[i-1][j-1])
+    if Levenshtein is not None:
+        return Levenshtein.distance(ref, hyp) / n
     
-    return dp[n][m] / n
+    if m < _PER_NUMPY_MIN_LEN:
+        return _edit_distance_python(ref, hyp) / n
+    return _edit_distance_numpy(ref, hyp) / n
 
 def create_phoneme_tab():
     """Create the Phoneme Analysis tab."""
@@ -1,9 +1,11 @@
 import sys
 import os
+import importlib.util
 from pathlib import Path
 
-# Add project root to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Package is resolved from the installed distribution (pip install -e .), no sys.path hacks
+if importlib.util.find_spec("speech_synth_engine") is None:
+    sys.exit("speech_synth_engine is not installed; run `pip install -e .` from the repository root")
 
 from speech_synth_engine.providers.elevenlabs_provider import ElevenLabsProvider
 
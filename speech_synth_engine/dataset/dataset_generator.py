@@ -4,27 +4,36 @@
 # Main engine for TTS generation with multi-provider support
 # ============================================================
 
+import os
+import csv
 import time
-import json
+import hashlib
+import queue
+import threading
+import functools
+import contextlib
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional, Any, Union
+from types import MappingProxyType
+from typing import List, Dict, Tuple, Optional, Any, Union, Iterable, Iterator, Sequence
+from collections.abc import Mapping, Sized
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
 from dataclasses import dataclass
 import logging
-from tqdm import tqdm
+import requests
 from rich.console import Console
 from rich.table import Table
 from rich import box
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn, TimeElapsedColumn
 
 # Import các thành phần đã tạo
-from ..providers.base.provider_factory import ProviderFactory
-from ..providers.base.provider import TTSProvider
+from ..providers.base.provider_factory import provider_factory
+from ..providers.base.provider import TTSProvider, ProviderKind
 from ..schemas.provider import ProviderConfig, VoiceConfig, AudioConfig, ReplicatedVoiceConfig
 from ..schemas.generation import GenerateSpeechConfig, VoiceCloningConfig
 from .directory_manager import DirectoryManager
+from .synthesis_cache import SynthesisCache, _link_or_copy
 
-@dataclass
+@dataclass(slots=True)
 class BaseGenerationResult:
     """Base class for generation results"""
     # Required fields (no default values)
@@ -41,19 +50,36 @@ class BaseGenerationResult:
     file_size: int = 0
     skipped_duplicate: bool = False  # Flag to indicate this was skipped as duplicate
 
-@dataclass
+@dataclass(slots=True)
 class SynthesisResult(BaseGenerationResult):
     """Result of a single synthesis operation"""
     # Optional fields (with default values)
     voice: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class CloneResult(BaseGenerationResult):
     """Result of a single voice clone operation"""
     # Required fields (no default values)
     reference_audio: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
+class _ItemPlan:
+    """A synthesis item waiting for its provider call (see DatasetGenerator._plan_item)"""
+    text_id: str
+    text: str
+    provider_name: str
+    model: str
+    voice: str
+    voice_dir: Path
+    audio_path: Path
+    generation_config: Optional[GenerateSpeechConfig]
+    sample_rate: Optional[int]
+    memo_key: bytes
+    cache_key: Optional[str]
+    cache_lock: Optional[Any]
+    claimed: bool = False  # holds the in-flight claim of memo_key
+
+@dataclass(slots=True)
 class BatchGenerationSummary:
     """Summary of a batch generation"""
     total_texts: int
@@ -63,12 +89,206 @@ class BatchGenerationSummary:
     errors: List[str]
     results: List[Union[SynthesisResult, CloneResult]]
 
+    @classmethod
+    def empty(cls) -> "BatchGenerationSummary":
+        """Identity element for summing summaries"""
+        return cls(total_texts=0, successful_generations=0, failed_generations=0,
+                   total_duration=0.0, errors=[], results=[])
+
+    @classmethod
+    def merge(cls, summaries) -> "BatchGenerationSummary":
+        """Single-pass reduction of many summaries (avoids re-copying lists on every +)"""
+        total = cls.empty()
+        for summary in summaries:
+            total.total_texts += summary.total_texts
+            total.successful_generations += summary.successful_generations
+            total.failed_generations += summary.failed_generations
+            total.total_duration += summary.total_duration
+            total.errors.extend(summary.errors)
+            total.results.extend(summary.results)
+        return total
+
+    def __add__(self, other: "BatchGenerationSummary") -> "BatchGenerationSummary":
+        """Combine two summaries, e.g. functools.reduce(operator.add, summaries, BatchGenerationSummary.empty())"""
+        if not isinstance(other, BatchGenerationSummary):
+            return NotImplemented
+        return BatchGenerationSummary(
+            total_texts=self.total_texts + other.total_texts,
+            successful_generations=self.successful_generations + other.successful_generations,
+            failed_generations=self.failed_generations + other.failed_generations,
+            total_duration=self.total_duration + other.total_duration,
+            errors=self.errors + other.errors,
+            results=self.results + other.results,
+        )
+
+# Ký tự không hợp lệ trong tên file, xoá bằng một lần str.translate
+_SANITIZE_TABLE = str.maketrans({c: None for c in '<>:"/\\|?*'})
+
+
+@functools.lru_cache(maxsize=16384)
+def _sanitize_filename(text: str) -> str:
+    """Sanitize text to create a valid file name (cached: prefixes recur across providers/batches)"""
+    # Remove special characters; str.split() collapses (and strips) whitespace runs
+    sanitized = '_'.join(text.translate(_SANITIZE_TABLE).split())
+
+    # Limit length
+    if len(sanitized) > 50:
+        sanitized = sanitized[:47] + "..."
+
+    return sanitized
+
+
+@functools.lru_cache(maxsize=256)
+def _memo_prefix_state(provider_name: str, model: str, voice: str, sample_rate: Optional[int], ext: str):
+    """blake2b state with the request prefix already absorbed; copy() it per text"""
+    return hashlib.blake2b(f"{provider_name}|{model}|{voice}|{sample_rate}|{ext}|".encode("utf-8"), digest_size=16)
+
+
+def _reference_fingerprint(reference_audio: Optional[str]) -> Optional[str]:
+    """Identity of a clone reference audio for cache keys: resolved path, size and mtime."""
+    if not reference_audio:
+        return None
+    try:
+        st = os.stat(reference_audio)
+    except OSError:
+        return str(reference_audio)
+    return f"{Path(reference_audio).resolve()}:{st.st_size}:{st.st_mtime_ns}"
+
+
+# Default rỗng dùng chung (chỉ đọc), tránh tạo dict mới mỗi lần gọi
+_EMPTY_DICT: Dict[str, Any] = {}
+
+
+def _unpack_provider_result(result: Any) -> Tuple[bool, Optional[float], Any]:
+    """
+    (success, duration, error) from a provider result, read once.
+
+    Providers return a plain dict, the pydantic SynthesisResult schema, or a
+    bare bool (clone()); duration falls back to estimated_duration and is None
+    when the provider did not report one.
+    """
+    if isinstance(result, bool):
+        return result, None, None
+    fields = result if isinstance(result, dict) else (getattr(result, '__dict__', None) or _EMPTY_DICT)
+    duration = fields.get('duration') or fields.get('estimated_duration')
+    try:
+        duration = float(duration) if duration else None
+    except (TypeError, ValueError):
+        duration = None
+    return bool(fields.get('success')), duration, fields.get('error')
+
+
+def _count_hint(items) -> str:
+    """len(items) for logging, or '?' for lazy iterables"""
+    return str(len(items)) if isinstance(items, Sized) else "?"
+
+
+def _file_size(path: Path) -> int:
+    """Size of path with a single stat call; 0 if it does not exist."""
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return 0
+
+
+# Dấu hiệu provider trả về lỗi rate limit / hết quota
+_RATE_LIMIT_MARKERS = ("429", "rate limit", "too many requests", "quota", "resource_exhausted")
+
+
+def _is_rate_limited(error: Any) -> bool:
+    """True if a provider error looks like a rate-limit response"""
+    message = str(error).lower()
+    return any(marker in message for marker in _RATE_LIMIT_MARKERS)
+
+
+# Lỗi mạng tạm thời khi gọi provider: coi như tín hiệu cần giảm tốc.
+# Exception của requests (gTTS, VNPost...) không kế thừa TimeoutError/ConnectionError builtin
+_TRANSIENT_ERRORS = (
+    TimeoutError,
+    ConnectionError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+)
+
+
+def _format_failure(failure: Tuple[str, str, str, bool]) -> str:
+    """Display string for a (text_id, text, error, raised) failure record."""
+    text_id, text, error, raised = failure
+    if raised:
+        return f"Error with text '{text[:50]}...' (ID: {text_id}): {error}"
+    return f"Text '{text[:50]}...' (ID: {text_id}): {error}"
+
+
+class _StopOnError(Exception):
+    """A failed item with continue_on_error=False; already logged and recorded in the batch failures."""
+
+
+class _TokenBucket:
+    """
+    Thread-safe token bucket: `rate_per_sec` request starts per second, bursts up to `burst`.
+
+    A request that already took longer than the interval finds a token waiting,
+    so there is no sleep at all. backoff() halves the rate after a rate-limit
+    response and recover() restores it gradually on successes.
+    A rate of None means unlimited (until the provider pushes back).
+    """
+
+    MIN_RATE_FACTOR = 1 / 16  # backoff never goes below base_rate / 16
+    UNLIMITED_RECOVERY_RATE = 50.0  # backed-off unlimited buckets are released above this
+
+    def __init__(self, rate_per_sec: Optional[float], burst: int = 1):
+        self.base_rate = rate_per_sec if rate_per_sec and rate_per_sec > 0 else None
+        self.rate = self.base_rate
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                if self.rate is None:
+                    return
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+    def backoff(self, multiplier: float = 2.0) -> None:
+        with self._lock:
+            if self.rate is None:
+                self.rate = 1.0
+                self._tokens = 0.0
+                self._last = time.monotonic()
+                return
+            floor = self.base_rate * self.MIN_RATE_FACTOR if self.base_rate else 0.1
+            self.rate = max(self.rate / multiplier, floor)
+
+    def recover(self, multiplier: float = 1.25) -> None:
+        with self._lock:
+            if self.rate is None or self.rate == self.base_rate:
+                return
+            rate = self.rate * multiplier
+            if self.base_rate is None:
+                self.rate = None if rate >= self.UNLIMITED_RECOVERY_RATE else rate
+            else:
+                self.rate = min(rate, self.base_rate)
+
 class DatasetGenerator:
     """
     Dataset generator with multi-provider support, batch processing,
     and automatic directory structure management.
     """
 
+    # Provider instances built from DEFAULT_PROVIDERS_CONFIG, shared by every generator
+    # using it (repeated helper calls reuse the warm provider / its HTTP session)
+    _default_providers: Dict[str, TTSProvider] = {}
+    _default_providers_lock = threading.Lock()
+
     def __init__(
         self, 
         output_dir: str | Path, 
@@ -76,6 +296,10 @@ class DatasetGenerator:
         config_file: Path = None,
         use_rich: bool = True,
         verbose: bool = False,
+        cache_dir: Optional[Path] = None,
+        metadata_flush_every: int = 256,
+        cache_max_bytes: Optional[int] = None,
+        max_concurrency_per_provider: Optional[Dict[str, int]] = None,
     ) -> None:
         """
         Initialize Dataset Generator.
@@ -84,18 +308,52 @@ class DatasetGenerator:
             output_dir: Main output directory (str or Path)
             providers_config: Providers configuration (dict or from file)
             config_file: YAML config file (takes precedence over providers_config)
+            cache_dir: Optional synthesis cache directory; identical requests are
+                hardlinked from the cache instead of calling the provider again
+            cache_max_bytes: Size limit of cache_dir; least recently used entries are evicted
+                after each batch (default: unlimited)
+            metadata_flush_every: Metadata rows buffered per voice before a write;
+                0 writes each voice's rows once, at the end of the batch
+            max_concurrency_per_provider: provider name -> max in-flight requests when a batch
+                runs with enable_concurrency (e.g. {'elevenlabs': 15}); overrides the provider's
+                `max_workers` in providers_config and the batch's max_workers
         """
         self.output_dir = Path(output_dir) if not isinstance(output_dir, Path) else output_dir
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
         # Initialize components
-        self.provider_factory = ProviderFactory()
-        self.directory_manager = DirectoryManager(self.output_dir)
+        # Dùng chung factory toàn cục: provider classes chỉ import/register một lần mỗi process
+        self.provider_factory = provider_factory
+        self.directory_manager = DirectoryManager(self.output_dir, metadata_flush_every=metadata_flush_every)
         self.providers = {}
+        # wav_dir -> {existing audio file name: size} (listed on first use of each wav_dir, updated as files are written)
+        self._existing_audio: Dict[Path, Dict[str, Optional[int]]] = {}
+        self._existing_audio_lock = threading.Lock()
+        # (tts_type, provider, model, voice) -> (voice_dir, wav_dir)
+        self._output_dirs_cache: Dict[Tuple[str, str, str, str], Tuple[Path, Path]] = {}
+        # (model, reference_audio) -> VoiceCloningConfig reused by every clone item
+        self._clone_configs: Dict[Tuple[str, str], Optional[VoiceCloningConfig]] = {}
+        # (provider, rate) -> token bucket; provider -> rate_per_sec from providers_config
+        self._rate_limiters: Dict[Tuple[str, Optional[float]], _TokenBucket] = {}
+        self._rate_limiters_lock = threading.Lock()
+        self._provider_rates: Dict[str, float] = {}
+        # (provider, max_workers) -> thread pool reused across batches; provider -> max_workers from providers_config
+        self._executors: Dict[Tuple[str, int], ThreadPoolExecutor] = {}
+        self._executors_lock = threading.Lock()
+        self._provider_workers: Dict[str, int] = {}
+        # blake2b(provider|model|voice|sample_rate|ext|text) -> (audio_path, duration) already in this
+        # output tree; identical requests are linked instead of synthesized again.
+        # Seeded lazily per voice_dir from its text_audio.tsv.
+        self._synthesis_memo: Dict[bytes, Tuple[Path, float]] = {}
+        self._memo_seeded: set = set()
+        self._memo_lock = threading.Lock()
+        # memo key -> Event của request giống hệt đang gọi provider (set khi xong)
+        self._in_flight: Dict[bytes, threading.Event] = {}
         self.logger = logging.getLogger("DatasetGenerator")
         self.use_rich = use_rich
         self.verbose = verbose
         self.console = Console() if use_rich else None
+        self.cache = SynthesisCache(cache_dir, max_bytes=cache_max_bytes) if cache_dir else None
         
         # Setup file logging
         log_file = self.output_dir / "generation.log"
@@ -111,14 +369,17 @@ class DatasetGenerator:
         # Load providers configuration
         if config_file and config_file.exists():
             self.providers = self.provider_factory.create_providers_from_config(config_file)
+        elif providers_config is DEFAULT_PROVIDERS_CONFIG:
+            with self._default_providers_lock:
+                if not self._default_providers:
+                    self._default_providers.update(self._create_providers(providers_config))
+                self.providers = dict(self._default_providers)
         elif providers_config:
-            # Create providers from dict config
-            for provider_name, config in providers_config.items():
-                try:
-                    provider = self.provider_factory.create_provider(provider_name, config)
-                    self.providers[provider_name] = provider
-                except Exception as e:
-                    self.logger.error(f"❌ Error creating provider {provider_name}: {e}")
+            self.providers = self._create_providers(providers_config)
+
+        # Giới hạn truyền trực tiếp được ưu tiên hơn max_workers trong providers_config
+        for provider_name, limit in (max_concurrency_per_provider or {}).items():
+            self._provider_workers[provider_name] = max(1, int(limit))
 
         if self.use_rich:
             if not self.providers:
@@ -128,81 +389,322 @@ class DatasetGenerator:
         
         self.logger.debug(f"DatasetGenerator initialized with {len(self.providers)} provider(s), output_dir={self.output_dir}")
 
+    def _create_providers(self, providers_config: Mapping[str, Any]) -> Dict[str, TTSProvider]:
+        """Create providers from a dict config, recording their rate_per_sec / max_workers."""
+        providers = {}
+        for provider_name, config in providers_config.items():
+            if isinstance(config, Mapping) and config.get('rate_per_sec'):
+                self._provider_rates[provider_name] = float(config['rate_per_sec'])
+            if isinstance(config, Mapping) and config.get('max_workers'):
+                self._provider_workers[provider_name] = int(config['max_workers'])
+            try:
+                # Factory có thể chuẩn hoá config tại chỗ: truyền bản copy của config read-only
+                if isinstance(config, MappingProxyType):
+                    config = dict(config)
+                providers[provider_name] = self.provider_factory.create_provider(provider_name, config)
+            except Exception as e:
+                self.logger.error(f"❌ Error creating provider {provider_name}: {e}")
+        return providers
+
     def _process_batch(self,
-                      text_items: List[Tuple[str, str]],
+                      text_items: Iterable[Tuple[str, str]],
                       process_fn,
                       batch_size: int = 10,
                       delay_between_requests: float = 2,
                       continue_on_error: bool = True,
                       rich_desc: str = None,
                       enable_concurrency: bool = False,
-                      max_workers: int = 4) -> Tuple[list, list]:
-        """Generic batch processing with error handling and delay. Optional concurrency."""
-        from concurrent.futures import ThreadPoolExecutor, as_completed
+                      max_workers: int = 4,
+                      rate_key: Optional[str] = None,
+                      precheck_fn=None,
+                      chunk_fn=None) -> Tuple[list, list, int]:
+        """
+        Run _iter_batch to completion and collect its results.
+
+        Returns:
+            (successful results, error messages, number of items consumed);
+            len() of the first two are the success / failure counts.
+        """
+        errors: List[str] = []
         all_results = []
-        errors = []
+        batch = self._iter_batch(
+            text_items, process_fn, errors,
+            batch_size=batch_size,
+            delay_between_requests=delay_between_requests,
+            continue_on_error=continue_on_error,
+            rich_desc=rich_desc,
+            enable_concurrency=enable_concurrency,
+            max_workers=max_workers,
+            rate_key=rate_key,
+            precheck_fn=precheck_fn,
+            chunk_fn=chunk_fn,
+        )
+        while True:
+            try:
+                all_results.append(next(batch))
+            except StopIteration as stop:
+                return all_results, errors, stop.value
+
+    def _iter_batch(self,
+                    text_items: Iterable[Tuple[str, str]],
+                    process_fn,
+                    errors: List[str],
+                    batch_size: int = 10,
+                    delay_between_requests: float = 2,
+                    continue_on_error: bool = True,
+                    rich_desc: str = None,
+                    enable_concurrency: bool = False,
+                    max_workers: int = 4,
+                    rate_key: Optional[str] = None,
+                    precheck_fn=None,
+                    chunk_fn=None) -> Iterator[Union[SynthesisResult, CloneResult]]:
+        """
+        Generic batch processing with error handling and delay. Optional concurrency.
+        Yields successful results as they complete; nothing is accumulated here.
+
+        text_items may be any iterable (e.g. a lazy loader); it is consumed once and
+        never materialized. With enable_concurrency, items go through one thread pool
+        with at most max(batch_size * 4, max_workers) requests queued or in flight;
+        delay_between_requests then spaces request starts. Calls with the same
+        rate_key (provider name) share one rate limiter. Selenium providers
+        (kind ProviderKind.SELENIUM) are always processed serially.
+
+        precheck_fn(text_id, text), when given, runs on the calling thread before an
+        item is dispatched; a non-None result (e.g. an output that already exists) is
+        recorded directly, without taking a rate-limit token or a worker slot.
+
+        chunk_fn(items), when given, replaces process_fn: the remaining items are sent
+        in chunks of up to batch_size, and it returns one result per item in order
+        (providers with batched inference, see synthesize_chunk).
+
+        Failed items are logged at debug level only (unless continue_on_error is
+        False); their messages are appended to `errors` once the batch ends.
+        Closing the generator early cancels queued requests.
+
+        Returns (as StopIteration.value):
+            Number of items consumed from text_items.
+        """
+        if enable_concurrency and getattr(self.providers.get(rate_key), 'kind', None) is ProviderKind.SELENIUM:
+            # Một Selenium driver không thread-safe: giữ thứ tự tuần tự
+            self.logger.info(f"ℹ️ {rate_key} is Selenium-driven, processing items serially")
+            enable_concurrency = False
+        failures: List[Tuple[str, str, str, bool]] = []  # (text_id, text, error, raised)
+        succeeded = 0
+        total_items = 0
+        # Một "unit" là danh sách item gửi provider trong một lần gọi: 1 item, hoặc tối đa
+        # batch_size item khi có chunk_fn (provider hỗ trợ batched inference)
+        unit_size = max(1, batch_size) if chunk_fn is not None else 1
+        # delay được áp dụng như rate limit lúc bắt đầu request (token bucket theo provider)
+        # thay vì sleep cố định sau mỗi item; bucket tự giảm tốc khi provider trả về 429
+        rate_limiter = self._get_rate_limiter(rate_key, delay_between_requests)
+
+        def run_unit(unit):
+            rate_limiter.acquire()
+            try:
+                results = chunk_fn(unit) if chunk_fn is not None else [process_fn(*unit[0])]
+            except Exception as e:
+                if isinstance(e, _TRANSIENT_ERRORS) or _is_rate_limited(e):
+                    rate_limiter.backoff()
+                raise
+            if any(result.success for result in results):
+                rate_limiter.recover()
+            elif any(_is_rate_limited(result.error) for result in results):
+                rate_limiter.backoff()
+            return results
+
+        def record(unit, outcome):
+            # outcome: list kết quả, Future, hoặc exception; trả về các kết quả thành công (để yield)
+            try:
+                if isinstance(outcome, Future):
+                    outcome = outcome.result()
+                if isinstance(outcome, BaseException):
+                    raise outcome
+            except Exception as e:
+                for text_id, text in unit:
+                    self._handle_generation_error(failures, (text_id, text, str(e), True), continue_on_error)
+                return []
+            ok = []
+            for (text_id, text), result in zip(unit, outcome):
+                try:
+                    if result.success:
+                        ok.append(result)
+                    else:
+                        self._handle_generation_error(failures, (text_id, text, result.error, False), continue_on_error)
+                except _StopOnError:
+                    raise
+                except Exception as e:
+                    self._handle_generation_error(failures, (text_id, text, str(e), True), continue_on_error)
+            return ok
+
+        expected = len(text_items) if isinstance(text_items, Sized) else None
+        # Import khi cần: chỉ import module để đọc stats thì không phải trả chi phí tqdm
+        from tqdm import tqdm
+
+        # Cập nhật hiển thị tối đa ~1 lần/giây; job nhỏ (< 2 batch) không cần progress bar
+        progress = tqdm(
+            total=expected,
+            desc=rich_desc or "Processing items",
+            mininterval=1.0,
+            miniters=max(1, (expected or 0) // 100),
+            smoothing=0,
+            disable=expected is not None and expected < 2 * batch_size,
+        )
+
+        def advance(unit, ok):
+            # Đếm sẵn số thành công / lỗi, không cần duyệt lại kết quả
+            nonlocal succeeded
+            succeeded += len(ok)
+            progress.set_postfix(ok=succeeded, fail=len(failures), refresh=False)
+            progress.update(len(unit))
+            return ok
+
+        def units():
+            # (unit, kết quả có sẵn hoặc None) theo thứ tự đọc text_items
+            nonlocal total_items
+            todo = []
+            for text_id, text in text_items:
+                total_items += 1
+                if not text.strip():
+                    progress.update(1)
+                    continue
+                # File đã có sẵn: ghi nhận ngay, không gửi sang provider/executor
+                existing = precheck_fn(text_id, text) if precheck_fn is not None else None
+                if existing is not None:
+                    yield [(text_id, text)], [existing]
+                    continue
+                todo.append((text_id, text))
+                if len(todo) >= unit_size:
+                    yield todo, None
+                    todo = []
+            if todo:
+                yield todo, None
+
         try:
-            for i in tqdm(range(0, len(text_items), batch_size), desc=rich_desc or "Processing batches"):
-                batch_items = text_items[i:i+batch_size]
-                if enable_concurrency:
-                    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                        future_to_item = {executor.submit(process_fn, text_id, text): (text_id, text) for text_id, text in batch_items if text.strip()}
-                        for future in as_completed(future_to_item):
-                            text_id, text = future_to_item[future]
-                            try:
-                                result = future.result()
-                                if result.success:
-                                    all_results.append(result)
-                                else:
-                                    self._handle_generation_error(errors, f"Text '{text[:50]}...' (ID: {text_id}): {result.error}", continue_on_error)
-                            except Exception as e:
-                                self._handle_generation_error(errors, f"Error with text '{text[:50]}...' (ID: {text_id}): {e}", continue_on_error)
-                            if delay_between_requests > 0:
-                                time.sleep(delay_between_requests)
-                else:
-                    for text_id, text in batch_items:
-                        if not text.strip():
+            if enable_concurrency:
+                max_workers = self._provider_workers.get(rate_key, max_workers)
+                max_in_flight = max(batch_size * 4 // unit_size, max_workers)
+                executor = self._get_executor(rate_key, max_workers)
+                pending = {}
+                try:
+                    for unit, resolved in units():
+                        if resolved is not None:
+                            yield from advance(unit, record(unit, resolved))
                             continue
+                        if len(pending) >= max_in_flight:
+                            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                done_unit = pending.pop(future)
+                                yield from advance(done_unit, record(done_unit, future))
+                        pending[executor.submit(run_unit, unit)] = unit
+                    while pending:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            done_unit = pending.pop(future)
+                            yield from advance(done_unit, record(done_unit, future))
+                except BaseException:
+                    # Interrupt / stop-on-error / generator closed: drop our queued requests,
+                    # let in-flight ones finish
+                    for future in pending:
+                        future.cancel()
+                    wait(pending)
+                    raise
+                finally:
+                    if rate_key is None:
+                        executor.shutdown(wait=True)
+            else:
+                for unit, resolved in units():
+                    if resolved is None:
                         try:
-                            result = process_fn(text_id, text)
-                            if result.success:
-                                all_results.append(result)
-                            else:
-                                self._handle_generation_error(errors, f"Text '{text[:50]}...' (ID: {text_id}): {result.error}", continue_on_error)
+                            resolved = run_unit(unit)
                         except Exception as e:
-                            self._handle_generation_error(errors, f"Error with text '{text[:50]}...' (ID: {text_id}): {e}", continue_on_error)
-                        if delay_between_requests > 0:
-                            time.sleep(delay_between_requests)
+                            resolved = e
+                    yield from advance(unit, record(unit, resolved))
         except KeyboardInterrupt:
             self.logger.info("⏹️ Generation interrupted by user")
+        except _StopOnError:
+            # Đã log và nằm trong failures: chỉ dừng batch
+            pass
         except Exception as e:
             self.logger.error(f"❌ Critical error: {e}")
             errors.append(f"Critical error: {e}")
-        return all_results, errors
+        finally:
+            progress.close()
+            # Metadata rows (and new cache index rows) are buffered; make them visible once the batch is done
+            self.directory_manager.flush_metadata()
+            if self.cache is not None:
+                self.cache.flush()
+        if failures:
+            self.logger.warning("⚠️ %d item(s) failed in this batch", len(failures))
+        errors[:0] = [_format_failure(failure) for failure in failures]
+        return total_items
+
+    def _get_executor(self, rate_key: Optional[str], max_workers: int) -> ThreadPoolExecutor:
+        """
+        Thread pool for a provider, kept across batch calls (shut down in cleanup_providers).
+        max_workers comes from max_concurrency_per_provider or the provider's `max_workers`
+        in providers_config when given.
+        """
+        if rate_key is None:
+            return ThreadPoolExecutor(max_workers=max_workers)
+        with self._executors_lock:
+            executor = self._executors.get((rate_key, max_workers))
+            if executor is None:
+                executor = self._executors[(rate_key, max_workers)] = ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix=f"synth-{rate_key}"
+                )
+            return executor
 
-    def _handle_generation_error(self, errors: list, error_msg: str, continue_on_error: bool):
-        self.logger.error(f"❌ {error_msg}")
-        errors.append(error_msg)
+    def _get_rate_limiter(self, rate_key: Optional[str], min_interval: float) -> _TokenBucket:
+        """
+        Token bucket for a provider, shared by concurrent batch calls for it.
+        The rate is the provider's `rate_per_sec` from providers_config when given,
+        otherwise 1 / delay_between_requests.
+        """
+        rate = self._provider_rates.get(rate_key) if rate_key is not None else None
+        if rate is None and min_interval and min_interval > 0:
+            rate = 1.0 / min_interval
+        if rate_key is None:
+            return _TokenBucket(rate)
+        with self._rate_limiters_lock:
+            limiter = self._rate_limiters.get((rate_key, rate))
+            if limiter is None:
+                limiter = self._rate_limiters[(rate_key, rate)] = _TokenBucket(rate)
+            return limiter
+
+    def _handle_generation_error(self, failures: list, failure: Tuple[str, str, str, bool], continue_on_error: bool):
+        failures.append(failure)
         if not continue_on_error:
-            raise Exception(error_msg)
+            error_msg = _format_failure(failure)
+            self.logger.error("❌ %s", error_msg)
+            # _iter_batch dừng batch mà không log / ghi lỗi này lần nữa
+            raise _StopOnError(error_msg)
+        self.logger.debug("❌ Item %s failed: %s", failure[0], failure[2])
 
     def synthesize_from_text_list(self, 
-                                 text_items: List[Tuple[str, str]],
+                                 text_items: Iterable[Tuple[str, str]],
                                  provider_model_voice: Tuple[str, str, str],
                                  batch_size: int = 10,
                                  delay_between_requests: float = 2,
                                  continue_on_error: bool = True,
-                                 generation_config: Optional[GenerateSpeechConfig] = None
+                                 generation_config: Optional[GenerateSpeechConfig] = None,
+                                 enable_concurrency: bool = False,
+                                 max_workers: int = 4
                                  ) -> BatchGenerationSummary:
         """
         Synthesize audio from text list with IDs using a single provider configuration.
 
+        Repeated texts are linked to their first synthesis instead of calling the provider
+        again; with concurrency, a repeat waits for an identical request still in flight.
+
         Args:
-            text_items: List of (id, text) tuples to generate
+            text_items: (id, text) tuples to generate; any iterable, consumed lazily
             provider_model_voice: A tuple of (provider, model, voice)
-            batch_size: Number of texts to process in each batch
+            batch_size: With concurrency, bounds queued work to batch_size * 4 items; providers with
+                batched inference (supports_batch_inference) get texts in chunks of batch_size
             delay_between_requests: Delay between requests (seconds)
             continue_on_error: Continue if error occurs
+            enable_concurrency: Send requests from a thread pool; the delay then acts as a rate limit
+            max_workers: Number of worker threads when concurrency is enabled
 
         Returns:
             BatchGenerationSummary containing summary of results
@@ -212,56 +714,111 @@ class DatasetGenerator:
 
 
         provider_name, model, voice = provider_model_voice
-        self.logger.info(f"🚀 Starting synthesize generation with {len(text_items)} text items using provider {provider_name} (model: {model}, voice: {voice})")
+        self.logger.info(f"🚀 Starting synthesize generation with {_count_hint(text_items)} text items using provider {provider_name} (model: {model}, voice: {voice})")
 
-        total_start_time = time.time()
-        provider_name, model, voice = provider_model_voice
-        def synth_fn(text_id, text):
-            return self._generate_single_text(
-                text_id, text, provider_name, model, voice, "synthesize", generation_config=generation_config
-            )
-        all_results, errors = self._process_batch(
+        return self._run_batch(
             text_items,
-            synth_fn,
+            provider_name,
+            *self._item_fns("synthesize", provider_name, model, voice, generation_config=generation_config),
             batch_size=batch_size,
             delay_between_requests=delay_between_requests,
             continue_on_error=continue_on_error,
-            rich_desc="Synthesizing batches"
-        )
-        total_duration = time.time() - total_start_time
-        successful = len([r for r in all_results if r.success])
-        failed = len(errors)
-        summary = BatchGenerationSummary(
-            total_texts=len(text_items),
-            successful_generations=successful,
-            failed_generations=failed,
-            total_duration=total_duration,
-            errors=errors,
-            results=all_results
+            rich_desc="Synthesizing batches",
+            enable_concurrency=enable_concurrency,
+            max_workers=max_workers,
         )
-        self._log_summary(summary)
-        return summary
+
+    def synthesize_stream(self,
+                          text_items: Iterable[Tuple[str, str]],
+                          provider_model_voice: Tuple[str, str, str],
+                          results_path: Optional[Path] = None,
+                          batch_size: int = 10,
+                          delay_between_requests: float = 2,
+                          continue_on_error: bool = True,
+                          generation_config: Optional[GenerateSpeechConfig] = None,
+                          enable_concurrency: bool = False,
+                          max_workers: int = 4
+                          ) -> Iterator[SynthesisResult]:
+        """
+        Streaming variant of synthesize_from_text_list for very large corpora.
+
+        Yields each successful SynthesisResult as it completes instead of collecting
+        them in a BatchGenerationSummary, and appends one compact JSON row per result
+        to results_path (default: output_dir/results.jsonl). Memory use stays flat
+        regardless of the number of items. Failures are logged as in the list API.
+
+        Args:
+            text_items: (id, text) tuples to generate; any iterable, consumed lazily
+            provider_model_voice: A tuple of (provider, model, voice)
+            results_path: JSONL file the results are appended to
+            (other arguments as in synthesize_from_text_list)
+
+        Yields:
+            SynthesisResult for each successfully generated (or already existing) item
+        """
+        import json
+
+        provider_name, model, voice = provider_model_voice
+        results_path = Path(results_path) if results_path else self.output_dir / "results.jsonl"
+        self.logger.info(f"🚀 Starting streaming synthesize generation using provider {provider_name} (model: {model}, voice: {voice})")
+
+        single_fn, precheck_fn, chunk_fn = self._item_fns("synthesize", provider_name, model, voice, generation_config=generation_config)
+        errors: List[str] = []
+        succeeded = 0
+        with open(results_path, "a", encoding="utf-8", buffering=1 << 16) as results_file:
+            for result in self._iter_batch(
+                text_items,
+                single_fn,
+                errors,
+                batch_size=batch_size,
+                delay_between_requests=delay_between_requests,
+                continue_on_error=continue_on_error,
+                rich_desc="Synthesizing (streaming)",
+                enable_concurrency=enable_concurrency,
+                max_workers=max_workers,
+                rate_key=provider_name,
+                precheck_fn=precheck_fn,
+                chunk_fn=chunk_fn,
+            ):
+                results_file.write(json.dumps({
+                    "text": result.text,
+                    "audio_path": str(result.audio_path),
+                    "duration": result.duration,
+                    "file_size": result.file_size,
+                    "skipped_duplicate": result.skipped_duplicate,
+                    "provider": result.provider,
+                    "model": result.model,
+                    "voice": result.voice,
+                }, ensure_ascii=False))
+                results_file.write("\n")
+                succeeded += 1
+                yield result
+        self.logger.info("📊 Streamed %d result(s) to %s, %d error(s)", succeeded, results_path, len(errors))
 
     # Removed synthesize_from_text_list_config: superseded by generate_from_configs()
 
     def clone_from_text_list(self, 
-                           text_items: List[Tuple[str, str]],
+                           text_items: Iterable[Tuple[str, str]],
                            provider_model_voice: Tuple[str, str, str],
                            reference_audio: Path,
                            batch_size: int = 10,
                            delay_between_requests: float = 2,
-                           continue_on_error: bool = True
+                           continue_on_error: bool = True,
+                           enable_concurrency: bool = False,
+                           max_workers: int = 4
                            ) -> BatchGenerationSummary:
         """
         Clone voice from reference audio for a list of texts using a single provider configuration.
 
         Args:
-            text_items: List of (id, text) tuples to generate.
+            text_items: (id, text) tuples to generate; any iterable, consumed lazily.
             provider_model_voice: A tuple of (provider, model, voice).
             reference_audio: Path to the reference audio file for cloning.
-            batch_size: Number of texts to process in each batch.
+            batch_size: With concurrency, bounds queued work to batch_size * 4 items.
             delay_between_requests: Delay between requests in seconds.
             continue_on_error: Continue if an error occurs.
+            enable_concurrency: Send requests from a thread pool; the delay then acts as a rate limit.
+            max_workers: Number of worker threads when concurrency is enabled.
 
         Returns:
             A summary of the batch generation results.
@@ -274,65 +831,113 @@ class DatasetGenerator:
             raise ValueError("Empty text_items list")
 
         provider_name, model, voice = provider_model_voice
-        self.logger.info(f"🚀 Starting clone generation with {len(text_items)} text items for provider '{provider_name}'")
+        self.logger.info(f"🚀 Starting clone generation with {_count_hint(text_items)} text items for provider '{provider_name}'")
 
 
-        total_start_time = time.time()
-        provider_name, model, voice = provider_model_voice
-        provider = self.providers.get(provider_name)
-        if not provider:
+        if provider_name not in self.providers:
             raise ValueError(f"Provider {provider_name} not found")
-        def clone_fn(text_id, text):
-            return self.clone_single_text(
-                text_id=text_id,
-                text=text,
-                provider_name=provider_name,
-                reference_audio=reference_audio,
-                voice=voice,
-                model=model
-            )
-        all_results, errors = self._process_batch(
+        return self._run_batch(
             text_items,
-            clone_fn,
+            provider_name,
+            *self._item_fns("clone", provider_name, model, voice, reference_audio=reference_audio),
             batch_size=batch_size,
             delay_between_requests=delay_between_requests,
             continue_on_error=continue_on_error,
-            rich_desc=f"Cloning with {provider_name}"
+            rich_desc=f"Cloning with {provider_name}",
+            enable_concurrency=enable_concurrency,
+            max_workers=max_workers,
         )
-        total_duration = time.time() - total_start_time
-        summary = BatchGenerationSummary(
-            total_texts=len(text_items),
-            successful_generations=len([r for r in all_results if r.success]),
-            failed_generations=len(errors),
-            total_duration=total_duration,
-            errors=errors,
-            results=all_results
+
+    def _item_fns(self, tts_type: str, provider_name: str, model: str, voice: str,
+                  generation_config: Optional[GenerateSpeechConfig] = None,
+                  reference_audio: Optional[Path] = None):
+        """
+        (single_fn, precheck_fn, chunk_fn) for one provider/model/voice: single_fn(text_id, text)
+        generates one item, precheck_fn(text_id, text) returns the result of an
+        output that already exists (or None), chunk_fn(items) synthesizes several
+        items in one call when the provider supports batched inference (else None).
+        """
+        chunk_fn = None
+        if tts_type == "clone":
+            # Cùng quy tắc đặt tên model như clone_single_text; tên file và fingerprint của
+            # reference audio chỉ tính một lần cho cả batch
+            model = model or Path(reference_audio).name
+            single_fn = functools.partial(
+                self.clone_single_text,
+                provider_name=provider_name,
+                reference_audio=reference_audio,
+                voice=voice,
+                model=model,
+                reference_fingerprint=_reference_fingerprint(reference_audio) if self.cache is not None else None,
+            )
+            ext = ".wav"
+        else:
+            single_fn = functools.partial(
+                self._generate_single_text,
+                provider_name=provider_name,
+                model=model,
+                voice=voice,
+                tts_type="synthesize",
+                generation_config=generation_config,
+            )
+            ext = self._desired_ext(generation_config)
+            if getattr(self.providers.get(provider_name), 'supports_batch_inference', False):
+                chunk_fn = functools.partial(
+                    self.synthesize_chunk,
+                    provider_name=provider_name,
+                    model=model,
+                    voice=voice,
+                    generation_config=generation_config,
+                )
+        precheck_fn = functools.partial(
+            self._existing_output_result, tts_type,
+            provider_name=provider_name, model=model, voice=voice, ext=ext, reference_audio=reference_audio,
+        )
+        return single_fn, precheck_fn, chunk_fn
+
+    def _run_batch(self, text_items: Iterable[Tuple[str, str]], provider_name: str,
+                   single_fn, precheck_fn=None, chunk_fn=None, **batch_kwargs) -> BatchGenerationSummary:
+        """Run single_fn over text_items through _process_batch, then build and log the summary."""
+        total_start_time = time.time()
+        all_results, errors, total_items = self._process_batch(
+            text_items,
+            single_fn,
+            rate_key=provider_name,
+            precheck_fn=precheck_fn,
+            chunk_fn=chunk_fn,
+            **batch_kwargs,
         )
+        summary = self._build_batch_summary(total_items, all_results, errors, total_start_time)
         self._log_summary(summary)
         return summary
 
     def generate_from_text_list(self, 
-                              text_items: List[Tuple[str, str]],
+                              text_items: Iterable[Tuple[str, str]],
                               provider_model_voice: Tuple[str, str, str],
                               batch_size: int = 10,
                               delay_between_requests: float = 3,
                               continue_on_error: bool = True,
                               tts_type: str = "synthesize",
                               reference_audio: Optional[Path] = None,
-                              generation_config: Optional[GenerateSpeechConfig] = None
+                              generation_config: Optional[GenerateSpeechConfig] = None,
+                              enable_concurrency: bool = False,
+                              max_workers: int = 4
                               ) -> BatchGenerationSummary:
         """
         Generate audio from text list with IDs using a single provider.
         This is a convenience method that routes to either synthesize_from_text_list or clone_from_text_list.
         
         Args:
-            text_items: List of (id, text) tuples to generate
+            text_items: (id, text) tuples to generate; any iterable, consumed lazily
             provider_model_voice: A tuple of (provider, model, voice) for synthesis or cloning
             batch_size: Number of texts to process in each batch (default: 10)
             delay_between_requests: Delay between requests in seconds (default: 3.0)
             continue_on_error: Whether to continue processing if an error occurs (default: True)
             tts_type: Type of operation - "synthesize" or "clone" (default: "synthesize")
             reference_audio: Required for clone operations, path to reference audio file (default: None)
+            enable_concurrency: Overlap requests in a thread pool; delay_between_requests then spaces
+                request starts instead of sleeping after each item (default: False)
+            max_workers: Number of worker threads when concurrency is enabled (default: 4)
 
         Returns:
             BatchGenerationSummary: Object containing summary of the generation results
@@ -359,14 +964,7 @@ class DatasetGenerator:
         # Input validation
         if not text_items:
             self.logger.warning("No text items provided for generation")
-            return BatchGenerationSummary(
-                total_texts=0,
-                successful_generations=0,
-                failed_generations=0,
-                total_duration=0.0,
-                errors=[],
-                results=[]
-            )
+            return BatchGenerationSummary.empty()
             
         if not provider_model_voice:
             raise ValueError("Provider configuration must be provided")
@@ -384,7 +982,7 @@ class DatasetGenerator:
         if tts_type == "clone" and not reference_audio.exists():
             raise FileNotFoundError(f"Reference audio file not found: {reference_audio}")
         
-        self.logger.info(f"Starting {tts_type} operation for {len(text_items)} text items with provider configuration {provider_model_voice}")
+        self.logger.info(f"Starting {tts_type} operation for {_count_hint(text_items)} text items with provider configuration {provider_model_voice}")
         
         # Route to the appropriate method
         if tts_type == "synthesize":
@@ -395,6 +993,8 @@ class DatasetGenerator:
                 delay_between_requests=delay_between_requests,
                 continue_on_error=continue_on_error,
                 generation_config=generation_config,
+                enable_concurrency=enable_concurrency,
+                max_workers=max_workers,
             )
         else:  # clone
             return self.clone_from_text_list(
@@ -403,7 +1003,9 @@ class DatasetGenerator:
                 reference_audio=reference_audio,
                 batch_size=batch_size,
                 delay_between_requests=delay_between_requests,
-                continue_on_error=continue_on_error
+                continue_on_error=continue_on_error,
+                enable_concurrency=enable_concurrency,
+                max_workers=max_workers,
             )
 
     def generate_from_configs(self,
@@ -509,14 +1111,7 @@ class DatasetGenerator:
         without routing through generate_from_text_list.
         """
         if not text_items:
-            return BatchGenerationSummary(
-                total_texts=0,
-                successful_generations=0,
-                failed_generations=0,
-                total_duration=0.0,
-                errors=[],
-                results=[]
-            )
+            return BatchGenerationSummary.empty()
 
         tts_type = (tts_type or "synthesize").lower()
         if tts_type not in ("synthesize", "clone"):
@@ -531,34 +1126,12 @@ class DatasetGenerator:
 
         self._log_generation_start(provider_name, model, voice, tts_type, text_items)
 
-        all_results: List[Union[SynthesisResult, CloneResult]] = []
-        errors: List[str] = []
-        total_start_time = time.time()
-
-        # Sử dụng _process_batch cho logic xử lý batch, concurrency
-        def batch_fn(text_id, text):
-            if tts_type == "synthesize":
-                return self._generate_single_text(
-                    text_id=text_id,
-                    text=text,
-                    provider_name=provider_name,
-                    model=model,
-                    voice=voice,
-                    tts_type="synthesize",
-                    generation_config=generation_config,
-                )
-            else:
-                return self.clone_single_text(
-                    text_id=text_id,
-                    text=text,
-                    provider_name=provider_name,
-                    reference_audio=reference_audio,
-                    voice=voice,
-                    model=model,
-                )
-        all_results, errors = self._process_batch(
+        # Sử dụng _run_batch / _process_batch cho logic xử lý batch, concurrency
+        return self._run_batch(
             text_items,
-            batch_fn,
+            provider_name,
+            *self._item_fns(tts_type, provider_name, model, voice,
+                            generation_config=generation_config, reference_audio=reference_audio),
             batch_size=batch_size,
             delay_between_requests=delay_between_requests,
             continue_on_error=continue_on_error,
@@ -566,12 +1139,9 @@ class DatasetGenerator:
             enable_concurrency=enable_concurrency,
             max_workers=max_workers,
         )
-        summary = self._build_batch_summary(text_items, all_results, errors, total_start_time)
-        self._log_summary(summary)
-        return summary
 
     def _log_generation_start(self, provider_name: str, model: str, voice: str, tts_type: str, text_items: list):
-        self.logger.debug(f"Starting {tts_type} generation: provider={provider_name}, model={model}, voice={voice}, items={len(text_items)}")
+        self.logger.debug(f"Starting {tts_type} generation: provider={provider_name}, model={model}, voice={voice}, items={_count_hint(text_items)}")
         if self.use_rich and self.console:
             self._print_generation_panel(provider_name, model, voice, tts_type, text_items)
 
@@ -582,19 +1152,19 @@ class DatasetGenerator:
             f"[cyan]Model:[/cyan] {model}\n"
             f"[cyan]Voice:[/cyan] {voice}\n"
             f"[cyan]Type:[/cyan] {tts_type}\n"
-            f"[cyan]Items:[/cyan] {len(text_items)}",
+            f"[cyan]Items:[/cyan] {_count_hint(text_items)}",
             title=f"🚀 {panel_title}",
             border_style="green",
             expand=False
         )
         self.console.print(start_panel)
 
-    def _build_batch_summary(self, text_items, all_results, errors, total_start_time):
+    def _build_batch_summary(self, total_items: int, all_results, errors, total_start_time):
         total_duration = time.time() - total_start_time
-        successful = len([r for r in all_results if r.success])
+        successful = len(all_results)
         failed = len(errors)
         return BatchGenerationSummary(
-            total_texts=len(text_items),
+            total_texts=total_items,
             successful_generations=successful,
             failed_generations=failed,
             total_duration=total_duration,
@@ -603,6 +1173,228 @@ class DatasetGenerator:
         )
 
 
+    def _output_dirs(self, tts_type: str, provider_name: str, model: str, voice: str) -> Tuple[Path, Path]:
+        """(voice_dir, wav_dir) for a provider/model/voice, created on first use and cached."""
+        key = (tts_type, provider_name, model, voice)
+        dirs = self._output_dirs_cache.get(key)
+        if dirs is None:
+            if tts_type == "clone":
+                dirs = self.directory_manager.create_provider_structure_clone(provider_name, model, voice)
+            else:
+                dirs = self.directory_manager.create_output_directory(provider_name, model, voice)
+            self._output_dirs_cache[key] = dirs
+        return dirs
+
+    @staticmethod
+    def _scan_files(directory: str) -> Dict[str, Optional[int]]:
+        """
+        Regular files in directory as {name: size}. Sizes start as None and are
+        filled in on first use (DirEntry caches the type, no per-file stat here).
+        """
+        try:
+            with os.scandir(directory) as entries:
+                return {entry.name: None for entry in entries if entry.is_file()}
+        except (FileNotFoundError, NotADirectoryError):
+            return {}
+
+    def _existing_audio_names(self, wav_dir: Path) -> Dict[str, Optional[int]]:
+        """Return {file name: size or None} for wav_dir, listing the directory only once."""
+        with self._existing_audio_lock:
+            files = self._existing_audio.get(wav_dir)
+            if files is None:
+                files = self._scan_files(str(wav_dir))
+                self._existing_audio[wav_dir] = files
+            return files
+
+    def _existing_audio_size(self, audio_path: Path) -> int:
+        """Size of an audio file known to exist, stat'ed at most once per run."""
+        files = self._existing_audio_names(audio_path.parent)
+        size = files.get(audio_path.name)
+        if size is None:
+            size = files[audio_path.name] = _file_size(audio_path)
+        return size
+
+    def _mark_audio_written(self, audio_path: Path) -> int:
+        """Record a newly written audio file (and its size) in the existing-files cache; returns the size."""
+        size = _file_size(audio_path)
+        with self._existing_audio_lock:
+            files = self._existing_audio.get(audio_path.parent)
+            if files is not None:
+                files[audio_path.name] = size
+        return size
+
+    @staticmethod
+    def _desired_ext(generation_config: Optional[GenerateSpeechConfig]) -> str:
+        """Output extension from GenerateSpeechConfig.audio_config.container (default .wav)."""
+        try:
+            container_val = None
+            if generation_config and getattr(generation_config, 'audio_config', None):
+                container_val = getattr(generation_config.audio_config, 'container', None)
+            if isinstance(container_val, str):
+                ext_map = {
+                    'wav': '.wav',
+                    'mp3': '.mp3',
+                    # 'raw': '.raw',
+                }
+                return ext_map.get(container_val.lower(), '.wav')
+        except Exception:
+            # Fallback to default .wav if anything unexpected happens
+            pass
+        return ".wav"
+
+    def _audio_filename(self, text_id: str, text: str, ext: str) -> str:
+        return f"{text_id}_{_sanitize_filename(text[:50])}{ext}"
+
+    def _existing_output_result(self, tts_type: str, text_id: str, text: str, provider_name: str,
+                                model: str, voice: str, ext: str = ".wav",
+                                reference_audio=None) -> Optional[Union[SynthesisResult, CloneResult]]:
+        """
+        Skipped-duplicate result when the output file for (text_id, text) already exists,
+        otherwise None. The cached directory listing rules out new files without a stat;
+        a listed file is checked on disk before it is skipped.
+        """
+        if provider_name not in self.providers:
+            return None
+        voice_dir, wav_dir = self._output_dirs(tts_type, provider_name, model, voice)
+        audio_filename = self._audio_filename(text_id, text, ext)
+        existing = self._existing_audio_names(wav_dir)
+        if audio_filename not in existing:
+            return None
+        audio_path = wav_dir / audio_filename
+        if not audio_path.exists():
+            # Xoá sau khi listing: generate lại
+            with self._existing_audio_lock:
+                existing.pop(audio_filename, None)
+            return None
+        self.logger.info("⚠️ Audio file already exists, skipping: %s", audio_path)
+        if tts_type == "clone":
+            return CloneResult(
+                success=True,
+                text=text,
+                provider=provider_name,
+                model=model,
+                audio_path=audio_path,
+                metadata_path=voice_dir,  # Point to the directory
+                duration=0,
+                file_size=self._existing_audio_size(audio_path),
+                reference_audio=reference_audio,
+                skipped_duplicate=True,
+            )
+        return SynthesisResult(
+            success=True,
+            text=text,
+            provider=provider_name,
+            model=model,
+            audio_path=audio_path,
+            metadata_path=voice_dir,  # Point to the directory
+            duration=0,
+            file_size=self._existing_audio_size(audio_path),
+            voice=voice,
+            skipped_duplicate=True
+        )
+
+    def _clone_config(self, model: str, reference_audio) -> Optional[VoiceCloningConfig]:
+        """VoiceCloningConfig for (model, reference_audio), validated once and shared by all items (read-only)."""
+        key = (model, str(reference_audio))
+        vc_cfg = self._clone_configs.get(key, False)
+        if vc_cfg is False:
+            try:
+                vc_cfg = VoiceCloningConfig(
+                    model=model or "OmniVoice",
+                    voice_config=ReplicatedVoiceConfig(
+                        reference_audio=str(reference_audio),
+                        reference_text=None,
+                        language="vi",
+                    ),
+                )
+            except Exception:
+                # Fallback minimal config in case dataclasses are unavailable
+                vc_cfg = None
+            self._clone_configs[key] = vc_cfg
+        return vc_cfg
+
+    @staticmethod
+    def _memo_key(provider_name: str, model: str, voice: str, sample_rate: Optional[int], ext: str, text: str) -> bytes:
+        # Prefix chung cho cả batch chỉ hash một lần; mỗi text chỉ cần copy() + update()
+        hasher = _memo_prefix_state(provider_name, model, voice, sample_rate, ext).copy()
+        hasher.update(text.encode("utf-8"))
+        return hasher.digest()
+
+    def _seed_memo(self, voice_dir: Path, wav_dir: Path, provider_name: str, model: str, voice: str) -> None:
+        """Load the (text -> audio) rows of an existing voice_dir into the memo; caller holds _memo_lock."""
+        if voice_dir in self._memo_seeded:
+            return
+        self._memo_seeded.add(voice_dir)
+        tsv_path = voice_dir / "text_audio.tsv"
+        if not tsv_path.is_file():
+            return
+        import json
+        try:
+            with open(voice_dir / "metadata.json", "rb") as f:
+                sample_rate = json.loads(f.read()).get("sampling_rate")
+        except (OSError, ValueError):
+            sample_rate = None
+        existing = self._existing_audio_names(wav_dir)
+        try:
+            with open(tsv_path, "r", encoding="utf-8", newline="") as f:
+                for row in csv.DictReader(f, delimiter="\t"):
+                    rel_path = row.get("audio_path") or ""
+                    audio_path = voice_dir / rel_path
+                    if not rel_path or audio_path.name not in existing:
+                        continue
+                    try:
+                        duration = float(row.get("duration") or 0)
+                    except ValueError:
+                        duration = 0.0
+                    key = self._memo_key(provider_name, model, voice, sample_rate, audio_path.suffix, row.get("text") or "")
+                    self._synthesis_memo.setdefault(key, (audio_path, duration))
+        except (OSError, csv.Error) as e:
+            self.logger.warning(f"⚠️ Could not read {tsv_path} for deduplication: {e}")
+
+    def _reuse_memoized(self, memo_key: bytes, audio_path: Path, voice_dir: Path, wav_dir: Path,
+                        provider_name: str, model: str, voice: str) -> Optional[float]:
+        """Hardlink/copy an identical earlier synthesis to audio_path. Returns its duration, or None on miss."""
+        with self._memo_lock:
+            self._seed_memo(voice_dir, wav_dir, provider_name, model, voice)
+            hit = self._synthesis_memo.get(memo_key)
+        if hit is None or hit[0] == audio_path:
+            return None
+        source_path, duration = hit
+        try:
+            _link_or_copy(source_path, audio_path)
+        except OSError as e:
+            self.logger.debug("Could not reuse %s: %s", source_path, e)
+            return None
+        self.logger.debug("Reused identical synthesis %s -> %s", source_path, audio_path)
+        return duration
+
+    def _remember_synthesis(self, memo_key: bytes, audio_path: Path, duration: float) -> None:
+        with self._memo_lock:
+            self._synthesis_memo.setdefault(memo_key, (audio_path, duration))
+
+    def _claim_synthesis(self, memo_key: bytes) -> Optional[threading.Event]:
+        """
+        Claim memo_key for a provider call. Returns None when claimed, otherwise an Event
+        that is set once the identical request in flight finishes (already set when its
+        output is in the memo by now).
+        """
+        with self._memo_lock:
+            if memo_key in self._synthesis_memo:
+                done = threading.Event()
+                done.set()
+                return done
+            pending = self._in_flight.get(memo_key)
+            if pending is None:
+                self._in_flight[memo_key] = threading.Event()
+            return pending
+
+    def _release_synthesis(self, memo_key: bytes) -> None:
+        """Release a claim from _claim_synthesis and wake up requests waiting on it."""
+        with self._memo_lock:
+            pending = self._in_flight.pop(memo_key, None)
+        if pending is not None:
+            pending.set()
+
     def synthesize_single_text(self, text_id: str, text: str, provider_name: str,
                              model: str, voice: str,
                              generation_config: Optional[GenerateSpeechConfig] = None
@@ -619,6 +1411,74 @@ class DatasetGenerator:
         Returns:
             SynthesisResult containing the result of the synthesis operation
         """
+        plan = self._plan_item(text_id, text, provider_name, model, voice, generation_config)
+        if isinstance(plan, SynthesisResult):
+            return plan
+        try:
+            synth_result = self.providers[provider_name].synthesize_with_metadata(
+                text, plan.audio_path, generation_config=plan.generation_config
+            )
+        except Exception as e:
+            return self._finish_item(plan, error=e)
+        return self._finish_item(plan, synth_result)
+
+    def synthesize_chunk(self, items: List[Tuple[str, str]], provider_name: str, model: str, voice: str,
+                         generation_config: Optional[GenerateSpeechConfig] = None) -> List[SynthesisResult]:
+        """
+        Synthesize several texts with one provider.synthesize_many() call (batched inference).
+
+        Existing outputs, memo and cache hits are resolved per item first; only the
+        remaining texts go to the provider. Results are returned in input order.
+        """
+        results: List[Optional[SynthesisResult]] = [None] * len(items)
+        planned: List[Tuple[int, _ItemPlan]] = []
+        planned_keys = set()
+        repeats: List[int] = []
+        for index, (text_id, text) in enumerate(items):
+            # Không giữ cache key lock: nhiều lock (striped) giữ cùng lúc có thể deadlock giữa các chunk
+            plan = self._plan_item(text_id, text, provider_name, model, voice, generation_config,
+                                   lock_cache=False, wait_in_flight=False)
+            if isinstance(plan, SynthesisResult):
+                results[index] = plan
+            elif plan.memo_key in planned_keys:
+                # Text lặp trong cùng chunk: link tới bản đầu sau khi chunk synthesize xong
+                repeats.append(index)
+            else:
+                planned_keys.add(plan.memo_key)
+                planned.append((index, plan))
+        if planned:
+            try:
+                synth_results = self.providers[provider_name].synthesize_many(
+                    [plan.text for _, plan in planned],
+                    [plan.audio_path for _, plan in planned],
+                    generation_config=planned[0][1].generation_config,
+                )
+                if len(synth_results) != len(planned):
+                    raise ValueError(f"synthesize_many returned {len(synth_results)} results for {len(planned)} texts")
+            except Exception as e:
+                for index, plan in planned:
+                    results[index] = self._finish_item(plan, error=e)
+            else:
+                for (index, plan), synth_result in zip(planned, synth_results):
+                    results[index] = self._finish_item(plan, synth_result)
+        for index in repeats:
+            text_id, text = items[index]
+            results[index] = self.synthesize_single_text(text_id, text, provider_name, model, voice, generation_config)
+        return results
+
+    def _plan_item(self, text_id: str, text: str, provider_name: str, model: str, voice: str,
+                   generation_config: Optional[GenerateSpeechConfig] = None,
+                   lock_cache: bool = True, wait_in_flight: bool = True) -> Union[SynthesisResult, "_ItemPlan"]:
+        """
+        Steps of synthesize_single_text before the provider call.
+
+        Returns the final SynthesisResult when no provider call is needed (missing
+        provider, existing output, memo / cache hit, error). Otherwise returns an
+        _ItemPlan (output path, effective config, cache key...) for the caller to
+        synthesize and then pass to _finish_item(). With lock_cache, the plan holds
+        the cache key lock until _finish_item() releases it. With wait_in_flight, a text
+        identical to one whose provider call is in flight waits for it and is linked.
+        """
         provider = self.providers.get(provider_name)
         if not provider:
             return SynthesisResult(
@@ -636,51 +1496,27 @@ class DatasetGenerator:
         # Sanitize voice name - extract base voice name if it contains path separators
         # For cases like 'vi/shards/shard_0', we want to extract 'vi' (the first part)
         clean_voice = voice.split('/')[0] if '/' in voice else voice
+        sample_rate = provider.sample_rate
 
+        # Held from cache lookup until the result is stored, so concurrent identical
+        # requests synthesize once and the others hit the cache
+        cache_lock = None
+        claimed_key = None
         try:
-            # Create directory structure for synthesis
-            voice_dir, wav_dir = self.directory_manager.create_output_directory(
-                provider_name, model, voice
-            )
+            # Create directory structure for synthesis (once per provider/model/voice)
+            voice_dir, wav_dir = self._output_dirs("synthesize", provider_name, model, voice)
 
             # Determine desired container/extension from GenerateSpeechConfig.audio_config.container
-            desired_ext = ".wav"
-            try:
-                container_val = None
-                if generation_config and getattr(generation_config, 'audio_config', None):
-                    container_val = getattr(generation_config.audio_config, 'container', None)
-                if isinstance(container_val, str):
-                    ext_map = {
-                        'wav': '.wav',
-                        'mp3': '.mp3',
-                        # 'raw': '.raw',
-                    }
-                    desired_ext = ext_map.get(container_val.lower(), '.wav')
-            except Exception:
-                # Fallback to default .wav if anything unexpected happens
-                desired_ext = ".wav"
-
-            # Create file name using text_id from input
-            safe_text = self._sanitize_filename(text[:50])
-            audio_filename = f"{text_id}_{safe_text}{desired_ext}"
-            audio_path = wav_dir / audio_filename
-            self.logger.debug(f"Planned output audio path: {audio_path}")
+            desired_ext = self._desired_ext(generation_config)
 
             # Check if file already exists - skip generation if it does
-            if audio_path.exists():
-                self.logger.info(f"⚠️ Audio file already exists, skipping: {audio_path}")
-                return SynthesisResult(
-                    success=True,
-                    text=text,
-                    provider=provider_name,
-                    model=model,
-                    audio_path=audio_path,
-                    metadata_path=voice_dir,  # Point to the directory
-                    duration=0,
-                    file_size=audio_path.stat().st_size,
-                    voice=voice,
-                    skipped_duplicate=True
-                )
+            existing = self._existing_output_result("synthesize", text_id, text, provider_name, model, voice, ext=desired_ext)
+            if existing is not None:
+                return existing
+
+            # Create file name using text_id from input
+            audio_path = wav_dir / self._audio_filename(text_id, text, desired_ext)
+            self.logger.debug("Planned output audio path: %s", audio_path)
 
             # Prepare an effective GenerateSpeechConfig ensuring voice/model/sample_rate are set
             eff_gen_cfg = generation_config
@@ -689,7 +1525,7 @@ class DatasetGenerator:
                     eff_gen_cfg = GenerateSpeechConfig(
                         model=model,
                         voice_config=VoiceConfig(voice_id=clean_voice),
-                        audio_config=AudioConfig(channel=1, sample_rate=provider.sample_rate or 24000)
+                        audio_config=AudioConfig(channel=1, sample_rate=sample_rate or 24000)
                     )
                 else:
                     # Ensure model
@@ -700,37 +1536,54 @@ class DatasetGenerator:
                         eff_gen_cfg.voice_config = VoiceConfig(voice_id=clean_voice)
                     # Ensure sample_rate if missing
                     if getattr(eff_gen_cfg, 'audio_config', None) is None:
-                        eff_gen_cfg.audio_config = AudioConfig(channel=1, sample_rate=provider.sample_rate or 24000)
-                    elif getattr(eff_gen_cfg.audio_config, 'sample_rate', None) is None and provider.sample_rate:
-                        eff_gen_cfg.audio_config.sample_rate = provider.sample_rate
+                        eff_gen_cfg.audio_config = AudioConfig(channel=1, sample_rate=sample_rate or 24000)
+                    elif getattr(eff_gen_cfg.audio_config, 'sample_rate', None) is None and sample_rate:
+                        eff_gen_cfg.audio_config.sample_rate = sample_rate
             except Exception:
                 # Fallback minimal config if anything goes wrong
                 eff_gen_cfg = GenerateSpeechConfig(
                     model=model,
                     voice_config=VoiceConfig(voice_id=clean_voice),
-                    audio_config=AudioConfig(channel=1, sample_rate=provider.sample_rate or 24000)
+                    audio_config=AudioConfig(channel=1, sample_rate=sample_rate or 24000)
                 )
 
-            # Call provider synthesize_with_metadata with unified signature
-            synth_result = provider.synthesize_with_metadata(text, audio_path, generation_config=eff_gen_cfg)
-
-            if synth_result['success']:
-                # Determine effective duration
-                duration_val = None
-                try:
-                    if isinstance(synth_result, dict):
-                        if synth_result.get('duration'):
-                            duration_val = float(synth_result['duration'])
-                        elif synth_result.get('estimated_duration'):
-                            duration_val = float(synth_result['estimated_duration'])
-                except Exception:
-                    duration_val = None
-
-                # If provider didn't return duration, calculate from the written file
-                if duration_val is None or duration_val == 0:
-                    duration_val = self.directory_manager._calculate_duration(audio_path)
-
-                # Add metadata entry using the new method
+            # Same request already synthesized in this output tree (other text_id): link it
+            audio_cfg = getattr(eff_gen_cfg, 'audio_config', None)
+            # Metadata ghi sample rate thực tế được yêu cầu (có thể khác mặc định của provider)
+            sample_rate = getattr(audio_cfg, 'sample_rate', None) or sample_rate
+            memo_key = self._memo_key(provider_name, model, voice, getattr(audio_cfg, 'sample_rate', None), desired_ext, text)
+            reused_duration = self._reuse_memoized(memo_key, audio_path, voice_dir, wav_dir, provider_name, model, voice)
+            memo_hit = reused_duration is not None
+
+            # Cùng text đang được synthesize (thread khác): chờ xong rồi link, không gọi provider lần nữa.
+            # Chunk không chờ (các item trong chunk chỉ được gửi sau khi plan xong cả chunk)
+            while not memo_hit and wait_in_flight:
+                pending = self._claim_synthesis(memo_key)
+                if pending is None:
+                    claimed_key = memo_key
+                    break
+                pending.wait()
+                reused_duration = self._reuse_memoized(memo_key, audio_path, voice_dir, wav_dir, provider_name, model, voice)
+                memo_hit = reused_duration is not None
+
+            # Check the synthesis cache before calling the provider
+            cache_key = None
+            if not memo_hit and self.cache is not None:
+                cache_key = SynthesisCache.make_key(
+                    text, provider_name, model, voice,
+                    sample_rate=getattr(audio_cfg, 'sample_rate', None),
+                    language=getattr(provider, 'language', None),
+                    container=desired_ext,
+                )
+                if lock_cache:
+                    cache_lock = self.cache.key_lock(cache_key)
+                    cache_lock.acquire()
+                reused_duration = self.cache.fetch(cache_key, audio_path)
+
+            if reused_duration is not None:
+                file_size = self._mark_audio_written(audio_path)
+                if not memo_hit:
+                    self._remember_synthesis(memo_key, audio_path, reused_duration)
                 self.directory_manager.add_metadata_entry(
                     voice_dir=voice_dir,
                     text=text,
@@ -739,12 +1592,11 @@ class DatasetGenerator:
                     model=model,
                     voice=voice,
                     tts_type="synthesize",
-                    sample_rate=provider.sample_rate,
-                    duration=duration_val,
+                    sample_rate=sample_rate,
+                    duration=reused_duration,
                     text_id=text_id,
                     lang="vi"
                 )
-
                 return SynthesisResult(
                     success=True,
                     text=text,
@@ -752,35 +1604,115 @@ class DatasetGenerator:
                     model=model,
                     audio_path=audio_path,
                     metadata_path=voice_dir,  # Point to the directory
+                    duration=reused_duration,
+                    file_size=file_size,
+                    voice=voice,
+                    skipped_duplicate=memo_hit
+                )
+
+            # Provider call happens in the caller (single or batched); lock now belongs to the plan
+            plan = _ItemPlan(text_id, text, provider_name, model, voice, voice_dir, audio_path,
+                             eff_gen_cfg, sample_rate, memo_key, cache_key, cache_lock, claimed_key is not None)
+            cache_lock = claimed_key = None
+            return plan
+
+        except Exception as e:
+            return SynthesisResult(
+                success=False,
+                text=text,
+                provider=provider_name,
+                model=model,
+                audio_path=Path(),
+                metadata_path=Path(),
+                duration=0,
+                voice=voice,
+                error=f"Error during synthesis: {str(e)}"
+            )
+        finally:
+            if cache_lock is not None:
+                cache_lock.release()
+            if claimed_key is not None:
+                self._release_synthesis(claimed_key)
+
+    def _finish_item(self, plan: "_ItemPlan", synth_result: Any = None,
+                     error: Optional[BaseException] = None) -> SynthesisResult:
+        """
+        Steps of synthesize_single_text after the provider call: record the written file
+        (memo, cache, metadata) and build the SynthesisResult. error is the exception the
+        provider call raised, if any. Releases the plan's cache key lock and in-flight claim.
+        """
+        try:
+            if error is not None:
+                raise error
+            success, duration_val, error_msg = _unpack_provider_result(synth_result)
+
+            if success:
+                file_size = self._mark_audio_written(plan.audio_path)
+
+                # If provider didn't return duration, calculate from the written file
+                if not duration_val:
+                    duration_val = self.directory_manager._calculate_duration(plan.audio_path)
+
+                self._remember_synthesis(plan.memo_key, plan.audio_path, duration_val)
+                if plan.cache_key is not None:
+                    self.cache.put(plan.cache_key, plan.audio_path, duration_val)
+
+                # Add metadata entry using the new method
+                self.directory_manager.add_metadata_entry(
+                    voice_dir=plan.voice_dir,
+                    text=plan.text,
+                    audio_path=plan.audio_path,
+                    provider=plan.provider_name,
+                    model=plan.model,
+                    voice=plan.voice,
+                    tts_type="synthesize",
+                    sample_rate=plan.sample_rate,
+                    duration=duration_val,
+                    text_id=plan.text_id,
+                    lang="vi"
+                )
+
+                return SynthesisResult(
+                    success=True,
+                    text=plan.text,
+                    provider=plan.provider_name,
+                    model=plan.model,
+                    audio_path=plan.audio_path,
+                    metadata_path=plan.voice_dir,  # Point to the directory
                     duration=duration_val,
-                    file_size=audio_path.stat().st_size if audio_path.exists() else 0,
-                    voice=voice
+                    file_size=file_size,
+                    voice=plan.voice
                 )
             else:
                 return SynthesisResult(
                     success=False,
-                    text=text,
-                    provider=provider_name,
-                    model=model,
-                    audio_path=audio_path,
-                    metadata_path=voice_dir,  # Point to the directory
+                    text=plan.text,
+                    provider=plan.provider_name,
+                    model=plan.model,
+                    audio_path=plan.audio_path,
+                    metadata_path=plan.voice_dir,  # Point to the directory
                     duration=0,
-                    voice=voice,
-                    error=synth_result.get('error', 'Unknown error during synthesis')
+                    voice=plan.voice,
+                    error=error_msg or 'Unknown error during synthesis'
                 )
 
         except Exception as e:
             return SynthesisResult(
                 success=False,
-                text=text,
-                provider=provider_name,
-                model=model,
+                text=plan.text,
+                provider=plan.provider_name,
+                model=plan.model,
                 audio_path=Path(),
                 metadata_path=Path(),
                 duration=0,
-                voice=voice,
+                voice=plan.voice,
                 error=f"Error during synthesis: {str(e)}"
             )
+        finally:
+            if plan.cache_lock is not None:
+                plan.cache_lock.release()
+            if plan.claimed:
+                self._release_synthesis(plan.memo_key)
 
     def clone_single_text(
         self, 
@@ -789,7 +1721,8 @@ class DatasetGenerator:
         provider_name: str,
         reference_audio: str, 
         voice: str, 
-        model: str = None
+        model: str = None,
+        reference_fingerprint: Optional[str] = None,
     ) -> CloneResult:
         """Clone voice for a single text using a specific provider
         
@@ -800,6 +1733,8 @@ class DatasetGenerator:
             reference_audio: Path to the reference audio file for cloning
             voice: Name of the voice to use
             model: Optional model name (defaults to reference_audio filename if not provided)
+            reference_fingerprint: Precomputed _reference_fingerprint(reference_audio) for the
+                synthesis cache key (batch callers compute it once)
             
         Returns:
             CloneResult containing the result of the cloning operation
@@ -822,72 +1757,60 @@ class DatasetGenerator:
                 reference_audio=reference_audio,
             )
 
+        # Held from cache lookup until the result is stored (như synthesize)
+        cache_lock = None
         try:
-            # Create directory structure for cloning
-            voice_dir, wav_dir = self.directory_manager.create_provider_structure_clone(
-                provider_name, model, voice
-            )
-
-            # Create file name using text_id from input
-            safe_text = self._sanitize_filename(text[:50])
-            audio_filename = f"{text_id}_{safe_text}.wav"
-            audio_path = wav_dir / audio_filename
+            # Create directory structure for cloning (once per provider/model/voice)
+            voice_dir, wav_dir = self._output_dirs("clone", provider_name, model, voice)
 
             # Check if file already exists - skip generation if it does
-            if audio_path.exists():
-                self.logger.info(f"⚠️ Audio file already exists, skipping: {audio_path}")
-                return CloneResult(
-                    success=True,
-                    text=text,
-                    provider=provider_name,
-                    model=model,
-                    audio_path=audio_path,
-                    metadata_path=voice_dir,  # Point to the directory
-                    duration=0,
-                    file_size=audio_path.stat().st_size,
-                    reference_audio=reference_audio,
-                    skipped_duplicate=True,
-                )
+            existing = self._existing_output_result("clone", text_id, text, provider_name, model, voice,
+                                                    reference_audio=reference_audio)
+            if existing is not None:
+                return existing
 
-            # Generate the audio using clone with VoiceCloningConfig compatible with Xiaomi provider
-            try:
-                vc_cfg = VoiceCloningConfig(
-                    model=model or "OmniVoice",
-                    voice_config=ReplicatedVoiceConfig(
-                        reference_audio=str(reference_audio),
-                        reference_text=None,
-                        language="vi",
-                    ),
+            # Create file name using text_id from input
+            audio_path = wav_dir / self._audio_filename(text_id, text, ".wav")
+
+            # Check the synthesis cache before calling the provider (same text + reference audio)
+            cache_key = cached_duration = None
+            if self.cache is not None:
+                cache_key = SynthesisCache.make_key(
+                    text, provider_name, model, voice,
+                    language=getattr(provider, 'language', None),
+                    container=audio_path.suffix,
+                    reference=reference_fingerprint or _reference_fingerprint(reference_audio) or "",
                 )
-            except Exception:
-                # Fallback minimal config in case dataclasses are unavailable
-                vc_cfg = None
+                cache_lock = self.cache.key_lock(cache_key)
+                cache_lock.acquire()
+                cached_duration = self.cache.fetch(cache_key, audio_path)
 
-            if vc_cfg is not None:
-                synth_result = provider.clone_with_metadata(
-                    text,
-                    audio_path,
-                    voice_cloning_config=vc_cfg,
-                )
+            if cached_duration is not None:
+                success, duration_val, error = True, cached_duration, None
             else:
-                synth_result = provider.clone(text, audio_path)
+                # Generate the audio using clone with VoiceCloningConfig compatible with Xiaomi provider
+                vc_cfg = self._clone_config(model, reference_audio)
+
+                if vc_cfg is not None:
+                    synth_result = provider.clone_with_metadata(
+                        text,
+                        audio_path,
+                        voice_cloning_config=vc_cfg,
+                    )
+                else:
+                    synth_result = provider.clone(text, audio_path)
+                success, duration_val, error = _unpack_provider_result(synth_result)
 
-            if synth_result['success']:
-                # Determine effective duration
-                duration_val = None
-                try:
-                    if isinstance(synth_result, dict):
-                        if synth_result.get('duration'):
-                            duration_val = float(synth_result['duration'])
-                        elif synth_result.get('estimated_duration'):
-                            duration_val = float(synth_result['estimated_duration'])
-                except Exception:
-                    duration_val = None
+            if success:
+                file_size = self._mark_audio_written(audio_path)
 
                 # If provider didn't return duration, calculate from the written file
-                if duration_val is None or duration_val == 0:
+                if not duration_val:
                     duration_val = self.directory_manager._calculate_duration(audio_path)
 
+                if cache_key is not None and cached_duration is None:
+                    self.cache.put(cache_key, audio_path, duration_val)
+
                 # Add metadata entry using the new method
                 self.directory_manager.add_metadata_entry_clone(
                     voice_dir=voice_dir,
@@ -911,7 +1834,7 @@ class DatasetGenerator:
                     audio_path=audio_path,
                     metadata_path=voice_dir, # Point to the directory
                     duration=duration_val,
-                    file_size=audio_path.stat().st_size if audio_path.exists() else 0,
+                    file_size=file_size,
                     reference_audio=reference_audio,
                 )
             else:
@@ -924,7 +1847,7 @@ class DatasetGenerator:
                     duration=0,
                     model=model,
                     reference_audio=reference_audio,
-                    error=synth_result.get('error', 'Unknown error during cloning')
+                    error=error or 'Unknown error during cloning'
                 )
 
         except Exception as e:
@@ -939,6 +1862,9 @@ class DatasetGenerator:
                 reference_audio=reference_audio,
                 error=f"Error during cloning: {str(e)}"
             )
+        finally:
+            if cache_lock is not None:
+                cache_lock.release()
 
     def _generate_single_text(self, text_id: str, text: str, provider_name: str,
                             model: str, voice: str, tts_type: str = "synthesize",
@@ -962,80 +1888,79 @@ class DatasetGenerator:
 
     def _sanitize_filename(self, text: str) -> str:
         """Sanitize text to create a valid file name"""
-        import re
-
-        # Remove special characters and whitespace
-        sanitized = re.sub(r'[<>:"/\\|?*]', '', text)
-        sanitized = re.sub(r'\s+', '_', sanitized.strip())
-
-        # Limit length
-        if len(sanitized) > 50:
-            sanitized = sanitized[:47] + "..."
-
-        return sanitized
+        return _sanitize_filename(text)
 
     def _save_text_items(self, text_items: List[Tuple[str, str]], output_path: Path):
-        """Save text items to a file. Check if the file already exists before overwriting."""
+        """
+        Save text items to a file, one tuple literal per line (readable with ast.literal_eval).
+        Check if the file already exists before overwriting.
+        """
         if output_path.exists():
             self.logger.warning(f"⚠️ Text items file already exists: {output_path}. Skipping save.")
             return
         try:
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                for text_id, text in text_items:
-                    # Save as a string representation of a tuple
-                    escaped_text = text.replace("'", "\\'")
-                    f.write(f"('{text_id}', '{escaped_text}')\n")
-            self.logger.info(f"✅ Saved {len(text_items)} text items to {output_path}")
+            # repr() escape đúng mọi ký tự (', ", \\, xuống dòng); ghi qua một buffer lớn
+            lines = [f"{(str(text_id), text)!r}\n" for text_id, text in text_items]
+            with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                f.write("".join(lines))
+            self.logger.info(f"✅ Saved {len(lines)} text items to {output_path}")
         except Exception as e:
             self.logger.error(f"❌ Failed to save text items to {output_path}: {e}")
 
-    def _log_summary(self, summary: BatchGenerationSummary, skipped_duplicates: int = 0):
-        """Log summary of generation results using Rich"""
-        # Compute extras
-        # Duration: sum of all audio durations
+    def _log_summary(self, summary: BatchGenerationSummary, skipped_duplicates: Optional[int] = None):
+        """Log summary of generation results using Rich (plain logging when Rich is off)
+
+        skipped_duplicates defaults to the number of results flagged skipped_duplicate.
+        """
+        # Compute extras in one pass over the results:
+        # audio duration, audio size and skipped duplicates
         total_audio_duration = 0.0
-        try:
-            total_audio_duration = sum(float(getattr(r, 'duration', 0) or 0) for r in (summary.results or []))
-        except Exception:
-            total_audio_duration = 0.0
-        items_sec = (summary.total_texts / total_audio_duration) if total_audio_duration > 0 else 0.0
         total_size = 0
-        try:
-            total_size = sum(int(getattr(r, 'file_size', 0) or 0) for r in (summary.results or []))
-        except Exception:
-            total_size = 0
-
-        # Create summary table
-        table = Table(title="Generation Summary", show_header=True, header_style="bold", box=box.SQUARE, expand=True)
-        table.add_column("Metric", style="white", width=22)
-        table.add_column("Value", style="white", overflow="fold")
-        
-        table.add_row("Total Items", str(summary.total_texts))
-        table.add_row("Success", f"{summary.successful_generations}")
+        skipped = 0
+        for r in summary.results or ():
+            try:
+                total_audio_duration += float(getattr(r, 'duration', 0) or 0)
+                total_size += int(getattr(r, 'file_size', 0) or 0)
+            except (TypeError, ValueError):
+                pass
+            if getattr(r, 'skipped_duplicate', False):
+                skipped += 1
+        if skipped_duplicates is None:
+            skipped_duplicates = skipped
+
+        rows = [
+            ("Total Items", str(summary.total_texts)),
+            ("Success", f"{summary.successful_generations}"),
+        ]
         if skipped_duplicates > 0:
-            table.add_row("Skipped", f"{skipped_duplicates}")
+            rows.append(("Skipped", f"{skipped_duplicates}"))
         if summary.failed_generations > 0:
-            table.add_row("Failed", f"{summary.failed_generations}")
-        table.add_row("Total Audio Duration", f"{total_audio_duration:.2f}s")
+            rows.append(("Failed", f"{summary.failed_generations}"))
+        rows.append(("Total Audio Duration", f"{total_audio_duration:.2f}s"))
         if total_size > 0:
-            table.add_row("Total Audio Size", f"{total_size/1024.0:.1f} KB")
-        
+            rows.append(("Total Audio Size", f"{total_size/1024.0:.1f} KB"))
+
         # Show full voice name if available
         if hasattr(self, 'voice_name') and self.voice_name:
-            table.add_row("Voice Name", str(self.voice_name))
-        table.add_row("Output Directory", str(self.output_dir))
-
-
-        
+            rows.append(("Voice Name", str(self.voice_name)))
+        rows.append(("Output Directory", str(self.output_dir)))
 
         if self.use_rich and self.console:
+            # Create summary table
+            table = Table(title="Generation Summary", show_header=True, header_style="bold", box=box.SQUARE, expand=True)
+            table.add_column("Metric", style="white", width=22)
+            table.add_column("Value", style="white", overflow="fold")
+            for metric, value in rows:
+                table.add_row(metric, value)
             self.console.print(table)
         else:
             # Fallback plain logging
             self.logger.info("📊 Generation Summary")
-            for row in table.rows:
-                self.logger.info(" | ".join(cell.plain for cell in row.cells))
+            for metric, value in rows:
+                self.logger.info(f"{metric} | {value}")
+            for i, error in enumerate(summary.errors[:10]):
+                self.logger.warning(f"⚠️ Error {i + 1}: {error}")
 
         # Show errors if any
         if summary.errors and self.use_rich and self.console:
@@ -1061,6 +1986,12 @@ class DatasetGenerator:
 
     def cleanup_providers(self) -> None:
         """Cleanup all providers"""
+        with self._executors_lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=True)
+        self.directory_manager.flush_metadata()
         self.provider_factory.cleanup_all_providers()
         self.providers.clear()
 
@@ -1071,45 +2002,220 @@ class DatasetGenerator:
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit"""
         self.cleanup_providers()
+        self.directory_manager.close_metadata()
+        if self.cache is not None:
+            self.cache.close()
+
+
+# Default providers config for the convenience helpers
+# Read-only: DatasetGenerator nhận ra object này (is) và dùng lại provider đã tạo
+DEFAULT_PROVIDERS_CONFIG: Mapping[str, Any] = MappingProxyType({
+    "gtts": MappingProxyType({
+        "sample_rate": 22050,
+        "language": "vi"
+    })
+})
+
+
+class _IndexedTexts:
+    """(str(i), text) pairs over a sequence of texts, produced lazily; len() is known up front."""
+    __slots__ = ("texts",)
+
+    def __init__(self, texts: Sequence[str]):
+        self.texts = texts
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        return zip(map(str, range(len(self.texts))), self.texts)
+
+
+# Số (id, text) mỗi lần thread đọc đẩy sang, và số chunk tối đa được đọc trước
+_PREFETCH_CHUNK_SIZE = 64
+_PREFETCH_CHUNKS = 2
+
+
+def _prefetched(texts: Iterable[str], chunk_size: int = _PREFETCH_CHUNK_SIZE,
+                max_chunks: int = _PREFETCH_CHUNKS) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (str(i), text) pairs while a reader thread pulls the next chunks from texts.
+
+    Reading a lazy source (jsonl/parquet stream, ...) then overlaps with provider
+    calls instead of alternating with them. At most max_chunks chunks are read
+    ahead; errors raised by texts are re-raised in the consumer.
+    """
+    chunks = queue.Queue(maxsize=max_chunks)
+    stop = threading.Event()
+    done = object()
+
+    def put(chunk) -> bool:
+        # Không block mãi nếu consumer đã dừng giữa chừng
+        while not stop.is_set():
+            try:
+                chunks.put(chunk, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def producer():
+        try:
+            chunk = []
+            for i, text in enumerate(texts):
+                chunk.append((str(i), text))
+                if len(chunk) >= chunk_size:
+                    if not put(chunk):
+                        return
+                    chunk = []
+            if chunk and not put(chunk):
+                return
+            put(done)
+        except BaseException as e:
+            put(e)
+
+    reader = threading.Thread(target=producer, name="text-prefetch", daemon=True)
+    reader.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is done:
+                return
+            if isinstance(chunk, BaseException):
+                raise chunk
+            yield from chunk
+    finally:
+        stop.set()
 
 
 # Convenience function to use easily
-def generate_vietnamese_addresses(output_dir: Path, texts: List[str],
+def generate_vietnamese_addresses(output_dir: Path, texts: Iterable[str],
                                 providers_config: Dict[str, Any] = None,
+                                generator: Optional[DatasetGenerator] = None,
+                                dedup: bool = True,
+                                concurrency: int = 16,
+                                cache_dir: Optional[Path] = None,
+                                cache_max_bytes: Optional[int] = None,
+                                sample_rate: Optional[int] = None,
+                                *,
+                                provider_model_voice: Tuple[str, str, str] = ("gtts", "default", "vi"),
                                 **kwargs) -> BatchGenerationSummary:
     """
     Convenience function to generate Vietnamese addresses.
 
     Args:
-        output_dir: Output directory path
-        texts: List of address texts to generate
-        providers_config: Provider configurations
+        output_dir: Output directory path (ignored when generator is given)
+        texts: Address texts to generate. A sequence is indexed in place; any other iterable
+            (e.g. a stream read from disk) is consumed once by a reader thread, a few chunks
+            ahead of synthesis
+        providers_config: Provider configurations (default: DEFAULT_PROVIDERS_CONFIG)
+        generator: Existing DatasetGenerator to reuse across calls instead of building (and
+            closing) a new one per call; the caller keeps ownership and closes it
+        dedup: Kept for compatibility. Repeated texts are always linked to their first synthesis
+            by the generator's synthesis memo, in input order, without a second provider call
+        concurrency: Worker threads for provider requests; requests overlap and
+            delay_between_requests acts as a rate limit. Pass enable_concurrency=False
+            to process items one by one (default: 16)
+        cache_dir: Content-addressed synthesis cache shared across runs / output dirs; texts
+            already synthesized with the same provider/model/voice/sample rate are hardlinked
+            from it instead of synthesized again (ignored when generator is given)
+        cache_max_bytes: LRU size limit for cache_dir (default: unlimited)
+        sample_rate: Output sample rate requested from the provider (e.g. 16000 for ASR data), so
+            files are written at that rate directly instead of resampled afterwards. Ignored when
+            generation_config is passed (default: the provider's own rate)
+        provider_model_voice: Keyword-only (provider, model, voice) to use (default: ('gtts', 'default', 'vi'))
         **kwargs: Additional generation parameters (tts_type, reference_audio, etc.)
-            - provider_model_voice: Tuple of (provider, model, voice) to use (default: ('gtts', 'default', 'vi'))
 
     Returns:
         BatchGenerationSummary containing generation results
     """
-    generator = DatasetGenerator(output_dir, providers_config)
-
-    # Mặc định sử dụng GTTS nếu không có config
-    if not providers_config:
-        default_config = {
-            "gtts": {
-                "sample_rate": 22050,
-                "language": "vi"
-            }
-        }
-        generator = DatasetGenerator(output_dir, default_config)
-
-    # Get provider_model_voice from kwargs or use default GTTS config
-    provider_model_voice = kwargs.pop('provider_model_voice', ("gtts", "default", "vi"))
-    
-    # Convert text strings to (id, text) tuples if needed
-    text_items = [(str(i), text) for i, text in enumerate(texts)]
+    # Mặc định sử dụng GTTS nếu không có config.
+    # Generator tự tạo được đóng khi xong; generator truyền vào thì caller tự đóng
+    owned = generator is None
+    if owned:
+        generator = DatasetGenerator(output_dir, providers_config or DEFAULT_PROVIDERS_CONFIG,
+                                     cache_dir=cache_dir, cache_max_bytes=cache_max_bytes)
+
+    if sample_rate and kwargs.get('generation_config') is None:
+        _, model, voice = provider_model_voice
+        kwargs['generation_config'] = GenerateSpeechConfig(
+            model=model,
+            voice_config=VoiceConfig(voice_id=voice),
+            audio_config=AudioConfig(channel=1, sample_rate=sample_rate),
+        )
+
+    # Helper chủ yếu chờ network: mặc định gửi song song qua thread pool của generator
+    kwargs.setdefault('enable_concurrency', True)
+    kwargs.setdefault('max_workers', concurrency)
     
-    return generator.generate_from_text_list(
-        text_items=text_items,
-        provider_model_voice=provider_model_voice,
-        **kwargs
-    )
+    # (id, text) được tạo lần lượt khi generator duyệt, không dựng list tuple trước.
+    # Nguồn lazy (stream từ disk): đọc trước trong một thread, song song với lúc synthesize
+    if isinstance(texts, Sequence):
+        text_items = _IndexedTexts(texts)
+    else:
+        text_items = _prefetched(texts)
+
+    # Text lặp lại được generator tự link tới bản synthesize đầu tiên (synthesis memo), theo đúng thứ tự input
+    with generator if owned else contextlib.nullcontext():
+        return generator.generate_from_text_list(
+            text_items=text_items,
+            provider_model_voice=provider_model_voice,
+            **kwargs
+        )
+
+
+def _generate_shard(args: Tuple[Path, List[Tuple[str, str]], Dict[str, Any], Dict[str, Any]]) -> BatchGenerationSummary:
+    """Worker process: build a private DatasetGenerator (and provider instances) and run one shard."""
+    shard_dir, text_items, providers_config, kwargs = args
+    with DatasetGenerator(shard_dir, providers_config) as generator:
+        return generator.generate_from_text_list(text_items=text_items, **kwargs)
+
+
+def generate_from_text_list_multiprocess(output_dir: Path,
+                                         text_items: List[Tuple[str, str]],
+                                         providers_config: Dict[str, Any],
+                                         processes: Optional[int] = None,
+                                         maxtasksperchild: Optional[int] = 50,
+                                         **kwargs) -> BatchGenerationSummary:
+    """
+    Shard text_items across worker processes for CPU-bound (local model) providers.
+
+    Each worker loads its own provider instances and writes to its own
+    output_dir/shard_XX tree, so metadata TSVs and utt_ids never race.
+    A crashing provider (e.g. a Chrome driver) only takes down its shard.
+
+    Args:
+        output_dir: Root output directory (shards are created underneath)
+        text_items: List of (id, text) tuples to generate
+        providers_config: Provider configurations (must be picklable)
+        processes: Number of worker processes (default: os.cpu_count())
+        maxtasksperchild: Recycle worker processes after this many shards
+        **kwargs: Passed to generate_from_text_list (provider_model_voice, tts_type, ...)
+
+    Returns:
+        BatchGenerationSummary aggregated over all shards
+    """
+    from multiprocessing import Pool
+
+    processes = max(1, min(processes or os.cpu_count() or 1, len(text_items) or 1))
+    # MappingProxyType (vd. DEFAULT_PROVIDERS_CONFIG) không pickle được sang worker
+    providers_config = {name: dict(cfg) if isinstance(cfg, Mapping) else cfg
+                        for name, cfg in providers_config.items()}
+    output_dir = Path(output_dir)
+    start_time = time.time()
+
+    # Contiguous shards, sizes differ by at most one item
+    size, rest = divmod(len(text_items), processes)
+    shards, start = [], 0
+    for i in range(processes):
+        end = start + size + (1 if i < rest else 0)
+        shards.append((output_dir / f"shard_{i:02d}", text_items[start:end], providers_config, kwargs))
+        start = end
+
+    with Pool(processes, maxtasksperchild=maxtasksperchild) as pool:
+        summaries = pool.map(_generate_shard, shards)
+
+    # Shards run in parallel: report wall time rather than the sum of shard durations
+    total = BatchGenerationSummary.merge(summaries)
+    total.total_duration = time.time() - start_time
+    return total
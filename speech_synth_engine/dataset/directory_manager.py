@@ -4,21 +4,108 @@
 # Manage directory structure and metadata for TTS generation
 # ============================================================
 
+import io
+import os
 import csv
 import json
+import threading
+import functools
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime
 import logging
 
+from ..providers.utils import ensure_dir
+
+
+@functools.lru_cache(maxsize=256)
+def _dir_prefix(directory: Path) -> str:
+    return str(directory) + os.sep
+
+
+def _relative_path(path: Path, directory: Path) -> str:
+    """str(path.relative_to(directory)) via a cached string prefix; falls back to pathlib on mismatch."""
+    path_str = str(path)
+    prefix = _dir_prefix(directory)
+    if path_str.startswith(prefix):
+        return path_str[len(prefix):]
+    return str(path.relative_to(directory))
+
+class MetadataWriter:
+    """
+    Buffered appender for one text_audio.tsv.
+
+    Rows are formatted in memory and written in chunks of `flush_every` rows
+    through a single long-lived file handle; utt_ids come from an in-memory
+    row count instead of re-reading the file for every entry. With
+    flush_every <= 0 rows are only written on flush()/close(), i.e. once per batch.
+    """
+
+    HEADER = ["utt_id", "text_id", "text", "audio_path", "duration", "gen_date"]
+
+    def __init__(self, path: Path, flush_every: int = 256):
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._buf = io.StringIO()
+        self._writer = csv.writer(self._buf, delimiter='\t')
+        self._pending = 0
+
+        # Đếm số dòng hiện có một lần duy nhất (file có thể từ lần chạy trước)
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.row_count = max(sum(1 for _ in f) - 1, 0)  # Exclude header
+        else:
+            self.row_count = 0
+            self._writer.writerow(self.HEADER)
+
+        self._fh = open(self.path, 'a', newline='', encoding='utf-8', buffering=1 << 20)
+
+    def append(self, row: List[str]) -> str:
+        """Buffer one row; its utt_id is assigned here and returned."""
+        with self._lock:
+            self.row_count += 1
+            utt_id = f"{self.row_count:05d}"  # Pad to 5 digits for more files
+            self._writer.writerow([utt_id, *row])
+            self._pending += 1
+            if 0 < self.flush_every <= self._pending:
+                self._flush_locked()
+            return utt_id
+
+    def _flush_locked(self) -> None:
+        data = self._buf.getvalue()
+        if data:
+            self._fh.write(data)
+            self._fh.flush()
+            self._buf.seek(0)
+            self._buf.truncate()
+        self._pending = 0
+
+    def flush(self) -> None:
+        """Write buffered rows to disk."""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """Flush, fsync once and close the file handle."""
+        with self._lock:
+            if self._fh.closed:
+                return
+            self._flush_locked()
+            os.fsync(self._fh.fileno())
+            self._fh.close()
+
+
 class DirectoryManager:
     """
     Manage directory structure and metadata for TTS generation.
     Creates and maintains structure: provider/model/voice/wav/ with CSV metadata.
     """
 
-    def __init__(self, base_output_dir: Path):
+    def __init__(self, base_output_dir: Path, metadata_flush_every: int = 256):
         self.base_dir = Path(base_output_dir)
+        # Rows buffered per text_audio.tsv before a write (<= 0: only at end of batch)
+        self.metadata_flush_every = metadata_flush_every
         self.logger = logging.getLogger("DirectoryManager")
         self.logger.setLevel(logging.DEBUG)
         self.logger.propagate = False
@@ -32,6 +119,10 @@ class DirectoryManager:
             'metadata': 'metadata.tsv'  # Changed from .csv to .tsv
         }
 
+        # voice_dir -> buffered text_audio.tsv writer
+        self._metadata_writers: Dict[Path, MetadataWriter] = {}
+        self._metadata_writers_lock = threading.Lock()
+
     def get_voice_dir(self, provider: str, model: str, voice: str) -> Path:
         return self.base_dir / provider / model / voice
 
@@ -55,7 +146,7 @@ class DirectoryManager:
             wav_dir = voice_dir / "wav"
 
             # Create necessary directories
-            wav_dir.mkdir(parents=True, exist_ok=True)
+            ensure_dir(wav_dir)
 
             self.logger.debug(f"Directory structure created: provider={provider}, model={model}, voice={voice}, wav_dir={wav_dir}")
 
@@ -85,7 +176,7 @@ class DirectoryManager:
             wav_dir = voice_dir / "wav"
 
             # Create necessary directories
-            wav_dir.mkdir(parents=True, exist_ok=True)
+            ensure_dir(wav_dir)
 
             self.logger.debug(f"Clone directory structure created: provider={provider}, model={model}, voice={voice}, wav_dir={wav_dir}")
 
@@ -97,6 +188,30 @@ class DirectoryManager:
 
 
 
+    def _get_metadata_writer(self, voice_dir: Path) -> MetadataWriter:
+        """Return the buffered text_audio.tsv writer for voice_dir, creating it once."""
+        writer = self._metadata_writers.get(voice_dir)
+        if writer is None:
+            with self._metadata_writers_lock:
+                writer = self._metadata_writers.get(voice_dir)
+                if writer is None:
+                    writer = MetadataWriter(voice_dir / "text_audio.tsv", flush_every=self.metadata_flush_every)
+                    self._metadata_writers[voice_dir] = writer
+        return writer
+
+    def flush_metadata(self) -> None:
+        """Write all buffered metadata rows to disk."""
+        for writer in list(self._metadata_writers.values()):
+            writer.flush()
+
+    def close_metadata(self) -> None:
+        """Flush and close all metadata writers."""
+        with self._metadata_writers_lock:
+            writers = list(self._metadata_writers.values())
+            self._metadata_writers.clear()
+        for writer in writers:
+            writer.close()
+
     def add_metadata_entry_clone(
         self,
         voice_dir: Path,
@@ -134,10 +249,9 @@ class DirectoryManager:
         try:
             # Define paths for the new metadata files
             metadata_json_path = voice_dir / "metadata.json"
-            text_audio_tsv_path = voice_dir / "text_audio.tsv"
 
             # --- Handle metadata.json (common data) ---
-            if not metadata_json_path.exists():
+            if voice_dir not in self._metadata_writers and not metadata_json_path.exists():
                 common_metadata = {
                     "provider": provider,
                     "model": model,
@@ -150,41 +264,25 @@ class DirectoryManager:
                     json.dump(common_metadata, f, indent=4, ensure_ascii=False)
                 self.logger.debug(f"Created metadata.json at {metadata_json_path}")
 
-            # --- Handle text_audio.tsv (specific data) ---
-            # Initialize TSV with header if it doesn't exist
-            if not text_audio_tsv_path.exists():
-                with open(text_audio_tsv_path, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f, delimiter='\t')
-                    writer.writerow(["utt_id", "text_id", "text", "audio_path", "duration", "gen_date"])
-
-            # Count current lines to create utt_id
-            with open(text_audio_tsv_path, 'r', encoding='utf-8') as f:
-                current_count = sum(1 for _ in f) - 1  # Exclude header
-
-            utt_id = f"{current_count + 1:05d}" # Pad to 5 digits for more files
-
             # Calculate actual audio duration if not provided
             if duration is None:
                 duration = self._calculate_duration(audio_path)
 
-            self.logger.debug(f"Calculated duration for {audio_path.name}: {duration:.2f} seconds")
+            self.logger.debug("Calculated duration for %s: %.2f seconds", audio_path.name, duration)
 
-            # Prepare data for TSV
+            # Prepare data for TSV (utt_id is assigned by the writer)
             entry = [
-                utt_id,
                 text_id or "",
                 text,
-                str(audio_path.relative_to(voice_dir)), # Store relative path
+                _relative_path(audio_path, voice_dir), # Store relative path
                 f"{duration:.2f}",
                 datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             ]
 
-            # Append to TSV file
-            with open(text_audio_tsv_path, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f, delimiter='\t')
-                writer.writerow(entry)
+            # Buffered append to text_audio.tsv
+            self._get_metadata_writer(voice_dir).append(entry)
 
-            self.logger.debug(f"✅ Appended metadata for {audio_path.name} to {text_audio_tsv_path}")
+            self.logger.debug("✅ Appended metadata for %s to %s/text_audio.tsv", audio_path.name, voice_dir)
             return True
 
         except Exception as e:
@@ -226,10 +324,9 @@ class DirectoryManager:
         try:
             # Define paths for the new metadata files
             metadata_json_path = voice_dir / "metadata.json"
-            text_audio_tsv_path = voice_dir / "text_audio.tsv"
 
             # --- Handle metadata.json (common data) ---
-            if not metadata_json_path.exists():
+            if voice_dir not in self._metadata_writers and not metadata_json_path.exists():
                 common_metadata = {
                     "provider": provider,
                     "model": model,
@@ -242,39 +339,23 @@ class DirectoryManager:
                     json.dump(common_metadata, f, indent=4, ensure_ascii=False)
                 self.logger.debug(f"Created metadata.json at {metadata_json_path}")
 
-            # --- Handle text_audio.tsv (specific data) ---
-            # Initialize TSV with header if it doesn't exist
-            if not text_audio_tsv_path.exists():
-                with open(text_audio_tsv_path, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f, delimiter='\t')
-                    writer.writerow(["utt_id", "text_id", "text", "audio_path", "duration", "gen_date"])
-
-            # Count current lines to create utt_id
-            with open(text_audio_tsv_path, 'r', encoding='utf-8') as f:
-                current_count = sum(1 for _ in f) - 1  # Exclude header
-
-            utt_id = f"{current_count + 1:05d}"  # Pad to 5 digits for more files
-
             # Calculate actual audio duration if not provided
             if duration is None:
                 duration = self._calculate_duration(audio_path)
 
-            # Prepare data for TSV
+            # Prepare data for TSV (utt_id is assigned by the writer)
             entry = [
-                utt_id,
                 text_id or "",
                 text,
-                str(audio_path.relative_to(voice_dir)),  # Store relative path
+                _relative_path(audio_path, voice_dir),  # Store relative path
                 f"{duration:.2f}",
                 datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             ]
 
-            # Append to TSV file
-            with open(text_audio_tsv_path, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f, delimiter='\t')
-                writer.writerow(entry)
+            # Buffered append to text_audio.tsv
+            self._get_metadata_writer(voice_dir).append(entry)
 
-            self.logger.debug(f"✅ Appended metadata for {audio_path.name} to {text_audio_tsv_path}")
+            self.logger.debug("✅ Appended metadata for %s to %s/text_audio.tsv", audio_path.name, voice_dir)
             return True
 
         except Exception as e:
@@ -298,11 +379,11 @@ class DirectoryManager:
                 frames = len(f)
                 sr = int(getattr(f, 'samplerate', 0))
                 duration = round(frames / sr, 3) if sr > 0 else 0.0
-                self.logger.debug(f"Duration probe (soundfile): frames={frames}, sr={sr}, duration={duration}")
+                self.logger.debug("Duration probe (soundfile): frames=%s, sr=%s, duration=%s", frames, sr, duration)
                 if duration > 0:
                     return duration
         except Exception as e:
-            self.logger.debug(f"soundfile probe failed for {audio_path}: {e}")
+            self.logger.debug("soundfile probe failed for %s: %s", audio_path, e)
 
         # Fallback for WAV using wave module
         try:
@@ -312,10 +393,10 @@ class DirectoryManager:
                     frames = wf.getnframes()
                     sr = wf.getframerate()
                     duration = round(frames / float(sr), 3) if sr > 0 else 0.0
-                    self.logger.debug(f"Duration probe (wave): frames={frames}, sr={sr}, duration={duration}")
+                    self.logger.debug("Duration probe (wave): frames=%s, sr=%s, duration=%s", frames, sr, duration)
                     return max(0.0, duration)
         except Exception as e:
-            self.logger.debug(f"wave probe failed for {audio_path}: {e}")
+            self.logger.debug("wave probe failed for %s: %s", audio_path, e)
 
         self.logger.warning(f"⚠️  Could not determine duration for {audio_path} with available probes")
         return 0.0
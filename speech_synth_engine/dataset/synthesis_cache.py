@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# ============================================================
+# Synthesis Cache
+# Content-addressed on-disk cache of synthesized audio
+# ============================================================
+
+import os
+import time
+import shutil
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Optional, Tuple
+import logging
+
+# BLAKE3 nếu có cài, nếu không dùng BLAKE2b có sẵn trong hashlib
+try:
+    from blake3 import blake3 as _hasher
+except ImportError:
+    _hasher = hashlib.blake2b
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """Hardlink src to dst, falling back to a copy (e.g. across filesystems)."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+# Số lock dùng chung cho các key (striped locking, không giữ một lock cho mỗi key)
+_KEY_LOCK_STRIPES = 64
+
+# Số entry mới được gom lại trước khi ghi vào index trong một transaction
+_PUT_BATCH_SIZE = 256
+
+
+class SynthesisCache:
+    """
+    Content-addressed cache of synthesized audio shared across generation runs.
+
+    Layout:
+        cache_dir/index.sqlite   - key -> (path, duration, gen_date, size, last_used), WAL journal
+        cache_dir/audio/<key>.*  - cached audio files
+
+    Keys hash everything that affects the audio (text, provider, model, voice,
+    sample rate, language, container, and the reference audio of clones), so a hit can be hardlinked into the
+    output tree instead of calling the provider again.
+
+    New index rows are buffered and written in one transaction per
+    `put_batch_size` entries or on flush()/close(); lookups see buffered rows.
+
+    With max_bytes, flush() evicts least recently used entries until the cached
+    audio fits (hits refresh last_used; the output tree's hardlinks are kept).
+    """
+
+    def __init__(self, cache_dir: Path, put_batch_size: int = _PUT_BATCH_SIZE,
+                 max_bytes: Optional[int] = None):
+        self.cache_dir = Path(cache_dir)
+        self.audio_dir = self.cache_dir / "audio"
+        self.audio_dir.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger("SynthesisCache")
+
+        # Mỗi thread một connection; WAL cho phép đọc song song với ghi
+        # (kể cả giữa nhiều process dùng chung cache_dir)
+        self._db_path = str(self.cache_dir / "index.sqlite")
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._key_locks = [threading.Lock() for _ in range(_KEY_LOCK_STRIPES)]
+        self.put_batch_size = put_batch_size
+        self.max_bytes = max_bytes
+        self._pending = {}  # key -> (hash, path, duration, gen_date, size, last_used), chưa ghi vào index
+        self._touched = {}  # key -> last_used của các hit, ghi cùng lúc flush
+        self._pending_lock = threading.Lock()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "hash TEXT PRIMARY KEY, path TEXT NOT NULL, duration REAL, gen_date TEXT, "
+                "size INTEGER DEFAULT 0, last_used REAL DEFAULT 0)"
+            )
+            # Index tạo bởi phiên bản cũ chưa có size / last_used
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(cache)")}
+            for column, decl in (("size", "INTEGER DEFAULT 0"), ("last_used", "REAL DEFAULT 0")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE cache ADD COLUMN {column} {decl}")
+
+    def _conn(self) -> sqlite3.Connection:
+        """Connection of the calling thread (opened on first use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @staticmethod
+    def make_key(text: str, provider: str, model: str, voice: str,
+                 sample_rate: Optional[int] = None, language: Optional[str] = None,
+                 container: Optional[str] = None, reference: Optional[str] = None) -> str:
+        """Build the cache key for a synthesis request (reference: identity of a clone's reference audio)."""
+        raw = f"{provider}|{model}|{voice}|{sample_rate}|{language}|{container}|{text}"
+        if reference is not None:
+            # Chỉ thêm khi clone: key của synthesize giữ nguyên như các index cũ
+            raw = f"clone|{reference}|{raw}"
+        return _hasher(raw.encode("utf-8")).hexdigest()
+
+    def key_lock(self, key: str) -> threading.Lock:
+        """
+        In-process lock for a key. Hold it across fetch -> synthesize -> put so
+        concurrent requests for the same audio only call the provider once.
+        """
+        return self._key_locks[int(key[:8], 16) % _KEY_LOCK_STRIPES]
+
+    def get(self, key: str) -> Optional[Tuple[Path, float]]:
+        """Return (cached_path, duration) for key, or None on miss."""
+        with self._pending_lock:
+            row = self._pending.get(key)
+        if row is not None:
+            return Path(row[1]), row[2]
+        row = self._conn().execute(
+            "SELECT path, duration FROM cache WHERE hash = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        cached_path = Path(row[0])
+        if not cached_path.exists():
+            # File cache bị xoá ngoài ý muốn: bỏ entry
+            with self._conn() as conn:
+                conn.execute("DELETE FROM cache WHERE hash = ?", (key,))
+            return None
+        if self.max_bytes is not None:
+            with self._pending_lock:
+                self._touched[key] = time.time()
+        return cached_path, float(row[1] or 0.0)
+
+    def fetch(self, key: str, output_path: Path) -> Optional[float]:
+        """Materialize a cached entry at output_path. Returns its duration, or None on miss."""
+        hit = self.get(key)
+        if hit is None:
+            return None
+        cached_path, duration = hit
+        try:
+            _link_or_copy(cached_path, output_path)
+        except OSError as e:
+            self.logger.warning(f"⚠️ Could not materialize cache entry {cached_path}: {e}")
+            return None
+        self.logger.debug("Cache hit %.12s -> %s", key, output_path)
+        return duration
+
+    def put(self, key: str, audio_path: Path, duration: float) -> None:
+        """Store a freshly synthesized file under key."""
+        cached_path = self.audio_dir / f"{key}{audio_path.suffix}"
+        try:
+            if not cached_path.exists():
+                _link_or_copy(audio_path, cached_path)
+        except OSError as e:
+            self.logger.warning(f"⚠️ Could not store cache entry for {audio_path}: {e}")
+            return
+        try:
+            size = os.stat(cached_path).st_size
+        except OSError:
+            size = 0
+        row = (key, str(cached_path), float(duration or 0.0), datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+               size, time.time())
+        with self._pending_lock:
+            self._pending[key] = row
+            full = len(self._pending) >= self.put_batch_size
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered entries (and hit timestamps) to the index in a single transaction, then evict."""
+        with self._pending_lock:
+            if not self._pending and not self._touched:
+                return
+            rows = list(self._pending.values())
+            touched = [(last_used, key) for key, last_used in self._touched.items()]
+            try:
+                with self._conn() as conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO cache (hash, path, duration, gen_date, size, last_used) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                    conn.executemany("UPDATE cache SET last_used = ? WHERE hash = ?", touched)
+            except sqlite3.Error as e:
+                self.logger.warning(f"⚠️ Could not store {len(rows)} cache entries: {e}")
+            self._pending.clear()
+            self._touched.clear()
+            if self.max_bytes is not None:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits in max_bytes; caller holds _pending_lock."""
+        conn = self._conn()
+        try:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            evicted = []
+            for key, path, size in conn.execute("SELECT hash, path, size FROM cache ORDER BY last_used").fetchall():
+                if total <= self.max_bytes:
+                    break
+                evicted.append((key,))
+                total -= size or 0
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            with conn:
+                conn.executemany("DELETE FROM cache WHERE hash = ?", evicted)
+            self.logger.debug("Evicted %d cache entries", len(evicted))
+        except (OSError, sqlite3.Error) as e:
+            self.logger.warning(f"⚠️ Cache eviction failed: {e}")
+
+    def close(self) -> None:
+        """Flush buffered entries and close the sqlite index (connections of all threads)."""
+        self.flush()
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -6,11 +6,35 @@
 
 import csv
 import json
+import codecs
+import mmap
+import re
+from array import array
+from collections.abc import Sequence
 from pathlib import Path
-from typing import List, Tuple, Optional, Union, Any, Dict
+from typing import List, Tuple, Optional, Union, Any, Dict, Iterator
 from abc import ABC, abstractmethod
 import logging
 
+# pandas (tuỳ chọn) cho CSV lớn có filter: đọc theo usecols + boolean mask
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+# orjson (tuỳ chọn): parse JSON/JSONL nhanh hơn json chuẩn; JSONDecodeError của orjson kế thừa json.JSONDecodeError
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# ijson (tuỳ chọn): stream mảng JSON lớn thay vì đọc toàn bộ vào bộ nhớ
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 class TextLoader(ABC):
     """Abstract base class for text loaders"""
 
@@ -30,65 +54,198 @@ class TextLoader(ABC):
         """
         pass
 
-    def validate_source(self, source_path: Union[str, Path]) -> bool:
+    def validate_source(self, source_path: Union[str, Path] = None) -> bool:
         """
         Validate source data
         
         Args:
             source_path: Path to the source file or directory to validate
+                (defaults to the loader's own source_path)
             
         Returns:
             bool: True if source is valid, False otherwise
         """
-        return Path(source_path).exists()
+        if source_path is None:
+            source_path = getattr(self, 'source_path', None)
+        return source_path is not None and Path(source_path).exists()
+
+# Ranh giới dòng giống universal newlines của text mode: \r\n, \r, \n
+_LINE_END_RE = re.compile(rb'\r\n|\r|\n')
+
+# Dòng rỗng / chỉ có khoảng trắng ASCII: bỏ qua ngay trên bytes, không cần decode
+_BLANK_LINE_RE = re.compile(rb'[ \t\f\v]*')
+
+
+def _ascii_compatible(encoding: str) -> bool:
+    """
+    True for encodings where the ASCII line endings / whitespace are single bytes that never
+    occur inside a multi-byte character (utf-8, latin-1, cp125x, ...): only these can be
+    split into lines on raw bytes. Others (utf-16, utf-32, ...) are read in text mode.
+    """
+    name = codecs.lookup(encoding).name
+    return name in ('utf-8', 'utf-8-sig', 'ascii') or name.startswith(('iso8859-', 'cp125'))
+
+
+def _iter_line_spans(buf) -> Iterator[Tuple[int, int, int]]:
+    """Yield (line_num, start, end) byte spans for every line in a bytes-like buffer."""
+    pos, size, line_num = 0, len(buf), 0
+    while pos < size:
+        line_num += 1
+        match = _LINE_END_RE.search(buf, pos)
+        if match:
+            start, end, pos = pos, match.start(), match.end()
+        else:
+            start, end, pos = pos, size, size
+        yield line_num, start, end
+
+
+class _MappedTextItems(Sequence):
+    """
+    Lazy (id, text) view over a large text file, backed by mmap.
+    Lines are split on raw bytes: only for ASCII-compatible encodings.
+
+    Iteration parses lines on demand, so consumers can start before the
+    whole file is decoded. Random access (len, indexing, slicing) builds a
+    compact line-offset index on first use and decodes only requested lines.
+    """
+
+    def __init__(self, source_path: Path, parse_raw):
+        self.source_path = source_path
+        self._parse_raw = parse_raw
+        self._index: Optional[Tuple[array, array, array]] = None
+
+    def __iter__(self):
+        with open(self.source_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line_num, start, end in _iter_line_spans(mm):
+                item = self._parse_raw(line_num, mm, start, end)
+                if item is not None:
+                    yield item
+
+    def _build_index(self) -> Tuple[array, array, array]:
+        if self._index is None:
+            line_nums, starts, ends = array('q'), array('q'), array('q')
+            with open(self.source_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for line_num, start, end in _iter_line_spans(mm):
+                    if self._parse_raw(line_num, mm, start, end) is not None:
+                        line_nums.append(line_num)
+                        starts.append(start)
+                        ends.append(end)
+            self._index = (line_nums, starts, ends)
+        return self._index
+
+    def __len__(self) -> int:
+        return len(self._build_index()[0])
+
+    def __getitem__(self, index):
+        line_nums, starts, ends = self._build_index()
+        positions = range(len(line_nums))[index]
+        with open(self.source_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if isinstance(positions, int):
+                return self._parse_raw(line_nums[positions], mm, starts[positions], ends[positions])
+            return [self._parse_raw(line_nums[i], mm, starts[i], ends[i]) for i in positions]
+
 
 class TextFileLoader(TextLoader):
     """Generic loader for text files - loads all lines including comments"""
 
-    def __init__(self, encoding: str = "utf-8"):
+    # Từ kích thước này trở lên, file được mmap và đọc lazy thay vì load hết vào list
+    MMAP_THRESHOLD = 1 << 20  # 1 MiB
+
+    def __init__(self, encoding: str = "utf-8", *, source_path: Union[str, Path] = None):
+        """
+        Args:
+            encoding: File encoding (first positional parameter, as before)
+            source_path: Keyword-only default file for load()/iter()/validate_source()
+        """
         super().__init__()
+        self.source_path = Path(source_path) if source_path is not None else None
         self.encoding = encoding
 
-    def load(self, source_path: Union[str, Path]) -> List[Tuple[str, str]]:
+    def _parse_line(self, line_num: int, line: str) -> Optional[Tuple[str, str]]:
+        """Parse one line into (id, text); returns None for empty lines"""
+        text = line.rstrip('\n\r')  # Remove only line endings, keep spaces
+
+        # Skip empty lines
+        if not text.strip():
+            return None
+
+        # Check if line has format: id\ttext
+        if '\t' in text:
+            parts = text.split('\t', 1)
+            if len(parts) == 2:
+                text_id, text_content = parts
+                return (text_id.strip(), text_content.strip())
+            # Malformed line, treat as text without ID
+            self.logger.warning(f"⚠️ Malformed line {line_num}, treating as text without ID")
+            return (str(line_num), text.strip())
+
+        # No tab found, auto-generate ID starting from 1
+        return (str(line_num), text.strip())
+
+    def _parse_raw(self, line_num: int, buf, start: int, end: int) -> Optional[Tuple[str, str]]:
+        """Parse buf[start:end]; blank lines are rejected on bytes before decoding"""
+        if _BLANK_LINE_RE.fullmatch(buf, start, end):
+            return None
+        return self._parse_line(line_num, buf[start:end].decode(self.encoding))
+
+    def iter(self, source_path: Union[str, Path] = None) -> Iterator[Tuple[str, str]]:
+        """
+        Lazily yield (id, text) pairs line by line, without building a list.
+
+        Same parsing and IDs as load(); generation can start while the file is
+        still being read (DatasetGenerator accepts any iterable of items).
+
+        Raises:
+            FileNotFoundError: If the source file doesn't exist
+        """
+        source_path = Path(source_path) if source_path is not None else self.source_path
+        if not self.validate_source(source_path):
+            raise FileNotFoundError(f"File not found: {source_path}")
+
+        # newline=None: universal newlines, same line boundaries as load()
+        with open(source_path, 'r', encoding=self.encoding, newline=None) as f:
+            for line_num, line in enumerate(f, 1):
+                item = self._parse_line(line_num, line)
+                if item is not None:
+                    yield item
+
+    def load(self, source_path: Union[str, Path] = None) -> Union[List[Tuple[str, str]], Sequence]:
         """
         Load text lines with IDs from file
         
         Args:
-            source_path: Path to the text file to load
+            source_path: Path to the text file to load (defaults to the path given at construction)
             
         Returns:
-            List of tuples containing (id, text) pairs
+            List of tuples containing (id, text) pairs. Files of MMAP_THRESHOLD bytes or more in
+            an ASCII-compatible encoding (utf-8, latin-1, cp125x...) return a lazy, memory-mapped
+            sequence of the same tuples instead.
             
         Raises:
             FileNotFoundError: If the source file doesn't exist
         """
-        source_path = Path(source_path)
+        source_path = Path(source_path) if source_path is not None else self.source_path
         if not self.validate_source(source_path):
             raise FileNotFoundError(f"File not found: {source_path}")
 
-        text_items = []
         try:
-            with open(source_path, 'r', encoding=self.encoding) as f:
-                for line_num, line in enumerate(f, 1):
-                    text = line.rstrip('\n\r')  # Remove only line endings, keep spaces
-
-                    # Skip empty lines
-                    if not text.strip():
-                        continue
-
-                    # Check if line has format: id\ttext
-                    if '\t' in text:
-                        parts = text.split('\t', 1)
-                        if len(parts) == 2:
-                            text_id, text_content = parts
-                            text_items.append((text_id.strip(), text_content.strip()))
-                        else:
-                            # Malformed line, treat as text without ID
-                            self.logger.warning(f"⚠️ Malformed line {line_num}, treating as text without ID")
-                            text_items.append((str(line_num), text.strip()))
-                    else:
-                        # No tab found, auto-generate ID starting from 1
-                        text_items.append((str(line_num), text.strip()))
+            ascii_compatible = _ascii_compatible(self.encoding)
+            if ascii_compatible and source_path.stat().st_size >= self.MMAP_THRESHOLD:
+                self.logger.info(f"✅ Memory-mapped large text file {source_path}")
+                return _MappedTextItems(source_path, self._parse_raw)
+
+            if not ascii_compatible:
+                # utf-16 / utf-32...: ranh giới dòng không phải byte ASCII, đọc bằng text mode
+                text_items = list(self.iter(source_path))
+                self.logger.info(f"✅ Loaded {len(text_items)} text items from {source_path}")
+                return text_items
+
+            data = source_path.read_bytes()
+            text_items = []
+            for line_num, start, end in _iter_line_spans(data):
+                item = self._parse_raw(line_num, data, start, end)
+                if item is not None:
+                    text_items.append(item)
 
             self.logger.info(f"✅ Loaded {len(text_items)} text items from {source_path}")
             return text_items
@@ -137,14 +294,18 @@ class SimpleCSVLoader(TextLoader):
 class CustomTextLoader(TextLoader):
     """Loader for custom text from file"""
 
+    # JSON files at least this large are streamed (needs ijson)
+    JSON_STREAM_THRESHOLD = 8 << 20
+
     def __init__(self, source_path: Path, text_column: str = None, filters: Dict[str, Any] = None):
-        super().__init__(source_path)
+        super().__init__()
+        self.source_path = Path(source_path)
         self.text_column = text_column
         self.filters = filters or {}
 
     def load(self) -> List[Tuple[str, str]]:
-        """Load text from custom file (CSV, JSON, or text)"""
-        if not self.validate_source():
+        """Load text from custom file (CSV, JSON, or text), keeping only items matching filters"""
+        if not self.validate_source(self.source_path):
             raise FileNotFoundError(f"File not found: {self.source_path}")
 
         suffix = self.source_path.suffix.lower()
@@ -161,18 +322,25 @@ class CustomTextLoader(TextLoader):
 
     def _load_from_csv(self) -> List[Tuple[str, str]]:
         """Load from CSV with id and text columns"""
+        text_column = self.text_column or 'text'
+        if self.filters and pd is not None:
+            return self._load_from_csv_pandas(text_column)
+
         text_items = []
         try:
             with open(self.source_path, 'r', encoding='utf-8') as f:
                 reader = csv.DictReader(f)
 
                 # Validate required columns
-                if 'id' not in reader.fieldnames or 'text' not in reader.fieldnames:
-                    raise ValueError(f"CSV file must have 'id' and 'text' columns. Found: {reader.fieldnames}")
+                if 'id' not in reader.fieldnames or text_column not in reader.fieldnames:
+                    raise ValueError(f"CSV file must have 'id' and '{text_column}' columns. Found: {reader.fieldnames}")
 
                 for row_num, row in enumerate(reader, 1):
+                    if not self._apply_filters(row):
+                        continue
+
                     text_id = row.get('id', '').strip()
-                    text_content = row.get('text', '').strip()
+                    text_content = row.get(text_column, '').strip()
 
                     if text_id and text_content:
                         text_items.append((text_id, text_content))
@@ -183,21 +351,62 @@ class CustomTextLoader(TextLoader):
 
         return text_items
 
+    def _load_from_csv_pandas(self, text_column: str) -> List[Tuple[str, str]]:
+        """Load from CSV with pandas: parse only needed columns and filter with a vectorized mask"""
+        try:
+            fieldnames = list(pd.read_csv(self.source_path, nrows=0, encoding='utf-8').columns)
+            if 'id' not in fieldnames or text_column not in fieldnames:
+                raise ValueError(f"CSV file must have 'id' and '{text_column}' columns. Found: {fieldnames}")
+            if any(key not in fieldnames for key in self.filters):
+                # Same as _apply_filters: a missing filter column matches nothing
+                return []
+
+            usecols = list(dict.fromkeys(['id', text_column, *self.filters]))
+            df = pd.read_csv(self.source_path, usecols=usecols, dtype=str,
+                             keep_default_na=False, encoding='utf-8')
+
+            mask = pd.Series(True, index=df.index)
+            for key, expected_value in self.filters.items():
+                mask &= df[key] == expected_value
+
+            ids = df.loc[mask, 'id'].str.strip()
+            texts = df.loc[mask, text_column].str.strip()
+            keep = (ids != '') & (texts != '')
+            return list(zip(ids[keep].tolist(), texts[keep].tolist()))
+
+        except Exception as e:
+            self.logger.error(f"❌ Error reading CSV: {e}")
+            raise
+
+    def _item_to_text(self, item: Any, default_id: int) -> Optional[Tuple[str, str]]:
+        """Extract (id, text) from one JSON object, or None if filtered out / empty"""
+        if isinstance(item, dict) and self._apply_filters(item):
+            text_id = item.get('id', str(default_id))
+            text_content = item.get('text', item.get('content', item.get('transcript', '')))
+
+            if text_content:
+                return str(text_id), text_content
+        return None
+
     def _load_from_json(self) -> List[Tuple[str, str]]:
-        """Load from JSON file"""
+        """Load from JSON file (streamed with ijson for large files when available)"""
         text_items = []
         try:
-            with open(self.source_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if ijson is not None and self.source_path.stat().st_size >= self.JSON_STREAM_THRESHOLD:
+                with open(self.source_path, 'rb') as f:
+                    for item_num, item in enumerate(ijson.items(f, 'item'), 1):
+                        parsed = self._item_to_text(item, item_num)
+                        if parsed:
+                            text_items.append(parsed)
+                return text_items
+
+            data = _json_loads(self.source_path.read_bytes())
 
             if isinstance(data, list):
                 for item_num, item in enumerate(data, 1):
-                    if isinstance(item, dict):
-                        text_id = item.get('id', str(item_num))
-                        text_content = item.get('text', item.get('content', item.get('transcript', '')))
-
-                        if text_content:
-                            text_items.append((str(text_id), text_content))
+                    parsed = self._item_to_text(item, item_num)
+                    if parsed:
+                        text_items.append(parsed)
 
         except Exception as e:
             self.logger.error(f"❌ Error reading JSON: {e}")
@@ -216,13 +425,9 @@ class CustomTextLoader(TextLoader):
                         continue
 
                     try:
-                        item = json.loads(line)
-                        if isinstance(item, dict):
-                            text_id = item.get('id', str(line_num))
-                            text_content = item.get('text', item.get('content', item.get('transcript', '')))
-
-                            if text_content:
-                                text_items.append((str(text_id), text_content))
+                        parsed = self._item_to_text(_json_loads(line), line_num)
+                        if parsed:
+                            text_items.append(parsed)
 
                     except json.JSONDecodeError as e:
                         self.logger.warning(f"⚠️ Skipping malformed JSON line {line_num}: {e}")
@@ -298,7 +503,7 @@ class TextLoaderFactory:
             loader_type = TextLoaderFactory._detect_loader_type(source_path)
 
         if loader_type == "text":
-            return TextFileLoader(source_path, **kwargs)
+            return TextFileLoader(source_path=source_path, **kwargs)
         elif loader_type == "csv":
             return SimpleCSVLoader(source_path, **kwargs)
         elif loader_type == "custom":
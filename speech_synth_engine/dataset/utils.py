@@ -7,9 +7,8 @@ from rich import print
 def save_list_to_txt(list, path):
     out_path = Path(path)
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(out_path, "w", encoding="utf-8") as f:
-        for item in list:
-            f.write(f"{item}\n")
+    # Ghi một lần thay vì f.write từng dòng
+    out_path.write_text("".join(f"{item}\n" for item in list), encoding="utf-8")
 
 def load_list_from_txt(path):
     with open(path, "r", encoding="utf-8") as f:
@@ -24,9 +23,7 @@ def save_items_to_tsv_txt(items, out_path):
 
     out_p = Path(out_path)
     out_p.parent.mkdir(parents=True, exist_ok=True)
-    with open(out_p, "w", encoding="utf-8") as f:
-        for text_id, text in items:
-            f.write(f"{text_id}\t{text}\n")
+    out_p.write_text("".join(f"{text_id}\t{text}\n" for text_id, text in items), encoding="utf-8")
 
     return str(out_p)
 
@@ -5,11 +5,19 @@
 # ============================================================
 
 from abc import ABC, abstractmethod
+from enum import Enum
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 import logging
 import json
 from ...schemas.provider import ProviderConfig, VoiceConfig, AudioConfig
+from ..utils import ensure_dir
+
+class ProviderKind(str, Enum):
+    """How a provider talks to its backend; decides how DatasetGenerator schedules its items."""
+    HTTP = "http"          # stateless requests: may be sent concurrently from a thread pool
+    SELENIUM = "selenium"  # one stateful browser driver: items are processed serially
+
 
 class TTSProvider(ABC):
     """
@@ -17,6 +25,14 @@ class TTSProvider(ABC):
     Extended from the original TTSProvider with metadata and directory structure support.
     """
 
+    kind: ProviderKind = ProviderKind.HTTP
+    # Browser-driven providers hold one stateful driver: callers must not call them concurrently
+    # (giữ cho code cũ; tương đương kind is ProviderKind.SELENIUM)
+    is_selenium: bool = False
+    # Providers whose synthesize_many() runs several texts in one inference call (e.g. local
+    # neural models); DatasetGenerator then sends items to it in chunks of batch_size
+    supports_batch_inference: bool = False
+
     def __init__(self, name: str, config: Dict[str, Any] = None):
         self.name = name
         self.config = config or {}
@@ -216,7 +232,7 @@ class TTSProvider(ABC):
                 return result
 
             # Ensure output directory exists
-            Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+            ensure_dir(Path(output_file).parent)
 
             # Try provider-specific clone(text, output_file, voice_cloning_config=...)
             success = False
@@ -250,6 +266,20 @@ class TTSProvider(ABC):
             return result
 
 
+    def synthesize_many(self, texts: List[str], output_files: List[Path],
+                        generation_config: Optional[Any] = None) -> List[Any]:
+        """
+        Synthesize several texts in one call; returns one result per text, in order
+        (same shapes as synthesize_with_metadata: dict, result object or bool).
+
+        The default just loops over synthesize_with_metadata. Providers with batched
+        inference override this and set supports_batch_inference = True.
+        """
+        return [
+            self.synthesize_with_metadata(text, output_file, generation_config=generation_config)
+            for text, output_file in zip(texts, output_files)
+        ]
+
     def synthesize_batch(self, text_file: Path, voice: str, output_dir: Path) -> Dict[str, Any]:
         """
         Synthesize multiple texts from a file.
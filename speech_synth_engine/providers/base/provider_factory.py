@@ -19,6 +19,18 @@ current_dir = Path(__file__).parent.parent.parent
 
 from .provider import TTSProvider, ProviderCapabilities
 
+# Built-in providers as "module:Class", imported only when first created
+# (tránh import gtts/selenium/SDK của mọi provider khi chỉ dùng một provider)
+_BUILTIN_PROVIDERS: Dict[str, str] = {
+    'gtts': 'gtts_provider:GTTSProvider',
+    'gemini': 'gemini_provider:GeminiTTSProvider',
+    'vnpost': 'vnpost_provider:VnPostTTSProvider',
+    'minimax_selenium': 'minimax_selenium_provider:MiniMaxSeleniumProvider',
+    'elevenlabs': 'elevenlabs_provider:ElevenLabsProvider',
+    'cartesia': 'cartesia_provider:CartesiaTTSProvider',
+    'xiaomi': 'xiaomi_provider:XiaomiTTSProvider',
+}
+
 class ProviderFactory:
     """
     Factory for creating TTS Provider instances from configuration.
@@ -34,31 +46,22 @@ class ProviderFactory:
         self._register_builtin_providers()
 
     def _register_builtin_providers(self):
-        """Register built-in providers"""
-        try:
-            from ..gtts_provider import GTTSProvider
-            from ..gemini_provider import GeminiTTSProvider
-            from ..vnpost_provider import VnPostTTSProvider
-            from ..minimax_selenium_provider import MiniMaxSeleniumProvider
-            from ..elevenlabs_provider import ElevenLabsProvider
-            from ..cartesia_provider import CartesiaTTSProvider
-            from ..xiaomi_provider import XiaomiTTSProvider
-
-            self._provider_classes.update({
-                'gtts': GTTSProvider,        
-                'gemini': GeminiTTSProvider, 
-                'vnpost': VnPostTTSProvider,
-                'minimax_selenium': MiniMaxSeleniumProvider,
-                'elevenlabs': ElevenLabsProvider,
-                'cartesia': CartesiaTTSProvider,
-                'xiaomi': XiaomiTTSProvider,
-            })
-
-            self.logger.debug(f"Registered {len(self._provider_classes)} built-in providers")
-
-        except ImportError as e:
-            self.logger.warning(f"⚠️ Cannot import some providers: {e}")
-            self.logger.exception("Detailed error:")
+        """Register built-in providers (lazily: modules are imported on first use)"""
+        self._provider_classes.update(_BUILTIN_PROVIDERS)
+        self.logger.debug(f"Registered {len(self._provider_classes)} built-in providers")
+
+    def _resolve_provider_class(self, name: str) -> Optional[Type[TTSProvider]]:
+        """Provider class for name, importing its module on first use."""
+        provider_class = self._provider_classes.get(name)
+        if isinstance(provider_class, str):
+            module_name, class_name = provider_class.split(':')
+            try:
+                module = importlib.import_module(f"..{module_name}", __package__)
+            except ImportError as e:
+                self.logger.warning(f"⚠️ Cannot import provider '{name}': {e}")
+                raise ValueError(f"Provider '{name}' is not available: {e}")
+            provider_class = self._provider_classes[name] = getattr(module, class_name)
+        return provider_class
 
     def register_provider_class(self, name: str, provider_class: Type[TTSProvider]):
         """Register additional provider class"""
@@ -99,7 +102,7 @@ class ProviderFactory:
             self.logger.warning(f"provider_config validation failed for '{provider_name}': {e}")
 
         # Find provider class
-        provider_class = self._provider_classes.get(provider_name.lower())
+        provider_class = self._resolve_provider_class(provider_name.lower())
         if not provider_class:
             raise ValueError(f"Provider '{provider_name}' is not supported. "
                            f"Available providers: {list(self._provider_classes.keys())}")
@@ -6,9 +6,12 @@
 
 import os
 import time
+import atexit
+import weakref
 import logging
 import tempfile
 import shutil
+import socket
 import subprocess
 from abc import abstractmethod
 from pathlib import Path
@@ -27,7 +30,26 @@ except ImportError:
     # Fallback to regular Chrome driver if undetected_chromedriver not available
     uc = None
 
-from .provider import TTSProvider
+from .provider import TTSProvider, ProviderKind
+from ..utils import stream_to_file
+
+
+# Provider đang giữ một Chrome driver; quit khi process thoát nếu chưa được cleanup()
+_LIVE_PROVIDERS: "weakref.WeakSet[SeleniumProvider]" = weakref.WeakSet()
+
+
+@atexit.register
+def _quit_live_drivers() -> None:
+    """Quit drivers still open at interpreter exit (no orphaned Chrome processes)."""
+    for provider in list(_LIVE_PROVIDERS):
+        provider.cleanup()
+
+
+def _free_local_port() -> int:
+    """Ask the OS for an unused local TCP port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
 
 
 class SeleniumProvider(TTSProvider):
@@ -36,6 +58,9 @@ class SeleniumProvider(TTSProvider):
     Provides common Selenium functionality and abstract methods for provider-specific implementations.
     """
 
+    kind = ProviderKind.SELENIUM
+    is_selenium = True
+
     def __init__(self, name: str, config: Dict[str, Any] = None):
         super().__init__(name, config)
 
@@ -46,6 +71,11 @@ class SeleniumProvider(TTSProvider):
         self.window_size = self.config.get('window_size', '1920x1080')
         self.timeout = self.config.get('timeout', 30)
         self.download_timeout = self.config.get('download_timeout', 120)
+        # Driver được giữ giữa các item / batch; quá lâu không dùng thì khởi tạo lại (session hết hạn)
+        self.driver_idle_ttl = self.config.get('driver_idle_ttl', 300)
+        self._driver_last_used = 0.0
+        # Mỗi instance một port riêng để nhiều driver có thể chạy song song trong cùng process
+        self.remote_debugging_port = self.config.get('remote_debugging_port') or _free_local_port()
 
         # Chrome profile configuration (persistent login)
         # If chrome_profile_name is provided, we will use a persistent profile directory:
@@ -138,7 +168,7 @@ class SeleniumProvider(TTSProvider):
             options.add_argument('--no-default-browser-check')
             options.add_argument('--disable-popup-blocking')
             options.add_argument('--disable-features=TranslateUI')
-            options.add_argument("--remote-debugging-port=" + str(9222 + os.getpid() % 1000))
+            options.add_argument(f"--remote-debugging-port={self.remote_debugging_port}")
 
             # Reduce automation fingerprinting
             # options.add_experimental_option('excludeSwitches', ['enable-automation'])
@@ -209,6 +239,21 @@ class SeleniumProvider(TTSProvider):
 
 
     
+    def ensure_driver(self) -> bool:
+        """
+        Return True once a driver is ready, reusing the current one.
+        A driver idle for more than driver_idle_ttl seconds is recycled first.
+        """
+        now = time.monotonic()
+        if self.driver and self.driver_idle_ttl and now - self._driver_last_used > self.driver_idle_ttl:
+            self.logger.info(f"♻️ Driver idle for {now - self._driver_last_used:.0f}s, restarting it")
+            self.cleanup()
+        if not self.driver and not self.setup_driver():
+            return False
+        self._driver_last_used = now
+        _LIVE_PROVIDERS.add(self)
+        return True
+
     def navigate_to_base_url(self) -> bool:
         """Navigate to the provider's base URL"""
         if not self.driver:
@@ -248,11 +293,11 @@ class SeleniumProvider(TTSProvider):
             import requests
 
             self.logger.info(f"📥 Downloading audio from: {audio_url}")
-            response = requests.get(audio_url, timeout=self.download_timeout)
+            with requests.get(audio_url, timeout=self.download_timeout, stream=True) as response:
+                if response.status_code == 200:
+                    stream_to_file(response, output_file)
 
             if response.status_code == 200:
-                with open(output_file, 'wb') as f:
-                    f.write(response.content)
 
                 if output_file.exists() and output_file.stat().st_size > 0:
                     self.logger.info(f"✅ Audio downloaded successfully: {output_file}")
@@ -360,6 +405,7 @@ class SeleniumProvider(TTSProvider):
 
     def cleanup(self) -> None:
         """Clean up resources"""
+        _LIVE_PROVIDERS.discard(self)
         if self.driver:
             try:
                 self.driver.quit()
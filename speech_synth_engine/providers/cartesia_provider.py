@@ -48,7 +48,7 @@ from dotenv import load_dotenv
 
 from .base.provider import TTSProvider
 from speech_synth_engine.schemas.provider import VoiceConfig, AudioConfig, ProviderConfig
-from .utils import resolve_api_key, extract_voice_params, extract_audio_params, validate_enum_value
+from .utils import resolve_api_key, extract_voice_params, extract_audio_params, validate_enum_value, ensure_dir
 
 # Load environment variables
 load_dotenv()
@@ -288,7 +288,7 @@ class CartesiaTTSProvider(TTSProvider):
 
             # Ensure output directory exists
             output_path = Path(output_file)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
+            ensure_dir(output_path.parent)
 
             # Make API call
             url = f"{self.api_base.rstrip('/')}/tts/bytes"
@@ -11,6 +11,7 @@ from dotenv import load_dotenv
 from .base.provider import TTSProvider
 from speech_synth_engine.schemas.provider import VoiceConfig, AudioConfig, ProviderConfig
 from .api_keys import APIKeyManager
+from .utils import ensure_dir
 
 # Load environment variables
 load_dotenv()
@@ -276,7 +277,7 @@ class GeminiTTSProvider(TTSProvider):
 
         # Ensure output_file is a Path object and create parent directories
         output_file = Path(output_file) if not isinstance(output_file, Path) else output_file
-        output_file.parent.mkdir(parents=True, exist_ok=True)
+        ensure_dir(output_file.parent)
         
         # Resolve audio output parameters
         channels = (audio_cfg.channel if (audio_cfg and getattr(audio_cfg, 'channel', None) is not None) else 1)
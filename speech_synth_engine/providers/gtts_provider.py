@@ -7,11 +7,26 @@ from typing import Dict, List, Any
 # sys.path.append(os.path.abspath(os.path.join(__file__, "../../")))
 
 import os
-import tempfile
-from gtts import gTTS
+import io
+import time
+import threading
+from gtts import gTTS, gTTSError
 from pydub import AudioSegment
+
+# soxr (tuỳ chọn): resample chất lượng cao, nhanh hơn audioop.ratecv của pydub
+try:
+    import numpy as np
+    import soxr
+except ImportError:
+    soxr = None
 from typing import Optional
 from ..providers.base.provider import TTSProvider
+from .utils import ensure_dir
+
+# Retry khi Google trả về rate limit / lỗi 5xx hoặc lỗi mạng (gTTS bọc cả hai trong gTTSError)
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+_MAX_RETRIES = 3
+_RETRY_BACKOFF = 0.3  # giây, nhân đôi sau mỗi lần thử
 
 class GTTSProvider(TTSProvider):
     """
@@ -19,6 +34,19 @@ class GTTSProvider(TTSProvider):
     Updated to inherit from TTSProvider with full enhanced features.
     """
 
+    # MP3 buffer tái sử dụng theo từng thread (thay cho file tạm mỗi lần synthesize)
+    _mp3_buffers = threading.local()
+
+    @classmethod
+    def _borrow_mp3_buffer(cls) -> io.BytesIO:
+        """Return this thread's MP3 buffer, emptied but keeping its allocation."""
+        buf = getattr(cls._mp3_buffers, "buf", None)
+        if buf is None:
+            buf = cls._mp3_buffers.buf = io.BytesIO()
+        buf.seek(0)
+        buf.truncate()
+        return buf
+
     def __init__(self, name: str = "gtts", provider_config: Any = None):
         """
         GTTSProvider đồng bộ interface với các provider khác, không lấy language/sample_rate từ provider_config.
@@ -26,9 +54,46 @@ class GTTSProvider(TTSProvider):
         """
         super().__init__(name, {"provider_config": provider_config} if provider_config else {})
         self.provider_config = provider_config
+        # Sample rate mặc định của output; AudioConfig.sample_rate (nếu có) được ưu tiên khi synthesize
+        self.sample_rate = self.sample_rate or 22050
         # Track last error for detailed error reporting
         self.last_error: Optional[str] = None
-        # Không lấy self.lang, self.sample_rate ở đây nữa
+        # Không lấy self.lang ở đây nữa
+
+    @staticmethod
+    def _resample(audio: AudioSegment, sample_rate: int) -> AudioSegment:
+        """Resample a segment, using soxr for 16-bit audio when it is installed."""
+        if audio.frame_rate == sample_rate:
+            return audio
+        if soxr is None or audio.sample_width != 2:
+            return audio.set_frame_rate(sample_rate)
+
+        samples = np.frombuffer(audio.raw_data, dtype=np.int16)
+        if audio.channels > 1:
+            samples = samples.reshape(-1, audio.channels)
+        resampled = soxr.resample(samples, audio.frame_rate, sample_rate, quality='HQ')
+        return audio._spawn(resampled.tobytes(), overrides={'frame_rate': sample_rate})
+
+    def _write_mp3(self, tts: gTTS, fp: io.BytesIO) -> None:
+        """
+        Write gTTS audio to fp with gTTS.write_to_fp().
+
+        Rate limits (429), 5xx responses and network errors are retried with
+        exponential backoff; partial audio from a failed attempt is discarded.
+        """
+        start = fp.tell()
+        for attempt in range(_MAX_RETRIES + 1):
+            try:
+                tts.write_to_fp(fp)
+                return
+            except gTTSError as e:
+                status = getattr(e.rsp, "status_code", None)
+                if attempt == _MAX_RETRIES or (status is not None and status not in _RETRY_STATUSES):
+                    raise
+                self.logger.debug(f"gTTS request failed ({e}), retrying")
+                fp.seek(start)
+                fp.truncate()
+                time.sleep(_RETRY_BACKOFF * 2 ** attempt)
 
     def _get_supported_voices(self) -> List[str]:
         """GTTS supports Vietnamese by default"""
@@ -39,6 +104,7 @@ class GTTSProvider(TTSProvider):
         Chuẩn hóa interface synthesize: nhận text, output_file, generation_config (chuẩn hệ thống provider).
         - Lấy language từ generation_config.voice_config.voice_id nếu có, mặc định 'vi'.
         - Lấy sample_rate từ generation_config.audio_config nếu có, mặc định 22050.
+          WAV được ghi trực tiếp ở sample rate đó (int16, mono), không cần resample lại sau.
         """
         # Clear any previous error
         self.last_error = None
@@ -54,8 +120,11 @@ class GTTSProvider(TTSProvider):
             lang = 'vi'
             if generation_config and getattr(generation_config, 'voice_config', None):
                 lang = getattr(generation_config.voice_config, 'voice_id', 'vi')
-            # GTTS chỉ cần lang, không quan tâm sample_rate/audio_config
-            sample_rate = 22050  # giữ để không lỗi đoạn pydub, nhưng không lấy từ audio_config
+            # Resolve output sample rate (e.g. 16000 for ASR data) from audio_config
+            sample_rate = None
+            if generation_config and getattr(generation_config, 'audio_config', None):
+                sample_rate = getattr(generation_config.audio_config, 'sample_rate', None)
+            sample_rate = sample_rate or self.sample_rate
 
             # Validate voice
             if lang not in self.supported_voices:
@@ -65,40 +134,32 @@ class GTTSProvider(TTSProvider):
 
             # Normalize output path and ensure directory exists
             output_path = Path(output_file) if isinstance(output_file, str) else output_file
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # Create temporary MP3 file from gTTS
-            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp_mp3:
-                mp3_path = tmp_mp3.name
-
-            try:
-                # Create gTTS object and save MP3
-                tts = gTTS(text=text, lang=lang)
-                tts.save(mp3_path)
-
-                # Read MP3 and convert to WAV with configured sample rate
-                audio = AudioSegment.from_mp3(mp3_path)
-
-                # Set sample rate according to config
-                audio = audio.set_frame_rate(sample_rate)
-
-                # Save WAV
-                audio.export(str(output_path), format="wav")
-
-                # Enhanced: return success/failure with detailed information
-                if output_path.exists():
-                    file_size = output_path.stat().st_size
-                    self.logger.info(f"GTTS synthesis successful: {output_path} ({file_size/1024:.1f}KB)")
-                    return True
-                else:
-                    self.last_error = f"GTTS file was not created: {output_path}"
-                    self.logger.error(f"❌ {self.last_error}")
-                    return False
-
-            finally:
-                # Delete temporary MP3 file
-                if os.path.exists(mp3_path):
-                    os.remove(mp3_path)
+            ensure_dir(output_path.parent)
+
+            # Create gTTS object and write MP3 into the reusable in-memory buffer
+            mp3_buffer = self._borrow_mp3_buffer()
+            tts = gTTS(text=text, lang=lang)
+            self._write_mp3(tts, mp3_buffer)
+            mp3_buffer.seek(0)
+
+            # Read MP3 and convert to WAV with configured sample rate
+            audio = AudioSegment.from_file(mp3_buffer, format="mp3")
+
+            # Set sample rate according to config (no-op when gTTS already matches)
+            audio = self._resample(audio, sample_rate)
+
+            # Save WAV
+            audio.export(str(output_path), format="wav")
+
+            # Enhanced: return success/failure with detailed information
+            if output_path.exists():
+                file_size = output_path.stat().st_size
+                self.logger.info(f"GTTS synthesis successful: {output_path} ({file_size/1024:.1f}KB)")
+                return True
+            else:
+                self.last_error = f"GTTS file was not created: {output_path}"
+                self.logger.error(f"❌ {self.last_error}")
+                return False
 
         except Exception as e:
             self.last_error = f"GTTS synthesis error: {e}"
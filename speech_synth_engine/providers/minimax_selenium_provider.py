@@ -4,8 +4,13 @@
 # TTS provider using MiniMax voice cloning via Selenium automation
 # ============================================================
 
+import re
 import time
 import os
+import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
 from selenium.webdriver.common.by import By
@@ -15,15 +20,28 @@ from selenium.common.exceptions import TimeoutException, WebDriverException, NoS
 from selenium.webdriver.support.ui import WebDriverWait
 
 from .base.selenium_provider import SeleniumProvider
+from .utils import ensure_dir
 from speech_synth_engine.schemas.schemas import SynthesisResult
 
 
+# Ký tự được giữ trong tên file output: chữ/số (unicode), '_', ' ', '-' (biên dịch một lần)
+_UNSAFE_ID_CHARS_RE = re.compile(r'[^\w \-]')
+
+
+def _safe_text_id(text_id: str) -> str:
+    """Strip characters that are unsafe in output file names from a text id."""
+    return _UNSAFE_ID_CHARS_RE.sub('', text_id).rstrip()
+
+
 class MiniMaxSeleniumProvider(SeleniumProvider):
     """
     MiniMax TTS provider using Selenium automation for voice cloning.
     Supports both direct synthesis and voice cloning from reference audio.
     """
 
+    # Only one driver performs the Google OAuth flow at a time
+    _auth_lock = threading.Lock()
+
     def __init__(self, name: str, config: Dict[str, Any] = None):
         super().__init__(name, config)
 
@@ -36,18 +54,77 @@ class MiniMaxSeleniumProvider(SeleniumProvider):
         self.language = self.config.get('language', 'Vietnamese')
         self.max_wait_time = self.config.get('max_wait_time', 300)  # 5 minutes max
 
+        # Reference audio currently uploaded in this driver session: (resolved path, mtime_ns).
+        # The cloning form keeps the upload between generations, so the same file is not re-sent.
+        self._uploaded_reference: Optional[Tuple[Path, int]] = None
+        self._initialized = False
+
+        # Cookies của phiên đã đăng nhập được lưu ra file để lần chạy sau bỏ qua Google login
+        self.persist_cookies = self.config.get('persist_cookies', True)
+        cookies_file = self.config.get('cookies_file') or os.environ.get('MINIMAX_COOKIES_FILE')
+        self.cookies_file = (Path(cookies_file) if cookies_file else (
+            Path(self.config.get('cache_dir', Path.home() / ".cache" / "speech_synth_engine")) / "minimax_cookies.json"
+        )).expanduser()
+        self._cookies_restored = False
+
     def _get_supported_voices(self) -> List[str]:
         """MiniMax supports voice cloning, so we return generic voice names"""
         return ["cloned_voice", "reference_voice"]
 
+    def _restore_saved_cookies(self) -> bool:
+        """Load cookies saved by a previous login into the current page and reload it."""
+        if not self.persist_cookies or self._cookies_restored or not self.cookies_file.is_file():
+            return False
+        self._cookies_restored = True
+        try:
+            with open(self.cookies_file, 'r', encoding='utf-8') as f:
+                cookies = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"⚠️ Could not read saved cookies {self.cookies_file}: {e}")
+            return False
+
+        restored = 0
+        for cookie in cookies:
+            try:
+                self.driver.add_cookie(cookie)
+                restored += 1
+            except Exception:
+                # Cookie của domain khác (vd. accounts.google.com) không add được vào trang hiện tại
+                pass
+        if restored:
+            self.driver.refresh()
+            self.logger.info(f"🍪 Restored {restored} saved cookies from {self.cookies_file}")
+        return restored > 0
+
+    def _save_cookies(self) -> None:
+        """Persist the cookies of an authenticated session."""
+        if not self.persist_cookies:
+            return
+        try:
+            cookies = self.driver.get_cookies()
+            ensure_dir(self.cookies_file.parent)
+            tmp_path = self.cookies_file.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cookies, f)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.cookies_file)
+            self.logger.debug(f"Saved {len(cookies)} cookies to {self.cookies_file}")
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not save cookies to {self.cookies_file}: {e}")
+
     def authenticate(self) -> bool:
         """
         Authenticate with MiniMax using Google OAuth.
         Based on the workflow from selenium_vc.py
+
+        Cookies from a previous successful login (cookies_file) are restored
+        first, so warm starts skip the Google login form entirely.
         """
         try:
             self.logger.info("🔐 Starting MiniMax authentication...")
 
+            self._restore_saved_cookies()
+
             # Store main window handle
             self.main_window = self.driver.current_window_handle
 
@@ -155,6 +232,7 @@ class MiniMaxSeleniumProvider(SeleniumProvider):
                 self.last_error = str(e)
 
             self.is_authenticated = True
+            self._save_cookies()
             self.logger.info("✅ MiniMax authentication successful")
             return True
 
@@ -532,6 +610,67 @@ class MiniMaxSeleniumProvider(SeleniumProvider):
             self.take_screenshot("minimax_generation_error.png")
             return False, None
 
+    def _ensure_reference_uploaded(self, reference_audio: Path) -> bool:
+        """
+        Upload reference audio unless the same file (path + mtime) is already
+        uploaded in the current driver session.
+        """
+        key = (reference_audio.resolve(), reference_audio.stat().st_mtime_ns)
+        if self._uploaded_reference == key:
+            self.logger.debug(f"Reference audio already uploaded: {reference_audio}")
+            return True
+
+        if not self._upload_reference_audio(reference_audio):
+            self._uploaded_reference = None
+            return False
+
+        self._uploaded_reference = key
+        self.logger.info(f"✅ Uploaded reference audio: {reference_audio}")
+        return True
+
+    def prepare_reference(self, reference_audio: Path) -> Optional[Tuple[Path, int]]:
+        """
+        Setup driver, authenticate and upload reference audio once.
+
+        Returns an opaque reference handle to pass to the batch items (or None on
+        failure). While the handle matches the upload in the current page,
+        items skip the upload check entirely.
+        """
+        try:
+            if not self.driver and not self.setup_driver():
+                return None
+            if not self._initialized and not self.navigate_to_base_url():
+                return None
+            if not self.is_authenticated and not self.authenticate():
+                return None
+            self._initialized = True
+            if not self._ensure_reference_uploaded(Path(reference_audio)):
+                return None
+            return self._uploaded_reference
+        except Exception as e:
+            self.logger.error(f"❌ Error preparing reference audio: {e}")
+            return None
+
+    def warm_reference(self, reference_audio: Path) -> bool:
+        """
+        Setup driver, authenticate and upload reference audio ahead of a batch,
+        so the first item does not pay the cold-start cost.
+        """
+        return self.prepare_reference(reference_audio) is not None
+
+    def navigate_to_base_url(self) -> bool:
+        """Navigate to MiniMax; a page reload drops the uploaded reference"""
+        self._uploaded_reference = None
+        return super().navigate_to_base_url()
+
+    def cleanup(self) -> None:
+        """Clean up resources; the uploaded reference does not survive the driver"""
+        super().cleanup()
+        self._uploaded_reference = None
+        self._initialized = False
+        # Trang mới của driver sau sẽ phải chọn lại ngôn ngữ
+        self.__dict__.pop('_language_selected', None)
+
     def generate_voice(self, text: str, reference_audio: Optional[Path] = None) -> Tuple[bool, Optional[str]]:
         """
         Generate voice from text, optionally with reference audio for cloning.
@@ -554,24 +693,27 @@ class MiniMaxSeleniumProvider(SeleniumProvider):
                 # Upload reference audio if provided (for cloning)
                 reference_audio = Path(reference_audio)
                 if reference_audio.exists():
-                    if not self._upload_reference_audio(reference_audio):
+                    if not self._ensure_reference_uploaded(reference_audio):
                         return False, None
-                    self.logger.info(f"✅ Uploaded reference audio: {reference_audio}")
 
-            # Select language (only once per session)
-            if not hasattr(self, '_language_selected'):
-                if not self._select_language(self.language):
-                    return False, None
-                self._language_selected = True
-
-            # Generate voice from text using the existing method
-            return self._generate_voice_from_text(text)
+            return self._generate_with_uploaded_reference(text)
 
         except Exception as e:
             self.logger.error(f"❌ Error in generate_voice: {e}")
             self.take_screenshot("minimax_generate_voice_error.png")
             return False, None
 
+    def _generate_with_uploaded_reference(self, text: str) -> Tuple[bool, Optional[str]]:
+        """Generate voice with whatever reference is currently uploaded in the form."""
+        # Select language (only once per session)
+        if not hasattr(self, '_language_selected'):
+            if not self._select_language(self.language):
+                return False, None
+            self._language_selected = True
+
+        # Generate voice from text using the existing method
+        return self._generate_voice_from_text(text)
+
     def synthesize_with_metadata(self, text: str, voice: str, output_file: Path) -> SynthesisResult:
         """
         Synthesize with comprehensive metadata information.
@@ -597,21 +739,22 @@ class MiniMaxSeleniumProvider(SeleniumProvider):
                 result['error'] = {'message': 'No reference audio uploaded and none provided. Please provide a reference audio file for voice cloning.'}
                 return result
 
-            # Setup driver and authenticate
-            if not self.driver:
-                if not self.setup_driver():
-                    result['error'] = {'message': 'Failed to setup driver'}
-                    return result
-
-            if not self.navigate_to_base_url():
-                result['error'] = {'message': 'Failed to navigate to MiniMax'}
+            # Setup driver and authenticate (once; the driver is kept for the next items)
+            if not self.ensure_driver():
+                result['error'] = {'message': 'Failed to setup driver'}
                 return result
 
-            if not self.is_authenticated:
-                if not self.authenticate():
+            if not self._initialized:
+                if not self.navigate_to_base_url():
+                    result['error'] = {'message': 'Failed to navigate to MiniMax'}
+                    return result
+
+                if not self.is_authenticated and not self.authenticate():
                     result['error'] = {'message': 'Authentication failed'}
                     return result
 
+                self._initialized = True
+
             # Generate voice with reference audio (MiniMax voice cloning)
             success, audio_url = self.generate_voice(text, reference_audio)
 
@@ -634,9 +777,6 @@ class MiniMaxSeleniumProvider(SeleniumProvider):
             self.logger.error(f"❌ MiniMax synthesis error: {e}")
             self.take_screenshot("minimax_synthesis_error.png")
 
-        finally:
-            self.cleanup()
-
         return result
 
     def _find_reference_audio(self) -> Optional[Path]:
@@ -687,12 +827,12 @@ class MiniMaxSeleniumProvider(SeleniumProvider):
         }
 
         try:
-            # Setup driver and authenticate (only once)
-            if not hasattr(self, '_initialized') or not self._initialized:
-                if not self.driver and not self.setup_driver():
-                    result['error'] = {'message': 'Failed to setup driver'}
-                    return result
+            # Setup driver and authenticate (only once; an idle driver is recycled)
+            if not self.ensure_driver():
+                result['error'] = {'message': 'Failed to setup driver'}
+                return result
 
+            if not self._initialized:
                 if not self.navigate_to_base_url():
                     result['error'] = {'message': 'Failed to navigate to MiniMax'}
                     return result
@@ -727,10 +867,179 @@ class MiniMaxSeleniumProvider(SeleniumProvider):
 
         return result
 
-    def clone_batch(self, text_file: Path, reference_audio: Path, output_dir: Path) -> Dict[str, Any]:
+    def _clone_item(self, text_id: str, text: str, reference_audio: Path, output_dir: Path,
+                    reference_handle: Optional[Tuple[Path, int]] = None) -> Dict[str, Any]:
+        """
+        Clone one (id, text) item into output_dir; assumes the driver is ready and authenticated.
+        With a reference_handle from prepare_reference() that is still uploaded, the
+        reference is reused as is; otherwise it is (re-)uploaded.
+        """
+        # Generate output filename
+        safe_id = _safe_text_id(text_id)
+        output_file = output_dir / f"minimax_{safe_id}.wav"
+
+        try:
+            # Generate voice with reference audio
+            if reference_handle is not None and reference_handle == self._uploaded_reference:
+                success, audio_url = self._generate_with_uploaded_reference(text)
+            else:
+                success, audio_url = self.generate_voice(text, reference_audio)
+
+            if success and audio_url:
+                # Download audio
+                if self.download_audio(audio_url, output_file):
+                    self.logger.info(f"✅ Generated: {output_file}")
+                    return {
+                        'id': text_id,
+                        'text': text,
+                        'output_file': str(output_file),
+                        'success': True,
+                        'audio_url': audio_url
+                    }
+                self.logger.error(f"❌ Download failed: {output_file}")
+                return {
+                    'id': text_id,
+                    'text': text,
+                    'output_file': str(output_file),
+                    'success': False,
+                    'error': 'Download failed'
+                }
+
+            self.logger.error(f"❌ Generation failed: {text_id}")
+            return {
+                'id': text_id,
+                'text': text,
+                'output_file': str(output_file),
+                'success': False,
+                'error': 'Generation failed'
+            }
+
+        except Exception as e:
+            self.logger.error(f"❌ Error processing {text_id}: {e}")
+            return {
+                'id': text_id,
+                'text': text,
+                'output_file': str(output_dir / f"minimax_{text_id}.wav"),
+                'success': False,
+                'error': str(e)
+            }
+
+    def _batch_summary(self, text_items, results: List[Dict[str, Any]], reference_audio: Path, output_dir: Path,
+                       processed: int) -> Dict[str, Any]:
+        """Build the batch result dict returned by clone_batch (processed = successes counted while running)"""
+        failed = len(results) - processed
+        success_rate = processed / len(text_items) * 100 if text_items else 0
+
+        self.logger.info(f"📊 Batch processing complete: {processed}/{len(text_items)} successful ({success_rate:.1f}%)")
+
+        return {
+            'success': failed == 0,
+            'total_texts': len(text_items),
+            'processed': processed,
+            'failed': failed,
+            'success_rate': success_rate,
+            'results': results,
+            'reference_audio': str(reference_audio),
+            'output_directory': str(output_dir)
+        }
+
+    def _prepare_session(self, shared_cookies: Optional[List[Dict[str, Any]]] = None) -> bool:
+        """
+        Setup driver, open MiniMax and authenticate (one Google login at a time across drivers).
+
+        shared_cookies: session cookies shared between drivers. Reused when present; the first
+        driver to log in fills it while still holding the login lock, so drivers waiting on the
+        lock pick them up instead of logging in again.
+        """
+        if not self.driver and not self.setup_driver():
+            return False
+        if not self.navigate_to_base_url():
+            return False
+        if self.is_authenticated:
+            return True
+
+        with MiniMaxSeleniumProvider._auth_lock:
+            if shared_cookies:
+                # Reuse the session of a driver that already logged in
+                for cookie in shared_cookies:
+                    try:
+                        self.driver.add_cookie(cookie)
+                    except Exception:
+                        pass
+                self.driver.refresh()
+            if not self.authenticate():
+                return False
+            if shared_cookies is not None and not shared_cookies:
+                try:
+                    shared_cookies.extend(self.driver.get_cookies())
+                except Exception:
+                    pass
+            return True
+
+    def _clone_batch_parallel(self, text_items, reference_audio: Path, output_dir: Path, num_workers: int) -> Dict[str, Any]:
+        """Distribute items over a pool of independent Chrome drivers."""
+        work_queue: "queue.Queue" = queue.Queue()
+        for index, item in enumerate(text_items):
+            work_queue.put((index, item))
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(text_items)
+        shared_cookies: List[Dict[str, Any]] = []
+        base_profile = self.chrome_profile_name or f"profile_{os.getpid()}"
+
+        def worker(worker_index: int) -> int:
+            # Separate profile dir per driver; no fixed debugging port, each driver gets a free one
+            worker_config = {
+                **self.config,
+                'chrome_profile_name': f"{base_profile}_w{worker_index}",
+                'remote_debugging_port': None,
+            }
+            provider = MiniMaxSeleniumProvider(f"{self.name}_w{worker_index}", worker_config)
+            try:
+                if not provider._prepare_session(shared_cookies):
+                    provider.logger.error("❌ Worker failed to setup/authenticate, leaving its items to other workers")
+                    return 0
+                provider._initialized = True
+                reference_handle = provider.prepare_reference(reference_audio)
+
+                succeeded = 0
+                while True:
+                    try:
+                        index, (text_id, text) = work_queue.get_nowait()
+                    except queue.Empty:
+                        return succeeded
+                    provider.logger.info(f"🎤 [worker {worker_index}] Processing text {index + 1}/{len(text_items)}: {text_id}")
+                    results[index] = provider._clone_item(text_id, text, reference_audio, output_dir, reference_handle)
+                    succeeded += results[index]['success']
+                    # Brief pause between requests to avoid overwhelming the service
+                    time.sleep(2)
+            finally:
+                provider.cleanup()
+
+        processed = 0
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            for future in [executor.submit(worker, i) for i in range(num_workers)]:
+                processed += future.result()
+
+        # Items no worker could take (e.g. every driver failed to start)
+        for index, (text_id, text) in enumerate(text_items):
+            if results[index] is None:
+                results[index] = {
+                    'id': text_id,
+                    'text': text,
+                    'output_file': None,
+                    'success': False,
+                    'error': 'No available worker'
+                }
+
+        return self._batch_summary(text_items, results, reference_audio, output_dir, processed)
+
+    def clone_batch(self, text_file: Path, reference_audio: Path, output_dir: Path, num_workers: int = 1) -> Dict[str, Any]:
         """
         Clone voice and synthesize multiple texts from a file.
         This is the main method for batch MiniMax voice cloning.
+
+        With num_workers > 1, items are spread over that many independent Chrome
+        drivers (separate profiles), which overlaps page loads and DOM waits.
         """
         try:
             # Import TextFileLoader
@@ -741,7 +1050,7 @@ class MiniMaxSeleniumProvider(SeleniumProvider):
             self.logger.info(f"📁 Output directory: {output_dir}")
 
             # Load texts from file
-            loader = TextFileLoader(text_file)
+            loader = TextFileLoader(source_path=text_file)
             text_items = loader.load()
 
             if not text_items:
@@ -750,100 +1059,28 @@ class MiniMaxSeleniumProvider(SeleniumProvider):
 
             self.logger.info(f"✅ Loaded {len(text_items)} texts for processing")
 
-            # Setup driver and authenticate once
-            if not self.driver:
-                if not self.setup_driver():
-                    return {'success': False, 'error': 'Failed to setup driver', 'processed': 0, 'failed': len(text_items)}
+            if num_workers > 1:
+                return self._clone_batch_parallel(text_items, reference_audio, output_dir, num_workers)
 
-            if not self.navigate_to_base_url():
-                return {'success': False, 'error': 'Failed to navigate to MiniMax', 'processed': 0, 'failed': len(text_items)}
-
-            if not self.is_authenticated:
-                if not self.authenticate():
-                    self.logger.error("❌ Authentication failed")
-                    return {'success': False, 'error': 'Authentication failed', 'processed': 0, 'failed': len(text_items)}
+            # Setup driver, authenticate and upload the reference once (no-op if warm_reference() already did it)
+            reference_handle = self.prepare_reference(reference_audio)
+            if reference_handle is None:
+                self.logger.error("❌ Failed to prepare session/reference audio")
+                return {'success': False, 'error': 'Failed to prepare reference audio', 'processed': 0, 'failed': len(text_items)}
 
             # Process each text
             results = []
             processed = 0
-            failed = 0
-
             for text_id, text in text_items:
-                try:
-                    self.logger.info(f"🎤 Processing text {processed + 1}/{len(text_items)}: {text_id}")
-
-                    # Generate output filename
-                    safe_id = "".join(c for c in text_id if c.isalnum() or c in (' ', '-', '_')).rstrip()
-                    output_file = output_dir / f"minimax_{safe_id}.wav"
+                self.logger.info(f"🎤 Processing text {len(results) + 1}/{len(text_items)}: {text_id}")
+                result = self._clone_item(text_id, text, reference_audio, output_dir, reference_handle)
+                results.append(result)
+                processed += result['success']
 
-                    # Generate voice with reference audio
-                    success, audio_url = self.generate_voice(text, reference_audio)
+                # Brief pause between requests to avoid overwhelming the service
+                time.sleep(2)
 
-                    if success and audio_url:
-                        # Download audio
-                        if self.download_audio(audio_url, output_file):
-                            results.append({
-                                'id': text_id,
-                                'text': text,
-                                'output_file': str(output_file),
-                                'success': True,
-                                'audio_url': audio_url
-                            })
-                            processed += 1
-                            self.logger.info(f"✅ Generated: {output_file}")
-                        else:
-                            results.append({
-                                'id': text_id,
-                                'text': text,
-                                'output_file': str(output_file),
-                                'success': False,
-                                'error': 'Download failed'
-                            })
-                            failed += 1
-                            self.logger.error(f"❌ Download failed: {output_file}")
-                    else:
-                        results.append({
-                            'id': text_id,
-                            'text': text,
-                            'output_file': str(output_file),
-                            'success': False,
-                            'error': 'Generation failed'
-                        })
-                        failed += 1
-                        self.logger.error(f"❌ Generation failed: {text_id}")
-
-                    # Brief pause between requests to avoid overwhelming the service
-                    import time
-                    time.sleep(2)
-
-                except Exception as e:
-                    results.append({
-                        'id': text_id,
-                        'text': text,
-                        'output_file': str(output_dir / f"minimax_{text_id}.wav"),
-                        'success': False,
-                        'error': str(e)
-                    })
-                    failed += 1
-                    self.logger.error(f"❌ Error processing {text_id}: {e}")
-
-            # Summary
-            success_rate = processed / len(text_items) * 100 if text_items else 0
-
-            batch_result = {
-                'success': failed == 0,
-                'total_texts': len(text_items),
-                'processed': processed,
-                'failed': failed,
-                'success_rate': success_rate,
-                'results': results,
-                'reference_audio': str(reference_audio),
-                'output_directory': str(output_dir)
-            }
-
-            self.logger.info(f"📊 Batch processing complete: {processed}/{len(text_items)} successful ({success_rate:.1f}%)")
-
-            return batch_result
+            return self._batch_summary(text_items, results, reference_audio, output_dir, processed)
 
         except Exception as e:
             self.logger.error(f"❌ Batch cloning error: {e}")
@@ -866,7 +1103,7 @@ class MiniMaxSeleniumProvider(SeleniumProvider):
             self.logger.info(f"📁 Output directory: {output_dir}")
 
             # Load texts from file
-            loader = TextFileLoader(text_file)
+            loader = TextFileLoader(source_path=text_file)
             text_items = loader.load()
 
             if not text_items:
@@ -898,7 +1135,7 @@ class MiniMaxSeleniumProvider(SeleniumProvider):
                     self.logger.info(f"🎤 Processing text {processed + 1}/{len(text_items)}: {text_id}")
 
                     # Generate output filename
-                    safe_id = "".join(c for c in text_id if c.isalnum() or c in (' ', '-', '_')).rstrip()
+                    safe_id = _safe_text_id(text_id)
                     output_file = output_dir / f"minimax_{safe_id}.wav"
 
                     # Generate voice without reference audio
@@ -4,6 +4,7 @@ Shared helpers for API key resolution, config extraction, etc.
 """
 
 import os
+from pathlib import Path
 from typing import Any, Dict, List, Optional, TypeVar, Union
 
 
@@ -182,3 +183,38 @@ def validate_enum_value(
             )
         return False
     return True
+
+
+def stream_to_file(
+    response: Any,
+    output_file: Union[str, Path],
+    chunk_size: int = 65536,
+) -> int:
+    """
+    Write a streamed HTTP response body to disk chunk by chunk.
+
+    The request should be made with ``stream=True`` so the body is never held
+    in memory as a whole; peak memory stays at about one chunk per download.
+
+    Args:
+        response: requests.Response opened with stream=True
+        output_file: Destination file path
+        chunk_size: Bytes per read (default 64 KiB)
+
+    Returns:
+        Number of bytes written
+    """
+    written = 0
+    with open(output_file, 'wb') as f:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if chunk:
+                f.write(chunk)
+                written += len(chunk)
+    return written
+
+
+def ensure_dir(path: Union[str, Path]) -> Path:
+    """mkdir -p: create path (and its parents) if needed and return it as a Path."""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -1,7 +1,8 @@
 import requests
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, BinaryIO
 from ..providers.base.provider import TTSProvider
+from .utils import stream_to_file
 
 class VnPostTTSProvider(TTSProvider):
     """
@@ -20,6 +21,9 @@ class VnPostTTSProvider(TTSProvider):
         # Enhanced features from config
         self.sample_rate = self.config.get('sample_rate', 22050)
         self.default_voice = self.config.get('voice', 'Hà My')
+
+        # Reuse one HTTP session so keep-alive connections are shared across requests
+        self.session = requests.Session()
         
         # Track last error for detailed error reporting
         self.last_error: Optional[str] = None
@@ -28,9 +32,9 @@ class VnPostTTSProvider(TTSProvider):
         """VNPost supports multiple Vietnamese voices"""
         return ["Hà My", "Minh Tuấn", "Bảo Khang", "Lan Chi", "Tuấn Kiệt", "Ngọc Ánh"]
 
-    def synthesize(self, text: str, voice: str, output_file: Path) -> bool:
+    def _request_audio(self, text: str, voice: str) -> Optional[bytes]:
         """
-        Synthesize with validation and improved error handling.
+        Validate input and call the TTS API. Returns WAV bytes, or None on failure (see last_error).
         """
         # Clear any previous error
         self.last_error = None
@@ -40,13 +44,13 @@ class VnPostTTSProvider(TTSProvider):
             if not self.validate_text(text):
                 self.last_error = f"Invalid text: {text[:50]}..."
                 self.logger.error(self.last_error)
-                return False
+                return None
 
             # Validate voice
             if voice not in self.supported_voices:
                 self.last_error = f"Voice '{voice}' is not supported. Voices available: {self.supported_voices}"
                 self.logger.error(self.last_error)
-                return False
+                return None
 
             # Prepare form data
             files = {
@@ -57,7 +61,7 @@ class VnPostTTSProvider(TTSProvider):
             # Call API with timeout and improved error handling
             self.logger.info(f"🔄 Calling VNPost TTS API for text: {text[:50]}...")
 
-            response = requests.post(
+            response = self.session.post(
                 self.api_url,
                 files=files,
                 timeout=30  # Enhanced: timeout to avoid hang
@@ -66,11 +70,31 @@ class VnPostTTSProvider(TTSProvider):
             if response.status_code != 200:
                 self.last_error = f"VNPost TTS API error: {response.status_code}, {response.text}"
                 self.logger.error(f"❌ {self.last_error}")
+                return None
+
+            return response.content
+
+        except requests.exceptions.Timeout:
+            self.last_error = "VNPost API timeout"
+            self.logger.error(f"❌ {self.last_error}")
+            return None
+        except requests.exceptions.RequestException as e:
+            self.last_error = f"VNPost API request error: {e}"
+            self.logger.error(f"❌ {self.last_error}")
+            return None
+
+    def synthesize(self, text: str, voice: str, output_file: Path) -> bool:
+        """
+        Synthesize with validation and improved error handling.
+        """
+        try:
+            audio_bytes = self._request_audio(text, voice)
+            if audio_bytes is None:
                 return False
 
             # Save response content (WAV file) to output file
             with open(output_file, "wb") as f:
-                f.write(response.content)
+                f.write(audio_bytes)
 
             # Enhanced: check if file is created and log detailed information
             if output_file.exists():
@@ -82,14 +106,22 @@ class VnPostTTSProvider(TTSProvider):
                 self.logger.error(f"❌ {self.last_error}")
                 return False
 
-        except requests.exceptions.Timeout:
-            self.last_error = "VNPost API timeout"
-            self.logger.error(f"❌ {self.last_error}")
-            return False
-        except requests.exceptions.RequestException as e:
-            self.last_error = f"VNPost API request error: {e}"
+        except Exception as e:
+            self.last_error = f"VNPost synthesize error: {e}"
             self.logger.error(f"❌ {self.last_error}")
             return False
+
+    def synthesize_to_buffer(self, text: str, voice: str, buffer: BinaryIO) -> bool:
+        """
+        Synthesize and write the WAV bytes into a binary buffer (e.g. io.BytesIO) instead of a file.
+        """
+        try:
+            audio_bytes = self._request_audio(text, voice)
+            if audio_bytes is None:
+                return False
+            buffer.write(audio_bytes)
+            self.logger.info(f"VNPost synthesis successful: {len(audio_bytes)/1024:.1f}KB in memory")
+            return True
         except Exception as e:
             self.last_error = f"VNPost synthesize error: {e}"
             self.logger.error(f"❌ {self.last_error}")
@@ -119,19 +151,18 @@ class VnPostTTSProvider(TTSProvider):
             self.logger.info(f"🔄 Calling VNPost Clone API...")
 
             # Call Clone API
-            response = requests.post(
+            with self.session.post(
                 self.clone_api_url,
                 files=files,
-                timeout=60  # Clone may take longer time
-            )
-
-            if response.status_code != 200:
-                self.logger.error(f"❌ VNPost Clone API error: {response.status_code}, {response.text}")
-                return False
-
-            # Save response content (WAV file) to output file
-            with open(output_file, "wb") as f:
-                f.write(response.content)
+                timeout=60,  # Clone may take longer time
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    self.logger.error(f"❌ VNPost Clone API error: {response.status_code}, {response.text}")
+                    return False
+
+                # Stream response content (WAV file) to output file
+                stream_to_file(response, output_file)
 
             if output_file.exists():
                 file_size = output_file.stat().st_size
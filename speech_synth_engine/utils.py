@@ -1,4 +1,5 @@
 from datetime import datetime
+import functools
 import os
 
 def get_gemini_vertex_ai_client(credentials_path, project_id, location=None):
@@ -84,6 +85,8 @@ def extract_vertex_ai_credentials(cred_cfg):
             location = val
     return credentials_path, project_id, location
 
+# Hàm thuần (chỉ phụ thuộc chuỗi đầu vào): cache cho các corpus có timestamp lặp lại
+@functools.lru_cache(maxsize=100_000)
 def time_to_vietnamese_spoken(time_str):
     dt = datetime.strptime(time_str, "%Y_%m_%d__%H_%M_%S")
     
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+# ============================================================
+# Dataset Generator Test
+# DatasetGenerator with fake in-process providers (no network) using pytest
+# ============================================================
+
+import time
+import logging
+import tempfile
+import shutil
+import pytest
+import requests
+from pathlib import Path
+from typing import Any, List, Optional
+from collections.abc import Sequence
+
+from speech_synth_engine.providers.base.provider import TTSProvider
+from speech_synth_engine.dataset import dataset_generator
+from speech_synth_engine.dataset.dataset_generator import DatasetGenerator, _TokenBucket, generate_vietnamese_addresses
+
+
+class FakeProvider(TTSProvider):
+    """Writes a tiny file per text and records every text it was asked to synthesize"""
+
+    def __init__(self, name: str = "fake", latency: float = 0.0):
+        super().__init__(name, {"sample_rate": 16000})
+        self.latency = latency
+        self.calls: List[str] = []
+
+    def _get_supported_voices(self) -> List[str]:
+        return ["v"]
+
+    def synthesize(self, text: str, output_file: Path, generation_config: Any = None, **kwargs) -> bool:
+        Path(output_file).write_bytes(b"RIFF" + text.encode("utf-8"))
+        return True
+
+    def synthesize_with_metadata(self, text: str, output_file: Path, generation_config: Any = None):
+        self.calls.append(text)
+        time.sleep(self.latency)
+        self.synthesize(text, output_file, generation_config)
+        return {"success": True, "duration": 1.0}
+
+
+class FakeBatchProvider(FakeProvider):
+    """Provider with batched inference: synthesize_many() handles a whole chunk"""
+
+    supports_batch_inference = True
+
+    def __init__(self, name: str = "fakebatch", fail: bool = False):
+        super().__init__(name)
+        self.fail = fail
+        self.chunks: List[List[str]] = []
+
+    def synthesize_many(self, texts: List[str], output_files: List[Path],
+                        generation_config: Optional[Any] = None) -> List[Any]:
+        self.chunks.append(list(texts))
+        if self.fail:
+            raise RuntimeError("GPU out of memory")
+        for text, output_file in zip(texts, output_files):
+            self.synthesize(text, output_file, generation_config)
+        return [{"success": True, "duration": 1.0} for _ in texts]
+
+
+@pytest.fixture
+def output_dir():
+    """Create temporary output directory"""
+    temp_dir = Path(tempfile.mkdtemp())
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+def make_generator(output_dir: Path, provider: TTSProvider, **kwargs) -> DatasetGenerator:
+    generator = DatasetGenerator(output_dir, use_rich=False, **kwargs)
+    generator.providers[provider.name] = provider
+    return generator
+
+
+def read_tsv_text_ids(voice_dir: Path) -> List[str]:
+    lines = (voice_dir / "text_audio.tsv").read_text(encoding="utf-8").splitlines()
+    return [line.split("\t")[1] for line in lines[1:]]
+
+
+def test_synthesize_chunk_batched_inference(output_dir):
+    """Test synthesize_chunk sends the remaining texts of a chunk in one synthesize_many call"""
+    provider = FakeBatchProvider()
+    generator = make_generator(output_dir, provider)
+
+    summary = generator.synthesize_from_text_list(
+        [("1", "một"), ("2", "hai"), ("3", "ba")],
+        provider_model_voice=("fakebatch", "m", "v"),
+        batch_size=2,
+        delay_between_requests=0,
+    )
+
+    assert summary.successful_generations == 3
+    assert provider.chunks == [["một", "hai"], ["ba"]]
+    assert all(result.audio_path.exists() for result in summary.results)
+    generator.directory_manager.flush_metadata()
+    assert read_tsv_text_ids(output_dir / "fakebatch" / "m" / "v") == ["1", "2", "3"]
+
+    # Existing outputs are resolved per item: only the new text reaches the provider
+    results = generator.synthesize_chunk([("1", "một"), ("4", "bốn")], "fakebatch", "m", "v")
+    assert [r.success for r in results] == [True, True]
+    assert results[0].skipped_duplicate
+    assert provider.chunks[-1] == ["bốn"]
+
+
+def test_synthesize_chunk_provider_error(output_dir):
+    """Test an exception from synthesize_many fails every item of the chunk"""
+    provider = FakeBatchProvider(fail=True)
+    generator = make_generator(output_dir, provider)
+
+    results = generator.synthesize_chunk([("1", "một"), ("2", "hai")], "fakebatch", "m", "v")
+
+    assert [r.success for r in results] == [False, False]
+    assert all("GPU out of memory" in r.error for r in results)
+    generator.directory_manager.flush_metadata()
+    assert not (output_dir / "fakebatch" / "m" / "v" / "text_audio.tsv").exists()
+
+
+def test_synthesize_single_text(output_dir):
+    """Test the single-item path shares planning/finishing with the chunk path"""
+    provider = FakeProvider()
+    generator = make_generator(output_dir, provider)
+
+    result = generator.synthesize_single_text("1", "xin chào", "fake", "m", "v")
+    assert result.success and result.audio_path.exists()
+    assert result.duration == 1.0
+
+    # Same text under another id: linked from the first synthesis, no provider call
+    again = generator.synthesize_single_text("2", "xin chào", "fake", "m", "v")
+    assert again.success and again.skipped_duplicate
+    assert provider.calls == ["xin chào"]
+
+
+def test_synthesize_repeated_texts_in_order(output_dir, monkeypatch):
+    """Test repeated texts are linked in input order and the batch is summarized once"""
+    provider = FakeBatchProvider()
+    generator = make_generator(output_dir, provider)
+    summaries = []
+    monkeypatch.setattr(generator, "_log_summary", lambda summary, *args, **kwargs: summaries.append(summary))
+
+    texts = ["một", "hai", "một", "ba", "hai", "một"]
+    summary = generator.synthesize_from_text_list(
+        [(f"id{i}", text) for i, text in enumerate(texts)],
+        provider_model_voice=("fakebatch", "m", "v"),
+        batch_size=2,
+        delay_between_requests=0,
+    )
+
+    assert len(summaries) == 1
+    assert summary.total_texts == 6 and summary.successful_generations == 6
+    assert [r.text for r in summary.results] == texts
+    assert provider.chunks == [["một", "hai"], ["ba"]]
+    generator.directory_manager.flush_metadata()
+    assert read_tsv_text_ids(output_dir / "fakebatch" / "m" / "v") == [f"id{i}" for i in range(6)]
+
+
+def test_synthesize_repeated_texts_concurrently(output_dir, monkeypatch):
+    """Test a repeat submitted while its text is in flight waits instead of calling the provider"""
+    # Latency keeps the first "một" in flight while its repeats are submitted
+    provider = FakeProvider(latency=0.05)
+    generator = make_generator(output_dir, provider)
+    summaries = []
+    monkeypatch.setattr(generator, "_log_summary", lambda summary, *args, **kwargs: summaries.append(summary))
+
+    texts = ["một", "hai", "một", "ba", "hai", "một"]
+    summary = generator.synthesize_from_text_list(
+        [(f"id{i}", text) for i, text in enumerate(texts)],
+        provider_model_voice=("fake", "m", "v"),
+        delay_between_requests=0,
+        enable_concurrency=True,
+        max_workers=4,
+    )
+
+    assert len(summaries) == 1
+    assert summary.successful_generations == 6
+    assert sorted(provider.calls) == ["ba", "hai", "một"]
+    assert sum(r.skipped_duplicate for r in summary.results) == 3
+
+
+def test_synthesize_chunk_repeated_texts(output_dir):
+    """Test a text repeated within a chunk reaches synthesize_many once"""
+    provider = FakeBatchProvider()
+    generator = make_generator(output_dir, provider)
+
+    results = generator.synthesize_chunk([("1", "một"), ("2", "hai"), ("3", "một")], "fakebatch", "m", "v")
+
+    assert [r.success for r in results] == [True, True, True]
+    assert results[2].skipped_duplicate
+    assert provider.chunks == [["một", "hai"]]
+    generator.directory_manager.flush_metadata()
+    assert read_tsv_text_ids(output_dir / "fakebatch" / "m" / "v") == ["1", "2", "3"]
+
+
+class CountingTexts(Sequence):
+    """Sequence of texts that counts how many items were read"""
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.reads = 0
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __getitem__(self, index):
+        self.reads += 1
+        return self.texts[index]
+
+
+def test_generate_vietnamese_addresses_indexes_lazily(output_dir):
+    """Test the helper passes a sequence through lazily (sized, read only during generation)"""
+    provider = FakeProvider()
+    generator = make_generator(output_dir, provider)
+    texts = CountingTexts(["một", "hai", "một"])
+    seen = {}
+
+    def generate_from_text_list(text_items, **kwargs):
+        seen["len"], seen["reads"] = len(text_items), texts.reads
+        return generator.synthesize_from_text_list(text_items, **kwargs)
+
+    generator.generate_from_text_list = generate_from_text_list
+    summary = generate_vietnamese_addresses(output_dir, texts, generator=generator,
+                                            provider_model_voice=("fake", "m", "v"),
+                                            delay_between_requests=0)
+
+    assert seen == {"len": 3, "reads": 0}
+    assert texts.reads == 3
+    assert summary.successful_generations == 3
+    assert sorted(provider.calls) == ["hai", "một"]
+
+
+def test_transient_errors_back_off(output_dir, monkeypatch, caplog):
+    """Test requests' connection/timeout errors slow the provider down; failures are summarized once"""
+    generator = make_generator(output_dir, FakeProvider())
+    backoffs = []
+    monkeypatch.setattr(_TokenBucket, "backoff", lambda self, multiplier=2.0: backoffs.append(multiplier))
+
+    errors = iter([requests.exceptions.ConnectionError("reset"), requests.exceptions.ReadTimeout("slow")])
+
+    def single_fn(text_id, text):
+        raise next(errors)
+
+    with caplog.at_level(logging.INFO, logger="DatasetGenerator"):
+        summary = generator._run_batch([("1", "một"), ("2", "hai")], "fake", single_fn, delay_between_requests=0)
+
+    assert summary.failed_generations == 2
+    assert len(backoffs) == 2
+    # continue_on_error: no error line per item, one warning for the batch
+    assert not [r for r in caplog.records if r.levelno >= logging.ERROR]
+    assert [r.getMessage() for r in caplog.records if "failed" in r.getMessage()] == ["⚠️ 2 item(s) failed in this batch"]
+    assert len(summary.errors) == 2
+
+
+def test_stop_on_error_reports_failure_once(output_dir, caplog):
+    """Test continue_on_error=False stops at the first failure, logged and recorded once"""
+    generator = make_generator(output_dir, FakeProvider())
+    calls = []
+
+    def single_fn(text_id, text):
+        calls.append(text_id)
+        raise RuntimeError("boom")
+
+    with caplog.at_level(logging.INFO, logger="DatasetGenerator"):
+        summary = generator._run_batch([("1", "một"), ("2", "hai")], "fake", single_fn,
+                                       delay_between_requests=0, continue_on_error=False)
+
+    assert calls == ["1"]
+    assert summary.errors == ["Error with text 'một...' (ID: 1): boom"]
+    assert len([r for r in caplog.records if r.levelno >= logging.ERROR]) == 1
+
+
+class FakeClock:
+    """Stands in for the time module in dataset_generator: sleep() advances monotonic()"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps: List[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_acquire_backoff_recover(monkeypatch):
+    """Test the token bucket paces acquire(), halves its rate on backoff() and recovers gradually"""
+    clock = FakeClock()
+    monkeypatch.setattr(dataset_generator, "time", clock)
+    bucket = _TokenBucket(rate_per_sec=2.0)
+
+    bucket.acquire()  # initial burst token
+    assert clock.sleeps == []
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+    # A request slower than the interval finds its token waiting
+    clock.now += 1.0
+    bucket.acquire()
+    assert len(clock.sleeps) == 1
+
+    bucket.backoff()
+    assert bucket.rate == 1.0
+    bucket.acquire()
+    assert clock.sleeps[-1] == pytest.approx(1.0)
+    for _ in range(10):
+        bucket.backoff()
+    assert bucket.rate == pytest.approx(2.0 * _TokenBucket.MIN_RATE_FACTOR)
+
+    bucket.recover()
+    assert bucket.rate == pytest.approx(2.0 * _TokenBucket.MIN_RATE_FACTOR * 1.25)
+    for _ in range(20):
+        bucket.recover()
+    assert bucket.rate == 2.0
+
+
+def test_token_bucket_unlimited(monkeypatch):
+    """Test an unlimited bucket never sleeps until backoff(), and is released again by recover()"""
+    clock = FakeClock()
+    monkeypatch.setattr(dataset_generator, "time", clock)
+    bucket = _TokenBucket(rate_per_sec=None)
+
+    for _ in range(5):
+        bucket.acquire()
+    assert clock.sleeps == []
+
+    bucket.backoff()
+    assert bucket.rate == 1.0
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+    while bucket.rate is not None:
+        bucket.recover()
+    bucket.acquire()
+    assert len(clock.sleeps) == 1
+
+
+def test_existing_outputs_listed_lazily(output_dir):
+    """Test existing outputs are listed per wav dir on first use and re-checked before a skip"""
+    provider = FakeProvider()
+    make_generator(output_dir, provider).synthesize_single_text("1", "một", "fake", "m", "v")
+
+    generator = make_generator(output_dir, provider)
+    assert generator._existing_audio == {}
+
+    skipped = generator.synthesize_single_text("1", "một", "fake", "m", "v")
+    assert skipped.skipped_duplicate
+    assert list(generator._existing_audio) == [skipped.audio_path.parent]
+
+    # Removed after the directory was listed: generated again instead of skipped
+    skipped.audio_path.unlink()
+    again = generator.synthesize_single_text("1", "một", "fake", "m", "v")
+    assert again.success and not again.skipped_duplicate
+    assert again.audio_path.exists()
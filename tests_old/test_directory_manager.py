@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# ============================================================
+# Directory Manager Test
+# Buffered text_audio.tsv writer and metadata.json format using pytest
+# ============================================================
+
+import json
+import shutil
+import tempfile
+import pytest
+from pathlib import Path
+
+from speech_synth_engine.dataset.directory_manager import DirectoryManager, MetadataWriter
+
+
+@pytest.fixture
+def temp_dir():
+    """Create temporary directory"""
+    temp_dir = Path(tempfile.mkdtemp())
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+def read_rows(path: Path):
+    return [line.split("\t") for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_metadata_writer_persists_on_flush_and_close(temp_dir):
+    """Test buffered rows reach the file on flush() and close(), not before"""
+    path = temp_dir / "text_audio.tsv"
+    writer = MetadataWriter(path, flush_every=0)
+
+    assert writer.append(["1", "một", "wav/1.wav", "1.00", "2025-01-01 00:00:00"]) == "00001"
+    assert writer.append(["2", "hai", "wav/2.wav", "2.00", "2025-01-01 00:00:00"]) == "00002"
+    assert path.read_text(encoding="utf-8") == ""
+
+    writer.flush()
+    assert len(read_rows(path)) == 3
+
+    writer.append(["3", "ba", "wav/3.wav", "3.00", "2025-01-01 00:00:00"])
+    writer.close()
+    writer.close()  # closing twice is a no-op
+    assert [row[0] for row in read_rows(path)[1:]] == ["00001", "00002", "00003"]
+
+
+def test_metadata_writer_flush_every(temp_dir):
+    """Test rows are written in chunks of flush_every"""
+    path = temp_dir / "text_audio.tsv"
+    writer = MetadataWriter(path, flush_every=2)
+
+    writer.append(["1", "một", "wav/1.wav", "1.00", "2025-01-01 00:00:00"])
+    assert path.read_text(encoding="utf-8") == ""
+    writer.append(["2", "hai", "wav/2.wav", "2.00", "2025-01-01 00:00:00"])
+    assert len(read_rows(path)) == 3
+    writer.close()
+
+
+def test_metadata_writer_row_count_continues_across_reopen(temp_dir):
+    """Test utt_ids continue from the rows of an existing file and the header is written once"""
+    path = temp_dir / "text_audio.tsv"
+    writer = MetadataWriter(path)
+    writer.append(["1", "một", "wav/1.wav", "1.00", "2025-01-01 00:00:00"])
+    writer.append(["2", "hai", "wav/2.wav", "2.00", "2025-01-01 00:00:00"])
+    writer.close()
+
+    reopened = MetadataWriter(path)
+    assert reopened.row_count == 2
+    assert reopened.append(["3", "ba", "wav/3.wav", "3.00", "2025-01-01 00:00:00"]) == "00003"
+    reopened.close()
+
+    rows = read_rows(path)
+    assert rows[0] == MetadataWriter.HEADER
+    assert [row[0] for row in rows[1:]] == ["00001", "00002", "00003"]
+
+
+def test_add_metadata_entry_format(temp_dir):
+    """Test text_audio.tsv and metadata.json keep their original format"""
+    manager = DirectoryManager(temp_dir)
+    voice_dir = temp_dir / "gtts" / "default" / "vi"
+    (voice_dir / "wav").mkdir(parents=True)
+    audio_path = voice_dir / "wav" / "00001_xin_chao.wav"
+
+    assert manager.add_metadata_entry(voice_dir, "xin chào", audio_path, "gtts", "default", "vi",
+                                      "synthesize", sample_rate=16000, duration=1.234, text_id="1")
+    manager.close_metadata()
+
+    # csv.writer rows: tab separated, \r\n terminated
+    lines = (voice_dir / "text_audio.tsv").read_bytes().decode("utf-8").split("\r\n")
+    assert lines[0] == "utt_id\ttext_id\ttext\taudio_path\tduration\tgen_date"
+    utt_id, text_id, text, rel_path, duration, gen_date = lines[1].split("\t")
+    assert (utt_id, text_id, text, rel_path, duration) == ("00001", "1", "xin chào", "wav/00001_xin_chao.wav", "1.23")
+    assert len(gen_date) == len("2025-01-01 00:00:00")
+    assert lines[2:] == [""]
+
+    expected = {
+        "provider": "gtts",
+        "model": "default",
+        "voice": "vi",
+        "tts_type": "synthesize",
+        "sampling_rate": 16000,
+        "lang": "vi",
+    }
+    assert (voice_dir / "metadata.json").read_text(encoding="utf-8") == json.dumps(expected, indent=4, ensure_ascii=False)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# ============================================================
+# Synthesis Cache Test
+# Content-addressed SynthesisCache (sqlite index + audio files) using pytest
+# ============================================================
+
+import shutil
+import tempfile
+import itertools
+import threading
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+
+from speech_synth_engine.dataset import synthesis_cache
+from speech_synth_engine.dataset.synthesis_cache import SynthesisCache
+
+
+@pytest.fixture
+def temp_dir():
+    """Create temporary directory"""
+    temp_dir = Path(tempfile.mkdtemp())
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+def write_audio(path: Path, size: int = 100) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"RIFF" + b"\0" * (size - 4))
+    return path
+
+
+def test_put_get_round_trip(temp_dir):
+    """Test a stored entry is returned before and after flush, and across reopen"""
+    cache = SynthesisCache(temp_dir / "cache")
+    key = SynthesisCache.make_key("xin chào", "gtts", "default", "vi", 16000)
+    audio = write_audio(temp_dir / "out" / "1.wav")
+
+    assert cache.get(key) is None
+    cache.put(key, audio, 1.5)
+    cached_path, duration = cache.get(key)
+    assert cached_path.read_bytes() == audio.read_bytes()
+    assert duration == 1.5
+
+    cache.close()
+    reopened = SynthesisCache(temp_dir / "cache")
+    target = temp_dir / "out" / "2.wav"
+    assert reopened.fetch(key, target) == 1.5
+    assert target.read_bytes() == audio.read_bytes()
+    reopened.close()
+
+
+def test_key_depends_on_request():
+    """Test the key changes with model, voice, sample rate and clone reference"""
+    base = SynthesisCache.make_key("xin chào", "gtts", "default", "vi", 16000)
+
+    assert base == SynthesisCache.make_key("xin chào", "gtts", "default", "vi", 16000)
+    assert base != SynthesisCache.make_key("xin chào", "gtts", "other", "vi", 16000)
+    assert base != SynthesisCache.make_key("xin chào", "gtts", "default", "en", 16000)
+    assert base != SynthesisCache.make_key("xin chào", "gtts", "default", "vi", 22050)
+    assert base != SynthesisCache.make_key("xin chào", "gtts", "default", "vi", 16000, reference="ref")
+
+
+def test_eviction_under_max_bytes(temp_dir, monkeypatch):
+    """Test flush evicts least recently used entries until the cache fits in max_bytes"""
+    clock = itertools.count(1000)
+    monkeypatch.setattr(synthesis_cache, "time", SimpleNamespace(time=lambda: next(clock)))
+    cache = SynthesisCache(temp_dir / "cache", max_bytes=250)
+    keys = [SynthesisCache.make_key(text, "gtts", "default", "vi") for text in ("một", "hai", "ba")]
+
+    for index, key in enumerate(keys[:2]):
+        cache.put(key, write_audio(temp_dir / "out" / f"{index}.wav"), 1.0)
+    cache.flush()
+    # Hit on the oldest entry: "hai" becomes the least recently used
+    assert cache.get(keys[0]) is not None
+    cache.put(keys[2], write_audio(temp_dir / "out" / "2.wav"), 1.0)
+    cache.flush()
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+    assert len(list((temp_dir / "cache" / "audio").iterdir())) == 2
+    # The output tree keeps its own hardlink of the evicted entry
+    assert (temp_dir / "out" / "1.wav").exists()
+    cache.close()
+
+
+def test_concurrent_get_put(temp_dir):
+    """Test get/put from several threads sharing one cache"""
+    cache = SynthesisCache(temp_dir / "cache", put_batch_size=8)
+    errors = []
+
+    def worker(worker_index: int):
+        try:
+            for i in range(20):
+                key = SynthesisCache.make_key(f"text {i}", "gtts", "default", "vi")
+                with cache.key_lock(key):
+                    if cache.get(key) is None:
+                        audio = write_audio(temp_dir / "out" / f"{worker_index}_{i}.wav")
+                        cache.put(key, audio, float(i))
+                assert cache.get(key)[1] == float(i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cache.close()
+
+    assert errors == []
+    reopened = SynthesisCache(temp_dir / "cache")
+    for i in range(20):
+        assert reopened.get(SynthesisCache.make_key(f"text {i}", "gtts", "default", "vi"))[1] == float(i)
+    assert len(list((temp_dir / "cache" / "audio").iterdir())) == 20
+    reopened.close()
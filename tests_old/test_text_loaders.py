@@ -12,11 +12,13 @@ import pytest
 from pathlib import Path
 import json
 import csv
+from itertools import islice
 
 # Add speech-synth-engine to path
 # sys.path.insert(0, "/home/nampv1/projects/tts/speech-synth-engine")
 
 from speech_synth_engine.dataset.text_loaders import (
+    _MappedTextItems,
     TextFileLoader,
     SimpleCSVLoader,
     CustomTextLoader,
@@ -117,7 +119,7 @@ def test_text_file_loader_with_id_format(sample_files):
         f.write("3\tĐà Nẵng\n")
         f.write("4\tCần Thơ\n")
 
-    loader = TextFileLoader(id_file)
+    loader = TextFileLoader(source_path=id_file)
 
     # Test successful loading with ID format
     text_items = loader.load()
@@ -134,7 +136,7 @@ def test_text_file_loader_with_id_format(sample_files):
 
 def test_text_file_loader_without_id_format(sample_files):
     """Test TextFileLoader auto-generates IDs when no ID format"""
-    loader = TextFileLoader(sample_files / "provinces.txt")
+    loader = TextFileLoader(source_path=sample_files / "provinces.txt")
 
     # Test successful loading without ID format (auto-generate)
     text_items = loader.load()
@@ -150,6 +152,79 @@ def test_text_file_loader_without_id_format(sample_files):
     assert text_items == expected_items
 
 
+def test_text_file_loader_iter_matches_load(sample_files):
+    """Test TextFileLoader.iter yields the same items as load, lazily"""
+    loader = TextFileLoader(source_path=sample_files / "provinces.txt")
+
+    # Preview without reading the whole file
+    preview = list(islice(loader.iter(), 2))
+    assert preview == [("1", "Hồ Chí Minh"), ("2", "Hà Nội")]
+
+    assert list(loader.iter()) == loader.load()
+
+
+def test_text_file_loader_non_utf8_encodings(sample_files):
+    """Test TextFileLoader with encodings other than UTF-8 (text mode and byte fast path)"""
+    lines = ["1\tHồ Chí Minh", "", "Hà Nội", "3\tĐà Nẵng"]
+    expected_items = [("1", "Hồ Chí Minh"), ("3", "Hà Nội"), ("3", "Đà Nẵng")]
+
+    for encoding in ("utf-16", "utf-16-le", "utf-32"):
+        path = sample_files / f"provinces_{encoding}.txt"
+        with open(path, 'w', encoding=encoding, newline='') as f:
+            f.write("\r\n".join(lines) + "\n")
+
+        loader = TextFileLoader(source_path=path, encoding=encoding)
+        assert loader.load() == expected_items, encoding
+        assert list(loader.iter()) == expected_items, encoding
+
+    # Single-byte encoding: byte-level fast path
+    path = sample_files / "cafe_latin1.txt"
+    path.write_bytes("Café\r\n\r\n7\tCrème brûlée\n".encode("latin-1"))
+    loader = TextFileLoader(source_path=path, encoding="latin-1")
+    assert loader.load() == [("1", "Café"), ("7", "Crème brûlée")]
+
+
+def test_text_file_loader_memory_mapped(sample_files, monkeypatch):
+    """Test the memory-mapped sequence (large files) against the in-memory list"""
+    path = sample_files / "mapped.txt"
+    path.write_bytes("1\tHồ Chí Minh\r\n\nHà Nội\r   \n4\tĐà Nẵng\nCần Thơ".encode("utf-8"))
+    loader = TextFileLoader(source_path=path)
+    expected_items = loader.load()
+    assert isinstance(expected_items, list)
+
+    monkeypatch.setattr(TextFileLoader, "MMAP_THRESHOLD", 1)
+    mapped = loader.load()
+    assert isinstance(mapped, _MappedTextItems)
+    assert list(mapped) == expected_items
+    assert len(mapped) == len(expected_items) == 4
+    assert mapped[0] == expected_items[0]
+    assert mapped[-1] == expected_items[-1]
+    assert mapped[1:3] == expected_items[1:3]
+    assert mapped[::-1] == expected_items[::-1]
+    with pytest.raises(IndexError):
+        mapped[len(expected_items)]
+
+    # Not ASCII-compatible: never memory-mapped
+    utf16_path = sample_files / "mapped_utf16.txt"
+    utf16_path.write_text("1\tHồ Chí Minh\nHà Nội\n", encoding="utf-16")
+    items = TextFileLoader(source_path=utf16_path, encoding="utf-16").load()
+    assert items == [("1", "Hồ Chí Minh"), ("2", "Hà Nội")]
+
+
+def test_text_file_loader_encoding_is_positional(sample_files):
+    """Test TextFileLoader keeps encoding as its first positional parameter"""
+    path = sample_files / "utf16.txt"
+    path.write_text("Hà Nội\n", encoding="utf-16")
+
+    loader = TextFileLoader("utf-16")
+    assert loader.encoding == "utf-16"
+    assert loader.source_path is None
+    assert loader.load(path) == [("1", "Hà Nội")]
+
+    with pytest.raises(TypeError):
+        TextFileLoader("utf-8", path)
+
+
 def test_text_file_loader_with_mixed_format(sample_files):
     """Test TextFileLoader with mixed format (some with ID, some without)"""
     # Create file with mixed format
@@ -160,7 +235,7 @@ def test_text_file_loader_with_mixed_format(sample_files):
         f.write("2\tAnother valid text\n")
         f.write("Third line without ID\n")
 
-    loader = TextFileLoader(mixed_file)
+    loader = TextFileLoader(source_path=mixed_file)
     text_items = loader.load()
 
     expected_items = [
@@ -361,11 +436,11 @@ def test_text_loader_factory_invalid_type(sample_files):
 def test_text_loader_validation(sample_files):
     """Test text loader validation"""
     # Test valid file
-    loader = TextFileLoader(sample_files / "provinces.txt")
+    loader = TextFileLoader(source_path=sample_files / "provinces.txt")
     assert loader.validate_source() is True
 
     # Test invalid file
-    loader = TextFileLoader(sample_files / "nonexistent.txt")
+    loader = TextFileLoader(source_path=sample_files / "nonexistent.txt")
     assert loader.validate_source() is False
 
 
@@ -376,7 +451,7 @@ def test_edge_cases(sample_files):
     with open(empty_file, 'w', encoding='utf-8') as f:
         f.write("")
 
-    loader = TextFileLoader(empty_file)
+    loader = TextFileLoader(source_path=empty_file)
     text_items = loader.load()
     assert len(text_items) == 0  # Empty file has no lines
 
@@ -389,7 +464,7 @@ def test_edge_cases(sample_files):
         f.write("   \n")
         f.write("Valid text line\n")
 
-    loader = TextFileLoader(comment_file)
+    loader = TextFileLoader(source_path=comment_file)
     text_items = loader.load()
     expected_items = [
         ("1", "# This is a comment"),